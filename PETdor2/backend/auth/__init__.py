@@ -4,7 +4,9 @@ from .user import (
     criar_usuario,
     buscar_usuario_por_email,
     autenticar_usuario,
+    verificar_credenciais,
     atualizar_usuario,
+    atualizar_usuarios_em_lote,
     deletar_usuario,
 )
 
@@ -12,6 +14,8 @@ __all__ = [
     "criar_usuario",
     "buscar_usuario_por_email",
     "autenticar_usuario",
+    "verificar_credenciais",
     "atualizar_usuario",
+    "atualizar_usuarios_em_lote",
     "deletar_usuario",
 ]
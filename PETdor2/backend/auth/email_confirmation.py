@@ -9,18 +9,11 @@ from datetime import datetime
 from typing import Tuple, Dict, Any
 
 # Importações absolutas — evita import circular
-from backend.database.supabase_client import (
-    supabase_table_update,
-    supabase_table_select,
-)
+from backend.database.supabase_client import supabase_table_update
 from backend.auth.security import (
     gerar_token_confirmacao_email,
     validar_token_confirmacao_email,
 )
-from backend.auth.user import (
-    marcar_email_como_confirmado,
-    buscar_usuario_por_email,
-)
 
 logger = logging.getLogger(__name__)
 
@@ -32,64 +25,25 @@ TABELA_USUARIOS = "usuarios"
 # ============================================================
 def enviar_email_confirmacao(email: str, nome: str, user_id: int) -> Tuple[bool, str]:
     """
-    Gera token JWT, salva no banco e envia link de confirmação para o usuário.
+    Gera token assinado e envia link de confirmação para o usuário.
+    O token carrega email e user_id, então não precisa ser salvo no banco.
     """
 
     # Import tardio evita import circular com utils.email_sender
     from backend.utils.email_sender import enviar_email_confirmacao_generico
+    from backend.utils.email_templates import MODELO_CONFIRMACAO_EMAIL
     from backend.utils.config import STREAMLIT_APP_URL
 
     try:
-        # Gera token JWT único
+        # Gera token assinado único
         token = gerar_token_confirmacao_email(email=email, user_id=user_id)
 
-        # Salva token no Supabase
-        dados_update = {
-            "email_confirm_token": token,
-            "atualizado_em": datetime.now().isoformat(),
-        }
-
-        ok_update, msg_update = supabase_table_update(
-            TABELA_USUARIOS, dados_update, {"id": user_id}
-        )
-
-        if not ok_update:
-            logger.error(
-                f"❌ Falha ao salvar token de confirmação para usuário {user_id}: {msg_update}"
-            )
-            return False, "Erro ao gerar link de confirmação."
-
         # Monta link de confirmação
         link = f"{STREAMLIT_APP_URL}?action=confirm_email&token={token}"
 
-        assunto = "Confirme seu e-mail - PETDor"
-
-        corpo_html = f"""
-        <html>
-        <body>
-            <p>Olá, {nome}!</p>
-            <p>Obrigado por se cadastrar no PETDor.</p>
-            <p>Para ativar sua conta, clique no link abaixo:</p>
-            <p><a href="{link}">🔗 Confirmar meu E-mail</a></p>
-            <br/>
-            <p>Se você não criou esta conta, ignore este e-mail.</p>
-        </body>
-        </html>
-        """
-
-        corpo_texto = f"""
-Olá, {nome}!
-
-Obrigado por se cadastrar no PETDor.
-
-Para ativar sua conta, acesse o link abaixo:
+        assunto, corpo_texto, corpo_html = MODELO_CONFIRMACAO_EMAIL.renderizar({"nome": nome, "link": link})
 
-🔗 {link}
-
-Se você não criou esta conta, apenas ignore este e-mail.
-"""
-
-        # Enviar e-mail
+        # Enfileira o e-mail (entregue em segundo plano pela fila de envio)
         ok_email, msg_email = enviar_email_confirmacao_generico(
             destinatario_email=email,
             assunto=assunto,
@@ -101,7 +55,7 @@ Se você não criou esta conta, apenas ignore este e-mail.
             logger.error(f"❌ Erro ao enviar e-mail de confirmação para {email}: {msg_email}")
             return False, "Falha ao enviar o e-mail de confirmação."
 
-        logger.info(f"✅ E-mail de confirmação enviado para {email} (user_id={user_id})")
+        logger.info(f"✅ E-mail de confirmação enfileirado para {email} (user_id={user_id})")
         return True, "E-mail de confirmação enviado com sucesso."
 
     except Exception as e:
@@ -114,7 +68,9 @@ Se você não criou esta conta, apenas ignore este e-mail.
 # ============================================================
 def confirmar_email_com_token(token: str) -> Tuple[bool, str]:
     """
-    Valida o token JWT e confirma o e-mail do usuário no banco.
+    Valida o token (assinatura, expiração e finalidade, sem consultar o
+    banco) e confirma o e-mail do usuário com um único UPDATE.
+    Confirmar de novo é inofensivo, então o token não precisa ser de uso único.
     """
 
     try:
@@ -129,23 +85,20 @@ def confirmar_email_com_token(token: str) -> Tuple[bool, str]:
         if not email or not user_id:
             return False, "Token inválido ou incompleto."
 
-        # Busca usuário
-        ok_user, usuario = buscar_usuario_por_email(email)
-
-        if not ok_user or not usuario:
-            return False, "Usuário não encontrado."
-
-        # Verifica se token do banco é igual ao recebido
-        if usuario.get("email_confirm_token") != token:
-            return False, "Token inválido ou já utilizado."
-
-        # Marca o e-mail como confirmado
-        ok_marcar, msg_marcar = marcar_email_como_confirmado(email)
+        # Filtra também pelo e-mail: o token não vale se o e-mail mudou
+        atualizados = supabase_table_update(
+            TABELA_USUARIOS,
+            {"id": user_id, "email": email},
+            {"email_confirmado": True, "atualizado_em": datetime.now().isoformat()},
+        )
 
-        if not ok_marcar:
-            logger.error(f"❌ Erro ao confirmar e-mail {email}: {msg_marcar}")
+        if atualizados is None:
+            logger.error(f"❌ Erro ao confirmar e-mail {email}")
             return False, "Erro ao confirmar e-mail."
 
+        if not atualizados:
+            return False, "Usuário não encontrado."
+
         logger.info(f"✅ E-mail confirmado com sucesso: {email} (user_id={user_id})")
         return True, "E-mail confirmado com sucesso! Você já pode fazer login."
 
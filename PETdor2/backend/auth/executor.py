@@ -0,0 +1,180 @@
+# PETdor2/backend/auth/executor.py
+"""
+Executor de autenticação: roda bcrypt fora da thread do script Streamlit.
+
+O hash/verificação de senha é CPU-bound e, na thread da sessão, serializa
+o servidor durante rajadas de login. As chamadas vão para um pool de
+processos (um worker por núcleo) com admissão limitada: no máximo
+`workers + AUTH_FILA_MAX` tarefas em andamento. Acima disso a chamada é
+rejeitada imediatamente com AutenticacaoSobrecarregada ("tente novamente"),
+em vez de enfileirar sem limite.
+
+As funções enviadas ao pool são as do próprio bcrypt (builtins
+serializáveis), então os workers importam apenas o bcrypt.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as TempoEsgotado
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, Optional
+
+from backend.utils.config import AUTH_WORKERS, AUTH_FILA_MAX, AUTH_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+MENSAGEM_SOBRECARGA = "Muitas tentativas de login no momento. Tente novamente em alguns segundos."
+
+
+class AutenticacaoSobrecarregada(RuntimeError):
+    """O executor está saturado (ou a tarefa excedeu o tempo); tente novamente."""
+
+    def __init__(self, mensagem: str = MENSAGEM_SOBRECARGA):
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+
+
+class ExecutorAutenticacao:
+    """Pool de processos com admissão limitada e métricas de fila/latência."""
+
+    def __init__(self, workers: int = 0, fila_max: int = 32, timeout: float = 10.0):
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.fila_max = max(fila_max, 0)
+        self.timeout = timeout
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._vagas = threading.BoundedSemaphore(self.workers + self.fila_max)
+
+        self._em_andamento = 0
+        self._aceitas = 0
+        self._rejeitadas = 0
+        self._latencias: Deque[float] = deque(maxlen=256)
+
+    # ------------------------------------------------------------
+    # Pool
+    # ------------------------------------------------------------
+    def _obter_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # forkserver evita copiar as threads do Streamlit para os workers
+                metodos = multiprocessing.get_all_start_methods()
+                contexto = multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=contexto)
+                logger.info(f"🔐 Executor de autenticação iniciado ({self.workers} workers, fila {self.fila_max})")
+            return self._pool
+
+    def _descartar_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------
+    def executar(self, funcao: Callable[..., Any], *args: Any) -> Any:
+        """
+        Executa `funcao(*args)` em um worker e aguarda o resultado.
+
+        Raises:
+            AutenticacaoSobrecarregada: sem vaga na fila ou tempo excedido.
+        """
+        if not self._vagas.acquire(blocking=False):
+            with self._lock:
+                self._rejeitadas += 1
+                profundidade = self._em_andamento
+            logger.warning(f"⚠️ Executor de autenticação saturado ({profundidade} tarefas); requisição rejeitada")
+            raise AutenticacaoSobrecarregada()
+
+        with self._lock:
+            self._em_andamento += 1
+            self._aceitas += 1
+            fila = max(self._em_andamento - self.workers, 0)
+
+        inicio = time.perf_counter()
+        pool = None
+        try:
+            pool = self._obter_pool()
+            futuro = pool.submit(funcao, *args)
+        except BrokenProcessPool:
+            logger.error("❌ Pool de autenticação quebrado; executando localmente")
+            self._descartar_pool(pool)
+            self._liberar(inicio)
+            return funcao(*args)
+        except Exception:
+            self._liberar(inicio)
+            raise
+        futuro.add_done_callback(lambda _f: self._liberar(inicio))
+
+        try:
+            resultado = futuro.result(timeout=self.timeout)
+        except TempoEsgotado:
+            futuro.cancel()  # ainda na fila: libera a vaga sem executar
+            logger.warning(f"⚠️ Tarefa de autenticação excedeu {self.timeout}s (fila: {fila})")
+            raise AutenticacaoSobrecarregada()
+        except BrokenProcessPool:
+            # Worker morto (OOM, sinal): recria o pool na próxima chamada e
+            # atende esta requisição na própria thread
+            logger.error("❌ Pool de autenticação quebrado; executando localmente")
+            self._descartar_pool(pool)
+            return funcao(*args)
+
+        logger.debug(
+            f"🔐 {getattr(funcao, '__name__', funcao)}: {(time.perf_counter() - inicio) * 1000:.1f} ms (fila: {fila})"
+        )
+        return resultado
+
+    def _liberar(self, inicio: float) -> None:
+        with self._lock:
+            self._em_andamento -= 1
+            self._latencias.append(time.perf_counter() - inicio)
+        self._vagas.release()
+
+    # ------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------
+    def estatisticas(self) -> Dict[str, Any]:
+        """Profundidade da fila, contadores e latência (submissão → fim) em ms."""
+        with self._lock:
+            latencias = sorted(self._latencias)
+            em_andamento = self._em_andamento
+            aceitas, rejeitadas = self._aceitas, self._rejeitadas
+
+        def percentil(p: float) -> float:
+            if not latencias:
+                return 0.0
+            return latencias[min(int(p * len(latencias)), len(latencias) - 1)] * 1000
+
+        return {
+            "workers": self.workers,
+            "capacidade": self.workers + self.fila_max,
+            "em_andamento": em_andamento,
+            "fila": max(em_andamento - self.workers, 0),
+            "aceitas": aceitas,
+            "rejeitadas": rejeitadas,
+            "latencia_p50_ms": percentil(0.50),
+            "latencia_p95_ms": percentil(0.95),
+        }
+
+    def encerrar(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+# Instância única por processo
+executor_auth = ExecutorAutenticacao(workers=AUTH_WORKERS, fila_max=AUTH_FILA_MAX, timeout=AUTH_TIMEOUT)
+
+
+__all__ = [
+    "MENSAGEM_SOBRECARGA",
+    "AutenticacaoSobrecarregada",
+    "ExecutorAutenticacao",
+    "executor_auth",
+]
@@ -0,0 +1,279 @@
+# PETdor2/backend/auth/limitador.py
+"""
+Limitador de tentativas de login (token bucket por e-mail e por IP).
+
+Cada chave tem um balde com `capacidade` fichas que se recompõe a
+`capacidade / janela` fichas por segundo; cada tentativa consome uma.
+Sem ficha, a tentativa é rejeitada antes de qualquer consulta ao banco
+ou hash bcrypt.
+
+Por padrão os contadores ficam em memória (dict compacto, com limpeza
+periódica das chaves ociosas). Com RATE_LIMIT_REDIS_URL configurada e o
+pacote `redis` instalado, os baldes ficam no Redis e são compartilhados
+entre as réplicas; se o Redis falhar, o limitador local assume.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from backend.utils.config import (
+    LOGIN_LIMITE_EMAIL,
+    LOGIN_LIMITE_IP,
+    LOGIN_JANELA_SEGUNDOS,
+    LOGIN_PROXIES_CONFIAVEIS,
+    RATE_LIMIT_REDIS_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ResultadoLimite:
+    permitido: bool
+    espera_segundos: float = 0.0
+    chave: Optional[str] = None
+
+    @property
+    def mensagem(self) -> str:
+        espera = max(int(math.ceil(self.espera_segundos)), 1)
+        return f"Muitas tentativas de login. Tente novamente em {espera} segundos."
+
+
+# ==========================================================
+# Backend local (memória do processo)
+# ==========================================================
+class BaldesLocais:
+    """Baldes em memória: chave → [fichas, instante da última atualização]."""
+
+    def __init__(self, max_chaves: int = 100_000, intervalo_limpeza: float = 60.0):
+        self.max_chaves = max_chaves
+        self.intervalo_limpeza = intervalo_limpeza
+        self._baldes: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._proxima_limpeza = time.monotonic() + intervalo_limpeza
+
+    def consumir(self, chave: str, capacidade: int, janela: float) -> Tuple[bool, float]:
+        """Consome uma ficha. Retorna (permitido, segundos até a próxima ficha)."""
+        taxa = capacidade / janela
+        agora = time.monotonic()
+        with self._lock:
+            if agora >= self._proxima_limpeza or len(self._baldes) >= self.max_chaves:
+                self._limpar(agora, janela)
+
+            balde = self._baldes.get(chave)
+            if balde is None:
+                balde = self._baldes[chave] = [float(capacidade), agora]
+            else:
+                balde[0] = min(float(capacidade), balde[0] + (agora - balde[1]) * taxa)
+                balde[1] = agora
+
+            if balde[0] >= 1.0:
+                balde[0] -= 1.0
+                return True, 0.0
+            return False, (1.0 - balde[0]) / taxa
+
+    def reiniciar(self, chave: str) -> None:
+        with self._lock:
+            self._baldes.pop(chave, None)
+
+    def _limpar(self, agora: float, janela: float) -> None:
+        # Chamado com o lock adquirido. Um balde ocioso por uma janela
+        # inteira já está cheio: removê-lo equivale a mantê-lo.
+        ociosas = [c for c, (_, instante) in self._baldes.items() if agora - instante >= janela]
+        for chave in ociosas:
+            del self._baldes[chave]
+
+        excesso = len(self._baldes) - int(self.max_chaves * 0.9)
+        if excesso > 0:
+            for chave, _ in sorted(self._baldes.items(), key=lambda item: item[1][1])[:excesso]:
+                del self._baldes[chave]
+            logger.warning(f"⚠️ Limitador de login cheio; {excesso} chaves mais antigas descartadas")
+
+        self._proxima_limpeza = agora + self.intervalo_limpeza
+
+    def __len__(self) -> int:
+        return len(self._baldes)
+
+
+# ==========================================================
+# Backend compartilhado (Redis, opcional)
+# ==========================================================
+_SCRIPT_BALDE = """
+local capacidade = tonumber(ARGV[1])
+local taxa = tonumber(ARGV[2])
+local agora = tonumber(ARGV[3])
+local balde = redis.call('HMGET', KEYS[1], 'f', 't')
+local fichas = tonumber(balde[1]) or capacidade
+local instante = tonumber(balde[2]) or agora
+fichas = math.min(capacidade, fichas + math.max(agora - instante, 0) * taxa)
+local permitido = 0
+if fichas >= 1 then
+    fichas = fichas - 1
+    permitido = 1
+end
+redis.call('HSET', KEYS[1], 'f', fichas, 't', agora)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacidade / taxa) + 1)
+return {permitido, tostring(fichas)}
+"""
+
+
+class BaldesRedis:
+    """Mesmo algoritmo, executado atomicamente no Redis (script Lua)."""
+
+    def __init__(self, url: str, prefixo: str = "petdor:login:"):
+        import redis  # dependência opcional
+
+        self.prefixo = prefixo
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._script = self._cliente.register_script(_SCRIPT_BALDE)
+
+    def consumir(self, chave: str, capacidade: int, janela: float) -> Tuple[bool, float]:
+        taxa = capacidade / janela
+        permitido, fichas = self._script(keys=[self.prefixo + chave], args=[capacidade, taxa, time.time()])
+        if int(permitido):
+            return True, 0.0
+        return False, (1.0 - float(fichas)) / taxa
+
+    def reiniciar(self, chave: str) -> None:
+        self._cliente.delete(self.prefixo + chave)
+
+
+# ==========================================================
+# Limitador de login
+# ==========================================================
+class LimitadorLogin:
+    """Aplica os limites por e-mail e por IP sobre o backend configurado."""
+
+    def __init__(
+        self,
+        limite_email: int = 5,
+        limite_ip: int = 20,
+        janela_segundos: float = 300.0,
+        redis_url: str = "",
+    ):
+        self.limite_email = limite_email
+        self.limite_ip = limite_ip
+        self.janela = janela_segundos
+        self._local = BaldesLocais()
+        self._compartilhado = None
+        if redis_url:
+            try:
+                self._compartilhado = BaldesRedis(redis_url)
+                logger.info("🔒 Limitador de login usando Redis compartilhado")
+            except Exception as e:
+                logger.warning(f"⚠️ Redis indisponível para o limitador de login ({e}); usando memória local")
+
+    @staticmethod
+    def chave_email(email: str) -> str:
+        # Não guarda o e-mail em claro nos contadores
+        return "email:" + hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def chave_ip(ip: str) -> str:
+        return f"ip:{ip}"
+
+    def _consumir(self, chave: str, capacidade: int) -> Tuple[bool, float]:
+        if self._compartilhado is not None:
+            try:
+                return self._compartilhado.consumir(chave, capacidade, self.janela)
+            except Exception as e:
+                logger.warning(f"⚠️ Falha no Redis do limitador ({e}); usando memória local")
+        return self._local.consumir(chave, capacidade, self.janela)
+
+    def verificar(self, email: str, ip: Optional[str] = None) -> ResultadoLimite:
+        """Consome uma tentativa para o IP e para o e-mail."""
+        verificacoes = [(self.chave_email(email), self.limite_email)]
+        if ip:
+            # IP primeiro: um ataque distribuído por e-mails esbarra no IP
+            verificacoes.insert(0, (self.chave_ip(ip), self.limite_ip))
+
+        for chave, capacidade in verificacoes:
+            permitido, espera = self._consumir(chave, capacidade)
+            if not permitido:
+                logger.debug(f"Login limitado ({chave.split(':')[0]}); nova tentativa em {espera:.0f}s")
+                return ResultadoLimite(False, espera, chave)
+        return ResultadoLimite(True)
+
+    def registrar_sucesso(self, email: str) -> None:
+        """Login bem-sucedido zera o contador do e-mail (não o do IP)."""
+        chave = self.chave_email(email)
+        self._local.reiniciar(chave)
+        if self._compartilhado is not None:
+            try:
+                self._compartilhado.reiniciar(chave)
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao reiniciar contador no Redis: {e}")
+
+
+def ip_encaminhado(
+    encaminhado: Optional[str],
+    ip_socket: Optional[str],
+    proxies_confiaveis: int = LOGIN_PROXIES_CONFIAVEIS,
+) -> Optional[str]:
+    """
+    IP do cliente a partir do X-Forwarded-For. As entradas à esquerda são
+    enviadas pelo próprio cliente (forjáveis); vale a que o proxy confiável
+    mais externo acrescentou: a `proxies_confiaveis`-ésima pela direita.
+    Sem header (ou com menos entradas que proxies), usa o socket.
+    """
+    if not encaminhado or proxies_confiaveis <= 0:
+        return ip_socket
+    enderecos = [e.strip() for e in encaminhado.split(",") if e.strip()]
+    if len(enderecos) < proxies_confiaveis:
+        return ip_socket
+    return enderecos[-proxies_confiaveis]
+
+
+def obter_ip_cliente() -> Optional[str]:
+    """
+    IP do cliente da sessão Streamlit atual (X-Forwarded-For quando atrás
+    de proxy). Retorna None fora de uma sessão ou se não for possível obter.
+    """
+    try:
+        import streamlit as st
+
+        contexto = getattr(st, "context", None)  # Streamlit >= 1.37
+        if contexto is not None:
+            return ip_encaminhado(
+                contexto.headers.get("X-Forwarded-For"),
+                getattr(contexto, "ip_address", None),
+            )
+
+        from streamlit.runtime import get_instance
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+        cliente = get_instance().get_client(ctx.session_id)
+        requisicao = getattr(cliente, "request", None)
+        if requisicao is None:
+            return None
+        return ip_encaminhado(requisicao.headers.get("X-Forwarded-For"), requisicao.remote_ip)
+    except Exception:
+        return None
+
+
+# Instância única por processo
+limitador_login = LimitadorLogin(
+    limite_email=LOGIN_LIMITE_EMAIL,
+    limite_ip=LOGIN_LIMITE_IP,
+    janela_segundos=LOGIN_JANELA_SEGUNDOS,
+    redis_url=RATE_LIMIT_REDIS_URL,
+)
+
+
+__all__ = [
+    "ResultadoLimite",
+    "BaldesLocais",
+    "BaldesRedis",
+    "LimitadorLogin",
+    "limitador_login",
+    "ip_encaminhado",
+    "obter_ip_cliente",
+]
@@ -12,13 +12,19 @@ from typing import Tuple, Dict, Any
 from backend.auth.security import (
     gerar_token_reset_senha,
     validar_token_reset_senha,
-    hash_password,
+    gerar_hash_senha,
 )
 
 # Função correta do email_sender (sem nome, sem token separado)
 from backend.utils.email_sender import enviar_email_recuperacao_senha
 
-from backend.database.supabase_client import get_supabase
+from backend.auth.executor import AutenticacaoSobrecarregada
+from backend.database.supabase_client import (
+    supabase_table_select,
+    supabase_table_update,
+    supabase_table_count,
+    supabase_table_update_condicional,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,18 +39,17 @@ def solicitar_reset_senha(email: str) -> Tuple[bool, str]:
     """
 
     try:
-        supabase = get_supabase()
-
         # Encontrar usuário
-        response = (
-            supabase.from_("usuarios")
-            .select("id, nome, email")
-            .eq("email", email.lower())
-            .single()
-            .execute()
+        linhas = supabase_table_select(
+            "usuarios",
+            "id, nome, email",
+            {"email": email.lower()},
+            limit=1,
         )
+        if linhas is None:
+            return False, "Erro interno ao solicitar recuperação."
 
-        usuario = response.data
+        usuario = linhas[0] if linhas else None
 
         # Por segurança, nunca revelar se o email existe
         if not usuario:
@@ -52,21 +57,23 @@ def solicitar_reset_senha(email: str) -> Tuple[bool, str]:
 
         usuario_id = usuario["id"]
 
-        # Criar token JWT
+        # Criar token assinado (serviço de tokens)
         token = gerar_token_reset_senha(usuario_id, email)
 
         expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
 
         # Salvar token no banco
-        supabase.from_("usuarios").update({
+        salvo = supabase_table_update("usuarios", {"id": usuario_id}, {
             "reset_password_token": token,
             "reset_password_expires": expires_at.isoformat()
-        }).eq("id", usuario_id).execute()
+        })
+        if salvo is None:
+            return False, "Erro interno ao solicitar recuperação."
 
         # URL que será enviada ao usuário
         link_recuperacao = f"https://petdor.streamlit.app/resetar_senha?token={token}"
 
-        # Chamada correta do email_sender
+        # Enfileira o e-mail; a entrega (com novas tentativas) fica com a fila de envio
         ok_email, msg_email = enviar_email_recuperacao_senha(
             destinatario_email=email,
             link_recuperacao=link_recuperacao
@@ -83,12 +90,41 @@ def solicitar_reset_senha(email: str) -> Tuple[bool, str]:
         return False, "Erro interno ao solicitar recuperação."
 
 
+# ======================================================================
+#  CONDIÇÃO DE TOKEN VÁLIDO (avaliada pelo banco)
+# ======================================================================
+def _filtro_token_valido(usuario_id: Any, token: str) -> Dict[str, Any]:
+    """
+    Token salvo igual ao recebido e ainda não expirado. "now" é avaliado
+    pelo Postgres, sem depender do relógio da aplicação.
+    """
+    return {
+        "id": usuario_id,
+        "reset_password_token": token,
+        "reset_password_expires": {"gt": "now"},
+    }
+
+
+def _token_ja_consumido(usuario_id: Any) -> bool:
+    """
+    Depois de um PATCH sem resposta (erro de transporte): o token do
+    usuário já foi limpo? Olha só o token consumido, nunca a senha, para
+    não virar um oráculo de senhas.
+    """
+    limpos = supabase_table_count(
+        "usuarios",
+        {"id": usuario_id, "reset_password_token": None, "reset_password_expires": None},
+    )
+    return bool(limpos)
+
+
 # ======================================================================
 #  VALIDAR TOKEN DE REDEFINIÇÃO
 # ======================================================================
 def validar_token_reset(token: str) -> Tuple[bool, Dict[str, Any]]:
     """
-    Valida o token no JWT e no banco de dados.
+    Valida o token (assinatura e expiração) e confere no banco, com um
+    HEAD count, se ele ainda é o token ativo do usuário.
     """
 
     try:
@@ -99,31 +135,13 @@ def validar_token_reset(token: str) -> Tuple[bool, Dict[str, Any]]:
 
         usuario_id = payload.get("usuario_id")
 
-        supabase = get_supabase()
-        resp = (
-            supabase.from_("usuarios")
-            .select("id, email, reset_password_token, reset_password_expires")
-            .eq("id", usuario_id)
-            .single()
-            .execute()
-        )
-
-        usuario = resp.data
-        if not usuario:
-            return False, {"erro": "Token inválido."}
-
-        # Token salvo no banco deve ser igual ao recebido
-        if usuario["reset_password_token"] != token:
-            return False, {"erro": "Token inválido ou já utilizado."}
-
-        expires = datetime.fromisoformat(
-            usuario["reset_password_expires"]
-        ).replace(tzinfo=timezone.utc)
+        ativos = supabase_table_count("usuarios", _filtro_token_valido(usuario_id, token))
+        if ativos is None:
+            return False, {"erro": "Erro interno ao validar token."}
+        if ativos == 0:
+            return False, {"erro": "Token inválido, expirado ou já utilizado."}
 
-        if expires < datetime.now(timezone.utc):
-            return False, {"erro": "Token expirado."}
-
-        return True, {"email": usuario["email"], "usuario_id": usuario["id"]}
+        return True, {"email": payload.get("email"), "usuario_id": usuario_id}
 
     except Exception as e:
         logger.error(f"Erro em validar_token_reset: {e}", exc_info=True)
@@ -135,27 +153,42 @@ def validar_token_reset(token: str) -> Tuple[bool, Dict[str, Any]]:
 # ======================================================================
 def redefinir_senha_com_token(token: str, nova_senha: str) -> Tuple[bool, str]:
     """
-    Valida token, valida a senha e aplica nova senha ao usuário.
+    Valida a senha e aplica a nova senha com um único PATCH condicional:
+    só altera a linha se o token salvo ainda for o recebido e não tiver
+    expirado, e consome o token na mesma operação (uso único, sem corrida
+    entre duas abas com o mesmo link).
     """
 
     try:
-        valido, dados = validar_token_reset(token)
-        if not valido:
-            return False, dados["erro"]
-
-        usuario_id = dados["usuario_id"]
+        payload = validar_token_reset_senha(token)
+        if not payload:
+            return False, "Token inválido ou expirado."
 
         if len(nova_senha) < 8:
             return False, "Senha deve ter pelo menos 8 caracteres."
 
-        hashed = hash_password(nova_senha)
+        try:
+            hashed = gerar_hash_senha(nova_senha)
+        except AutenticacaoSobrecarregada as e:
+            return False, e.mensagem
+
+        afetadas = supabase_table_update_condicional(
+            "usuarios",
+            _filtro_token_valido(payload.get("usuario_id"), token),
+            {
+                "senha_hash": hashed,
+                "reset_password_token": None,
+                "reset_password_expires": None,
+            },
+        )
 
-        supabase = get_supabase()
-        supabase.from_("usuarios").update({
-            "senha_hash": hashed,
-            "reset_password_token": None,
-            "reset_password_expires": None
-        }).eq("id", usuario_id).execute()
+        if afetadas is None:
+            # A escrita pode ter sido aplicada e só a resposta se perdeu
+            if _token_ja_consumido(payload.get("usuario_id")):
+                return True, "Senha redefinida com sucesso."
+            return False, "Erro interno ao redefinir senha."
+        if afetadas == 0:
+            return False, "Token inválido, expirado ou já utilizado."
 
         return True, "Senha redefinida com sucesso."
 
@@ -1,10 +1,114 @@
 # PetDor2/backend/auth/security.py
 import streamlit as st
 import bcrypt
-import jwt
-from datetime import datetime, timedelta
+import logging
+import threading
+import time
+from datetime import timedelta
 import secrets
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+from backend.auth.executor import executor_auth
+from backend.utils.config import (
+    AUTH_BCRYPT_ORCAMENTO_MS,
+    AUTH_BCRYPT_CUSTO_MIN,
+    AUTH_BCRYPT_CUSTO_MAX,
+    AUTH_BCRYPT_CUSTO,
+)
+from backend.utils.tokens import (
+    TIPO_SESSAO,
+    TIPO_CONFIRMACAO_EMAIL,
+    TIPO_RESET_SENHA,
+    TokenExpirado,
+    TokenInvalido,
+    decodificar_token,
+    emitir_token,
+    rotacionar_chaves,
+    validar_token,
+)
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# Custo do bcrypt calibrado para o host
+# ==========================================================
+_custo_bcrypt: Optional[int] = None
+_calibracao_lock = threading.Lock()
+_calibracao_iniciada = False
+
+
+def calibrar_custo_bcrypt(
+    orcamento_ms: float = AUTH_BCRYPT_ORCAMENTO_MS,
+    minimo: int = AUTH_BCRYPT_CUSTO_MIN,
+    maximo: int = AUTH_BCRYPT_CUSTO_MAX,
+) -> int:
+    """
+    Mede o bcrypt neste host e retorna o maior custo cujo hash cabe no
+    orçamento de latência (cada +1 no custo dobra o tempo).
+    """
+    amostra = secrets.token_urlsafe(16).encode("utf-8")
+    base = float("inf")
+    for _ in range(2):
+        inicio = time.perf_counter()
+        bcrypt.hashpw(amostra, bcrypt.gensalt(rounds=minimo))
+        base = min(base, time.perf_counter() - inicio)
+
+    custo = minimo
+    while custo < maximo and base * 2 ** (custo + 1 - minimo) * 1000 <= orcamento_ms:
+        custo += 1
+    logger.info(
+        f"🔐 Custo bcrypt calibrado: {custo} "
+        f"(~{base * 2 ** (custo - minimo) * 1000:.0f} ms; orçamento {orcamento_ms:.0f} ms)"
+    )
+    return custo
+
+
+def custo_bcrypt_alvo() -> int:
+    """
+    Custo usado para novos hashes (calibrado uma vez por processo).
+
+    AUTH_BCRYPT_CUSTO > 0 fixa o custo; o valor calibrado nunca fica abaixo
+    de AUTH_BCRYPT_CUSTO_MIN, mesmo em um host lento.
+    """
+    global _custo_bcrypt
+    if _custo_bcrypt is None:
+        with _calibracao_lock:
+            if _custo_bcrypt is None:
+                if AUTH_BCRYPT_CUSTO > 0:
+                    # Faixa aceita pelo bcrypt
+                    _custo_bcrypt = min(max(AUTH_BCRYPT_CUSTO, 4), 31)
+                else:
+                    calibrado = calibrar_custo_bcrypt()
+                    _custo_bcrypt = max(AUTH_BCRYPT_CUSTO_MIN, min(calibrado, AUTH_BCRYPT_CUSTO_MAX))
+    return _custo_bcrypt
+
+
+def iniciar_calibracao_bcrypt() -> None:
+    """Calibra o custo em segundo plano (chamar na inicialização do app)."""
+    global _calibracao_iniciada
+    with _calibracao_lock:
+        if _calibracao_iniciada or _custo_bcrypt is not None:
+            return
+        _calibracao_iniciada = True
+    threading.Thread(target=custo_bcrypt_alvo, name="calibracao-bcrypt", daemon=True).start()
+
+
+def custo_do_hash(hash_senha: str) -> Optional[int]:
+    """Extrai o custo de um hash bcrypt ("$2b$12$..." → 12)."""
+    partes = str(hash_senha).split("$")
+    if len(partes) < 4 or not partes[2].isdigit():
+        return None
+    return int(partes[2])
+
+
+def precisa_rehash(hash_senha: str) -> bool:
+    """
+    True se o hash foi gerado com custo menor que o alvo atual. Hashes mais
+    fortes (de um host mais rápido ou de um custo fixado antes) são mantidos.
+    """
+    custo = custo_do_hash(hash_senha)
+    return custo is None or custo < custo_bcrypt_alvo()
+
 
 def gerar_hash_senha(senha: str) -> str:
     """
@@ -15,9 +119,12 @@ def gerar_hash_senha(senha: str) -> str:
 
     Returns:
         Hash da senha
+
+    Raises:
+        AutenticacaoSobrecarregada: executor de autenticação saturado
     """
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(senha.encode('utf-8'), salt).decode('utf-8')
+    salt = bcrypt.gensalt(rounds=custo_bcrypt_alvo())
+    return executor_auth.executar(bcrypt.hashpw, senha.encode('utf-8'), salt).decode('utf-8')
 
 def verificar_senha(senha: str, hash_senha: str) -> bool:
     """
@@ -29,8 +136,21 @@ def verificar_senha(senha: str, hash_senha: str) -> bool:
 
     Returns:
         True se a senha estiver correta, False caso contrário
+
+    Raises:
+        AutenticacaoSobrecarregada: executor de autenticação saturado
     """
-    return bcrypt.checkpw(senha.encode('utf-8'), hash_senha.encode('utf-8'))
+    return executor_auth.executar(bcrypt.checkpw, senha.encode('utf-8'), hash_senha.encode('utf-8'))
+
+# ==========================================================
+# Tokens (delegam ao serviço unificado em backend/utils/tokens.py)
+# ==========================================================
+def rotacionar_chave_secreta(chaves: Optional[Dict[str, str]] = None, chave_ativa: Optional[str] = None) -> None:
+    """
+    Aplica um novo chaveiro (ou relê SECRET_KEYS/SECRET_KEY) e descarta
+    o cache de tokens verificados.
+    """
+    rotacionar_chaves(chaves, chave_ativa)
 
 def gerar_token(usuario_id: int, email: str, tipo_usuario: str, is_admin: bool = False, expiracao_horas: int = 24) -> str:
     """
@@ -47,20 +167,14 @@ def gerar_token(usuario_id: int, email: str, tipo_usuario: str, is_admin: bool =
         Token JWT assinado
     """
     try:
-        secret_key = st.secrets.get("SECRET_KEY", "chave-secreta-padrao-desenvolvimento")
-
-        payload = {
+        claims = {
             "id": str(usuario_id),  # Convertido para string para compatibilidade
             "user_id": str(usuario_id),  # Alias para auth.jwt()->>'user_id'
             "email": email,
             "tipo_usuario": tipo_usuario,
             "is_admin": is_admin,
-            "exp": datetime.utcnow() + timedelta(hours=expiracao_horas),
-            "iat": datetime.utcnow()
         }
-
-        token = jwt.encode(payload, secret_key, algorithm="HS256")
-        return token
+        return emitir_token(TIPO_SESSAO, claims, timedelta(hours=expiracao_horas))
     except Exception as e:
         st.error(f"Erro ao gerar token: {e}")
         return None
@@ -74,38 +188,61 @@ def verificar_token(token: str) -> Optional[Dict[str, Any]]:
 
     Returns:
         Dicionário com os dados do usuário ou None se inválido
+
+    Tokens já verificados ficam em cache até o `exp`; a verificação HMAC
+    só roda na primeira vez.
     """
     try:
-        secret_key = st.secrets.get("SECRET_KEY", "chave-secreta-padrao-desenvolvimento")
-        payload = jwt.decode(token, secret_key, algorithms=["HS256"])
+        payload = decodificar_token(token)
+        if payload.get("tipo", TIPO_SESSAO) != TIPO_SESSAO:
+            raise TokenInvalido("Token de outra finalidade")
         return payload
-    except jwt.ExpiredSignatureError:
+    except TokenExpirado:
         st.error("Token expirado. Faça login novamente.")
         return None
-    except jwt.InvalidTokenError:
+    except TokenInvalido:
         st.error("Token inválido.")
         return None
     except Exception as e:
         st.error(f"Erro ao verificar token: {e}")
         return None
 
-def gerar_token_confirmacao_email() -> str:
+def gerar_token_confirmacao_email(email: str, user_id: Any) -> str:
+    """
+    Gera um token assinado para confirmação de email.
+
+    Returns:
+        Token com email e user_id, válido por 24 horas
+    """
+    return emitir_token(TIPO_CONFIRMACAO_EMAIL, {"email": email, "user_id": str(user_id)})
+
+def validar_token_confirmacao_email(token: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Valida um token de confirmação de email (sem consultar o banco).
+
+    Returns:
+        Tupla (payload ou None, mensagem)
+    """
+    return validar_token(token, TIPO_CONFIRMACAO_EMAIL)
+
+def gerar_token_reset_senha(usuario_id: Any, email: str) -> str:
     """
-    Gera um token seguro para confirmação de email.
+    Gera um token assinado para reset de senha.
 
     Returns:
-        Token aleatório de 32 caracteres hexadecimais
+        Token com usuario_id e email, válido por 1 hora
     """
-    return secrets.token_urlsafe(32)
+    return emitir_token(TIPO_RESET_SENHA, {"usuario_id": str(usuario_id), "email": email})
 
-def gerar_token_reset_senha() -> str:
+def validar_token_reset_senha(token: str) -> Optional[Dict[str, Any]]:
     """
-    Gera um token seguro para reset de senha.
+    Valida assinatura, expiração e finalidade de um token de reset.
 
     Returns:
-        Token aleatório de 32 caracteres hexadecimais
+        Payload do token ou None se inválido
     """
-    return secrets.token_urlsafe(32)
+    payload, _ = validar_token(token, TIPO_RESET_SENHA)
+    return payload
 
 def validar_forca_senha(senha: str) -> tuple[bool, str]:
     """
@@ -144,11 +281,14 @@ def fazer_login(email: str, senha: str) -> Optional[Dict[str, Any]]:
     """
     from backend.auth.user import verificar_credenciais
 
-    usuario = verificar_credenciais(email, senha)
+    ok, resultado = verificar_credenciais(email, senha)
 
-    if not usuario:
+    if not ok:
+        st.error(resultado)
         return None
 
+    usuario = resultado
+
     if not usuario.get("ativo", False):
         st.error("Usuário inativo. Entre em contato com o suporte.")
         return None
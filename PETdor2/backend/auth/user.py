@@ -1,12 +1,19 @@
 ## backend/auth/user.py
 
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, Iterable, Optional, Tuple, Union
 from backend.database import (
     supabase_table_select,
     supabase_table_insert,
     supabase_table_update,
     supabase_table_delete,
 )
+from backend.database.projecoes import USER_LOGIN
+from backend.auth.executor import AutenticacaoSobrecarregada
+from backend.auth.limitador import limitador_login, obter_ip_cliente
+from backend.auth.security import gerar_hash_senha, verificar_senha, precisa_rehash
+
+logger = logging.getLogger(__name__)
 
 
 # ----------------------------------------------
@@ -42,6 +49,76 @@ def autenticar_usuario(email: str, senha_hash: str):
     return True, user
 
 
+# ----------------------------------------------
+# Login (e-mail + senha em texto plano)
+# ----------------------------------------------
+def verificar_credenciais(
+    email: str,
+    senha: str,
+    ip: Optional[str] = None,
+) -> Tuple[bool, Union[Dict[str, Any], str]]:
+    """
+    Confere e-mail e senha contra `senha_hash` (bcrypt).
+
+    Antes de tudo aplica o limite de tentativas por e-mail e por IP
+    (`ip` padrão: IP do cliente da sessão); tentativas rejeitadas não
+    consultam o banco nem calculam hash.
+
+    Se a senha estiver correta mas o hash tiver custo menor que o alvo
+    calibrado, gera um novo hash e grava (rehash transparente no login).
+
+    Returns:
+        (True, usuário sem o hash) ou (False, mensagem de erro)
+    """
+    limite = limitador_login.verificar(email, ip or obter_ip_cliente())
+    if not limite.permitido:
+        return False, limite.mensagem
+
+    linhas = supabase_table_select(
+        "usuarios",
+        USER_LOGIN,
+        filters={"email": email.lower().strip()},
+        limit=1,
+        permitir_sensiveis=True,
+    )
+    if linhas is None:
+        return False, "Erro ao consultar usuário. Tente novamente."
+    if not linhas or not linhas[0].get("senha_hash"):
+        return False, "E-mail ou senha incorretos."
+
+    usuario = linhas[0]
+    hash_atual = usuario.pop("senha_hash")
+    try:
+        if not verificar_senha(senha, hash_atual):
+            return False, "E-mail ou senha incorretos."
+    except AutenticacaoSobrecarregada as e:
+        return False, e.mensagem
+    except ValueError:
+        logger.error(f"Hash de senha inválido para o usuário {usuario.get('id')}")
+        return False, "E-mail ou senha incorretos."
+
+    limitador_login.registrar_sucesso(email)
+
+    if precisa_rehash(hash_atual):
+        _rehash_senha(usuario["id"], senha, hash_atual)
+
+    return True, usuario
+
+
+def _rehash_senha(user_id: Any, senha: str, hash_atual: str) -> None:
+    """Regrava o hash com o custo alvo. Falhas não impedem o login."""
+    try:
+        novo_hash = gerar_hash_senha(senha)
+    except AutenticacaoSobrecarregada:
+        # Sob carga, o rehash fica para o próximo login
+        return
+    # Filtra também pelo hash antigo: não sobrescreve uma troca de senha concorrente
+    if supabase_table_update("usuarios", {"id": user_id, "senha_hash": hash_atual}, {"senha_hash": novo_hash}) is None:
+        logger.warning(f"⚠️ Falha ao regravar o hash de senha do usuário {user_id}")
+    else:
+        logger.info(f"🔐 Hash de senha do usuário {user_id} atualizado para o custo atual")
+
+
 # ----------------------------------------------
 # Atualizar usuário
 # ----------------------------------------------
@@ -53,6 +130,20 @@ def atualizar_usuario(user_id: str, dados: Dict[str, Any]):
     )
 
 
+# ----------------------------------------------
+# Atualizar vários usuários (um único PATCH)
+# ----------------------------------------------
+def atualizar_usuarios_em_lote(user_ids: Iterable[Any], dados: Dict[str, Any]):
+    """
+    Aplica os mesmos dados a vários usuários com um PATCH id=in.(...).
+    Retorna a lista de usuários atualizados (vazia se não houver IDs).
+    """
+    ids = sorted(set(user_ids))
+    if not ids:
+        return []
+    return supabase_table_update("usuarios", {"id": ids}, dados)
+
+
 # ----------------------------------------------
 # Deletar usuário
 # ----------------------------------------------
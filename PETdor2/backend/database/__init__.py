@@ -2,18 +2,55 @@
 
 from .supabase_client import (
     get_supabase,
+    aquecer_supabase,
+    aguardar_supabase,
+    verificar_conexao,
+    supabase_pronto,
+    supabase_vivo,
+    estado_conexao,
     testar_conexao,
     supabase_table_select,
+    supabase_table_select_pagina,
+    supabase_table_query,
     supabase_table_insert,
+    supabase_table_upsert,
+    supabase_table_bulk_insert,
+    supabase_table_bulk_upsert,
     supabase_table_update,
+    supabase_table_update_condicional,
     supabase_table_delete,
+    supabase_table_count,
+    supabase_table_aggregate,
+    supabase_rpc,
 )
+from .consulta import Consulta, col, ou, e_
+from .supabase_async import carregar_em_paralelo
 
 __all__ = [
     "get_supabase",
+    "aquecer_supabase",
+    "aguardar_supabase",
+    "verificar_conexao",
+    "supabase_pronto",
+    "supabase_vivo",
+    "estado_conexao",
     "testar_conexao",
     "supabase_table_select",
+    "supabase_table_select_pagina",
+    "supabase_table_query",
     "supabase_table_insert",
+    "supabase_table_upsert",
+    "supabase_table_bulk_insert",
+    "supabase_table_bulk_upsert",
     "supabase_table_update",
+    "supabase_table_update_condicional",
     "supabase_table_delete",
+    "supabase_table_count",
+    "supabase_table_aggregate",
+    "supabase_rpc",
+    "Consulta",
+    "col",
+    "ou",
+    "e_",
+    "carregar_em_paralelo",
 ]
@@ -0,0 +1,197 @@
+# PETdor2/backend/database/cache.py
+"""
+Cache em memória (TTL + LRU) para consultas de leitura ao Supabase.
+
+Cada entrada é indexada pelas tabelas de que depende. As escritas feitas
+pelos helpers REST (insert/update/delete) chamam `invalidar_tabelas`, que
+descarta apenas as chaves dessas tabelas, sem limpar o cache inteiro.
+"""
+
+import copy
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+import streamlit as st
+
+from backend.utils.config import SUPABASE_CACHE_TTL, SUPABASE_CACHE_MAX_ITENS
+
+logger = logging.getLogger(__name__)
+
+# TTL padrão (segundos) para as consultas das páginas
+TTL_PADRAO = SUPABASE_CACHE_TTL
+
+
+class CacheConsultas:
+    """
+    Cache LRU com expiração por entrada, seguro para várias threads
+    (o Streamlit atende cada sessão em uma thread própria).
+    """
+
+    def __init__(self, max_itens: int = 1024):
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._por_tabela: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable) -> Tuple[bool, Any]:
+        """Retorna (encontrado, valor). O valor é uma cópia independente."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return False, None
+
+            expira_em, valor, _ = item
+            if expira_em <= time.monotonic():
+                self._remover(chave)
+                self.falhas += 1
+                return False, None
+
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+        return True, copy.deepcopy(valor)
+
+    def guardar(self, chave: Hashable, valor: Any, tabelas: Iterable[str], ttl: float) -> None:
+        """Armazena o valor associado às tabelas de que ele depende."""
+        tabelas = tuple(tabelas)
+        valor = copy.deepcopy(valor)
+        with self._lock:
+            if chave in self._itens:
+                self._remover(chave)
+            self._itens[chave] = (time.monotonic() + ttl, valor, tabelas)
+            for tabela in tabelas:
+                self._por_tabela.setdefault(tabela, set()).add(chave)
+
+            while len(self._itens) > self.max_itens:
+                chave_antiga = next(iter(self._itens))
+                self._remover(chave_antiga)
+
+    def invalidar_tabelas(self, *tabelas: str) -> int:
+        """Remove todas as entradas que dependem das tabelas informadas."""
+        removidas = 0
+        with self._lock:
+            for tabela in tabelas:
+                for chave in list(self._por_tabela.get(tabela, ())):
+                    self._remover(chave)
+                    removidas += 1
+        if removidas:
+            logger.debug(f"Cache: {removidas} entrada(s) invalidada(s) para {tabelas}")
+        return removidas
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self._por_tabela.clear()
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {"itens": len(self._itens), "acertos": self.acertos, "falhas": self.falhas}
+
+    def _remover(self, chave: Hashable) -> None:
+        # Chamado sempre com o lock adquirido
+        item = self._itens.pop(chave, None)
+        if item is None:
+            return
+        for tabela in item[2]:
+            chaves = self._por_tabela.get(tabela)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._por_tabela[tabela]
+
+
+# Instância única por processo, compartilhada entre as sessões
+consultas_cache = CacheConsultas(max_itens=SUPABASE_CACHE_MAX_ITENS)
+
+
+def identidade_usuario() -> str:
+    """
+    Identifica o usuário da sessão para compor as chaves do cache.
+    Usa um hash do JWT (as políticas de RLS dependem dele); sem token,
+    todas as sessões anônimas compartilham a mesma identidade.
+    """
+    try:
+        token = st.session_state.get("token")
+    except Exception:
+        token = None
+    if not token:
+        return "anon"
+    return hashlib.sha256(str(token).encode("utf-8")).hexdigest()[:16]
+
+
+def invalidar_tabelas(*tabelas: str) -> int:
+    """Invalida as consultas em cache que dependem das tabelas."""
+    return consultas_cache.invalidar_tabelas(*tabelas)
+
+
+class NaoArmazenar:
+    """
+    Resultado que não deve ir para o cache: o valor padrão devolvido após
+    uma falha. `cache_consulta` devolve `valor` sem armazená-lo, para que a
+    próxima execução consulte o banco de novo.
+    """
+
+    __slots__ = ("valor",)
+
+    def __init__(self, valor: Any):
+        self.valor = valor
+
+
+def cache_consulta(tabelas: Iterable[str], ttl: Optional[float] = None) -> Callable:
+    """
+    Decorator para funções de leitura que combinam várias consultas
+    (ex.: avaliações + pets, com fallback).
+
+    A chave combina usuário, função e argumentos; a entrada é invalidada
+    quando qualquer uma das `tabelas` recebe uma escrita. Só resultados de
+    sucesso são armazenados: exceções se propagam sem cache e funções que
+    tratam a falha devolvem o valor padrão em `NaoArmazenar(...)`.
+    """
+    tabelas = tuple(tabelas)
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            ttl_efetivo = TTL_PADRAO if ttl is None else ttl
+            if not ttl_efetivo:
+                valor = func(*args, **kwargs)
+                return valor.valor if isinstance(valor, NaoArmazenar) else valor
+
+            chave = (
+                identidade_usuario(),
+                func.__module__,
+                func.__qualname__,
+                args,
+                tuple(sorted(kwargs.items())),
+            )
+            encontrado, valor = consultas_cache.obter(chave)
+            if encontrado:
+                return valor
+
+            valor = func(*args, **kwargs)
+            if isinstance(valor, NaoArmazenar):
+                return valor.valor
+            consultas_cache.guardar(chave, valor, tabelas, ttl_efetivo)
+            return valor
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    "TTL_PADRAO",
+    "CacheConsultas",
+    "consultas_cache",
+    "identidade_usuario",
+    "invalidar_tabelas",
+    "NaoArmazenar",
+    "cache_consulta",
+]
@@ -0,0 +1,285 @@
+# PETdor2/backend/database/consulta.py
+"""
+Construtor tipado de consultas PostgREST.
+
+Monta filtros (eq, neq, gt, gte, lt, lte, in, ilike, is), combinações
+`or`/`and`, projeção de colunas, ordenação, limite/offset, faixa (header
+Range) e modo de contagem, e compila tudo para os parâmetros e headers do
+PostgREST. O filtro é aplicado no banco, onde estão os índices.
+
+Exemplo:
+    consulta = (
+        Consulta("avaliacoes")
+        .select("id", "pet_id", "percentual_dor", "data_avaliacao")
+        .eq("usuario_id", usuario_id)
+        .gte("data_avaliacao", inicio.isoformat())
+        .ou(col("percentual_dor").gte(60), col("especie").in_(["gato", "coelho"]))
+        .order("data_avaliacao", desc=True)
+        .faixa(0, 49)
+        .contar("exact")
+    )
+    linhas, total = consulta.executar()
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Union
+
+from backend.database.projecoes import projecao_padrao
+
+Operador = Literal["eq", "neq", "gt", "gte", "lt", "lte", "in", "ilike", "is"]
+ModoContagem = Literal["exact", "planned", "estimated"]
+
+OPERADORES = frozenset({"eq", "neq", "gt", "gte", "lt", "lte", "in", "ilike", "is"})
+MODOS_CONTAGEM = frozenset({"exact", "planned", "estimated"})
+_VALORES_IS = frozenset({"null", "true", "false", "unknown"})
+
+# Caracteres reservados dentro de listas `in.(...)` e expressões `or=(...)`
+_RESERVADOS = frozenset(',.:()" \\')
+
+
+def _formatar(valor: Any) -> str:
+    if isinstance(valor, bool):
+        return str(valor).lower()
+    if valor is None:
+        return "null"
+    return str(valor)
+
+
+def _citar(valor: Any) -> str:
+    """Valor formatado, entre aspas se tiver caracteres reservados."""
+    texto = _formatar(valor)
+    if any(c in _RESERVADOS for c in texto):
+        return '"' + texto.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return texto
+
+
+# ==========================================================
+# Condições
+# ==========================================================
+@dataclass(frozen=True)
+class Condicao:
+    coluna: str
+    operador: Operador
+    valor: Any
+    negada: bool = False
+
+    def __post_init__(self):
+        if self.operador not in OPERADORES:
+            raise ValueError(f"Operador não suportado: {self.operador}")
+        if self.operador == "is" and _formatar(self.valor) not in _VALORES_IS:
+            raise ValueError(f"'is' aceita apenas null/true/false/unknown, não {self.valor!r}")
+        if self.operador == "in" and isinstance(self.valor, (str, bytes)):
+            raise ValueError("'in' espera uma lista de valores")
+
+    def negar(self) -> "Condicao":
+        return Condicao(self.coluna, self.operador, self.valor, not self.negada)
+
+    def _operacao(self, embutida: bool) -> str:
+        prefixo = "not." if self.negada else ""
+        if self.operador == "in":
+            return f"{prefixo}in.({','.join(_citar(v) for v in self.valor)})"
+        valor = _citar(self.valor) if embutida else _formatar(self.valor)
+        return f"{prefixo}{self.operador}.{valor}"
+
+    def parametro(self) -> Tuple[str, str]:
+        """Forma de query string: (coluna, "op.valor")."""
+        return self.coluna, self._operacao(embutida=False)
+
+    def expressao(self) -> str:
+        """Forma usada dentro de or/and: "coluna.op.valor"."""
+        return f"{self.coluna}.{self._operacao(embutida=True)}"
+
+
+@dataclass(frozen=True)
+class Grupo:
+    """Combinação lógica de condições (`or` / `and`), podendo aninhar grupos."""
+    juncao: Literal["or", "and"]
+    itens: Tuple[Union[Condicao, "Grupo"], ...]
+
+    def __post_init__(self):
+        if not self.itens:
+            raise ValueError(f"'{self.juncao}' precisa de ao menos uma condição")
+
+    def expressao(self) -> str:
+        return f"{self.juncao}({','.join(item.expressao() for item in self.itens)})"
+
+    def parametro(self) -> Tuple[str, str]:
+        return self.juncao, f"({','.join(item.expressao() for item in self.itens)})"
+
+
+Filtro = Union[Condicao, Grupo]
+
+
+class Coluna:
+    """Atalho para montar condições: col("idade").gte(3)."""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    def eq(self, valor: Any) -> Condicao:
+        return Condicao(self.nome, "eq", valor)
+
+    def neq(self, valor: Any) -> Condicao:
+        return Condicao(self.nome, "neq", valor)
+
+    def gt(self, valor: Any) -> Condicao:
+        return Condicao(self.nome, "gt", valor)
+
+    def gte(self, valor: Any) -> Condicao:
+        return Condicao(self.nome, "gte", valor)
+
+    def lt(self, valor: Any) -> Condicao:
+        return Condicao(self.nome, "lt", valor)
+
+    def lte(self, valor: Any) -> Condicao:
+        return Condicao(self.nome, "lte", valor)
+
+    def in_(self, valores: Iterable[Any]) -> Condicao:
+        if isinstance(valores, (str, bytes)):
+            raise ValueError("'in' espera uma lista de valores")
+        return Condicao(self.nome, "in", tuple(valores))
+
+    def ilike(self, padrao: str) -> Condicao:
+        return Condicao(self.nome, "ilike", padrao)
+
+    def is_(self, valor: Optional[bool]) -> Condicao:
+        return Condicao(self.nome, "is", valor)
+
+
+def col(nome: str) -> Coluna:
+    return Coluna(nome)
+
+
+def ou(*itens: Filtro) -> Grupo:
+    return Grupo("or", tuple(itens))
+
+
+def e_(*itens: Filtro) -> Grupo:
+    return Grupo("and", tuple(itens))
+
+
+# ==========================================================
+# Consulta
+# ==========================================================
+@dataclass
+class Consulta:
+    tabela: str
+    # None = perfil padrão da tabela (backend.database.projecoes)
+    colunas: Optional[str] = None
+    filtros: List[Filtro] = field(default_factory=list)
+    ordem: List[str] = field(default_factory=list)
+    limite: Optional[int] = None
+    deslocamento: Optional[int] = None
+    intervalo: Optional[Tuple[int, int]] = None
+    contagem: Optional[ModoContagem] = None
+
+    # --- projeção -------------------------------------------------
+    def select(self, *colunas: str) -> "Consulta":
+        """Colunas retornadas (aceita recursos embutidos: "pets(nome)")."""
+        self.colunas = ",".join(c.strip() for c in colunas) if colunas else None
+        return self
+
+    # --- filtros --------------------------------------------------
+    def filtro(self, *filtros: Filtro) -> "Consulta":
+        self.filtros.extend(filtros)
+        return self
+
+    def eq(self, coluna: str, valor: Any) -> "Consulta":
+        return self.filtro(col(coluna).eq(valor))
+
+    def neq(self, coluna: str, valor: Any) -> "Consulta":
+        return self.filtro(col(coluna).neq(valor))
+
+    def gt(self, coluna: str, valor: Any) -> "Consulta":
+        return self.filtro(col(coluna).gt(valor))
+
+    def gte(self, coluna: str, valor: Any) -> "Consulta":
+        return self.filtro(col(coluna).gte(valor))
+
+    def lt(self, coluna: str, valor: Any) -> "Consulta":
+        return self.filtro(col(coluna).lt(valor))
+
+    def lte(self, coluna: str, valor: Any) -> "Consulta":
+        return self.filtro(col(coluna).lte(valor))
+
+    def in_(self, coluna: str, valores: Iterable[Any]) -> "Consulta":
+        return self.filtro(col(coluna).in_(valores))
+
+    def ilike(self, coluna: str, padrao: str) -> "Consulta":
+        return self.filtro(col(coluna).ilike(padrao))
+
+    def is_(self, coluna: str, valor: Optional[bool]) -> "Consulta":
+        return self.filtro(col(coluna).is_(valor))
+
+    def ou(self, *itens: Filtro) -> "Consulta":
+        return self.filtro(ou(*itens))
+
+    # --- ordenação e paginação ------------------------------------
+    def order(self, coluna: str, desc: bool = False, nulos: Optional[Literal["first", "last"]] = None) -> "Consulta":
+        termo = f"{coluna}.{'desc' if desc else 'asc'}"
+        if nulos:
+            termo += f".nulls{nulos}"
+        self.ordem.append(termo)
+        return self
+
+    def limit(self, limite: int, offset: Optional[int] = None) -> "Consulta":
+        self.limite = limite
+        self.deslocamento = offset
+        return self
+
+    def faixa(self, inicio: int, fim: int) -> "Consulta":
+        """Linhas `inicio` a `fim` (inclusivo) pelo header Range."""
+        if inicio < 0 or fim < inicio:
+            raise ValueError(f"Faixa inválida: {inicio}-{fim}")
+        self.intervalo = (inicio, fim)
+        return self
+
+    def contar(self, modo: ModoContagem = "exact") -> "Consulta":
+        """Pede o total (Content-Range) no modo exact, planned ou estimated."""
+        if modo not in MODOS_CONTAGEM:
+            raise ValueError(f"Modo de contagem inválido: {modo}")
+        self.contagem = modo
+        return self
+
+    # --- compilação -----------------------------------------------
+    def parametros(self) -> List[Tuple[str, str]]:
+        """Query string do PostgREST (colunas podem repetir)."""
+        params: List[Tuple[str, str]] = [("select", self.colunas or projecao_padrao(self.tabela))]
+        params.extend(f.parametro() for f in self.filtros)
+        if self.ordem:
+            params.append(("order", ",".join(self.ordem)))
+        if self.limite is not None:
+            params.append(("limit", str(self.limite)))
+        if self.deslocamento is not None:
+            params.append(("offset", str(self.deslocamento)))
+        return params
+
+    def headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.intervalo is not None:
+            headers["Range-Unit"] = "items"
+            headers["Range"] = f"{self.intervalo[0]}-{self.intervalo[1]}"
+        if self.contagem:
+            headers["Prefer"] = f"count={self.contagem}"
+        return headers
+
+    def compilar(self) -> Tuple[List[Tuple[str, str]], Dict[str, str]]:
+        return self.parametros(), self.headers()
+
+    def executar(self, cache_ttl: Optional[float] = None):
+        """Executa via supabase_table_query: (linhas, total) ou None."""
+        from backend.database.supabase_client import supabase_table_query
+
+        return supabase_table_query(self, cache_ttl=cache_ttl)
+
+
+__all__ = [
+    "OPERADORES",
+    "Condicao",
+    "Grupo",
+    "Coluna",
+    "Consulta",
+    "col",
+    "ou",
+    "e_",
+]
@@ -0,0 +1,130 @@
+# PETdor2/backend/database/projecoes.py
+"""
+Perfis de projeção: as colunas que cada caso de uso realmente usa.
+
+Selecionar `*` traz colunas que a tela não mostra e, em `usuarios`,
+segredos (hash de senha, tokens de reset). Os helpers do data layer usam
+o perfil padrão da tabela quando o chamador não informa `select`; colunas
+sensíveis são retiradas de qualquer `select`, a menos que o chamador peça
+explicitamente (`permitir_sensiveis=True`, só no login com USER_LOGIN).
+"""
+
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# usuarios
+# ----------------------------------------------------------
+# Dados da sessão (login, páginas do usuário): sem segredos
+USER_SESSION = "id, nome, email, tipo, is_admin, ativo, email_confirmado"
+# Verificação de senha: único perfil com senha_hash
+USER_LOGIN = f"{USER_SESSION}, senha_hash"
+# Listagem do painel administrativo
+USER_ADMIN_LIST = "id, nome, email, tipo, pais, email_confirmado, ativo, is_admin, criado_em"
+
+# ----------------------------------------------------------
+# pets
+# ----------------------------------------------------------
+# Seletores e embeds (nome + espécie)
+PET_LIST = "id, nome, especie"
+# Cartões da página de cadastro
+PET_CARD = "id, nome, especie, raca, peso"
+PET_ADMIN_LIST = "id, nome, especie, raca, proprietario_id, criado_em"
+
+# ----------------------------------------------------------
+# avaliacoes
+# ----------------------------------------------------------
+# Listas e gráficos de evolução da dor
+EVAL_SUMMARY = "id, pet_id, percentual_dor, data_avaliacao"
+# Histórico do tutor (inclui observações)
+EVAL_HISTORY = "id, data_avaliacao, percentual_dor, observacoes, pet_id"
+EVAL_ADMIN_LIST = "id, usuario_id, pet_id, percentual_dor, data_avaliacao"
+
+# Ping de conexão (HEAD com limit=0: nenhuma linha trafega)
+PING = "id"
+
+# Projeção usada quando o chamador não informa `select`
+_PADRAO_POR_TABELA: Dict[str, str] = {
+    "usuarios": USER_SESSION,
+    "pets": PET_LIST,
+    "avaliacoes": EVAL_SUMMARY,
+}
+
+# Colunas retiradas dos SELECTs, salvo com permitir_sensiveis=True
+COLUNAS_SENSIVEIS = frozenset({
+    "senha_hash",
+    "reset_password_token",
+    "reset_password_expires",
+    "token_verificacao",
+})
+
+
+def projecao_padrao(tabela: str) -> str:
+    """Perfil padrão da tabela ("*" para tabelas sem perfil)."""
+    return _PADRAO_POR_TABELA.get(tabela, "*")
+
+
+def _itens_select(select: str) -> List[str]:
+    """Separa as colunas do select, sem quebrar recursos embutidos."""
+    itens, atual, nivel = [], "", 0
+    for c in select:
+        if c == "," and nivel == 0:
+            itens.append(atual)
+            atual = ""
+            continue
+        nivel += (c == "(") - (c == ")")
+        atual += c
+    itens.append(atual)
+    return [i.strip() for i in itens if i.strip()]
+
+
+def _nome_coluna(item: str) -> str:
+    """"alias:coluna::tipo" → "coluna"."""
+    nome = item.split("::", 1)[0]
+    if ":" in nome:
+        nome = nome.split(":", 1)[1]
+    return nome.split("->", 1)[0].strip().strip('"')
+
+
+def remover_sensiveis(select: str) -> str:
+    """
+    Retira de `select` (inclusive de recursos embutidos) as colunas de
+    COLUNAS_SENSIVEIS. `*` não é expandido: por isso tabelas com segredos
+    têm perfil padrão.
+
+    Raises:
+        ValueError: o select só tinha colunas sensíveis (vazio, o
+            PostgREST devolveria todas as colunas)
+    """
+    mantidos = []
+    for item in _itens_select(select):
+        if "(" in item:
+            inicio, fim = item.index("("), item.rindex(")")
+            interno = remover_sensiveis(item[inicio + 1:fim])
+            mantidos.append(f"{item[:inicio]}({interno}){item[fim + 1:]}")
+        elif _nome_coluna(item) in COLUNAS_SENSIVEIS:
+            logger.warning(f"Coluna sensível '{item}' removida do select")
+        else:
+            mantidos.append(item)
+    if not mantidos:
+        raise ValueError("Select só com colunas sensíveis; use permitir_sensiveis=True")
+    return ", ".join(mantidos)
+
+
+__all__ = [
+    "USER_SESSION",
+    "USER_LOGIN",
+    "USER_ADMIN_LIST",
+    "PET_LIST",
+    "PET_CARD",
+    "PET_ADMIN_LIST",
+    "EVAL_SUMMARY",
+    "EVAL_HISTORY",
+    "EVAL_ADMIN_LIST",
+    "PING",
+    "COLUNAS_SENSIVEIS",
+    "projecao_padrao",
+    "remover_sensiveis",
+]
@@ -0,0 +1,286 @@
+# PETdor2/backend/database/requisicoes.py
+"""
+Montagem das leituras REST do PostgREST e interpretação das respostas,
+compartilhadas pelo cliente síncrono (requests, supabase_client) e pelo
+assíncrono (httpx, supabase_async): cada cliente só resolve credenciais
+e envia a requisição.
+
+Exemplo (o que os clientes fazem):
+    req = montar_select("pets", "id, nome", {"especie": "gato"}, limit=50)
+    encontrado, valor = req.em_cache(cache_ttl)
+    response = sessao.request(req.metodo, req.url(url_base),
+                              headers=req.montar_headers(headers_padrao),
+                              params=req.params, json=req.corpo)
+    linhas = req.concluir(response, cache_ttl)
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from backend.database.cache import consultas_cache, identidade_usuario
+from backend.database.consulta import Condicao, Consulta
+from backend.database.projecoes import projecao_padrao, remover_sensiveis
+
+Formato = Literal["json", "json_total", "total"]
+
+
+class ErroResposta(Exception):
+    """Status HTTP de erro devolvido pelo PostgREST."""
+
+    def __init__(self, status: int, corpo: str = ""):
+        self.status = status
+        self.corpo = corpo
+        super().__init__(f"HTTP {status}: {corpo[:200]}" if corpo else f"HTTP {status}")
+
+
+# ==========================================================
+# Filtros, chaves de cache e Content-Range
+# ==========================================================
+def montar_filtros(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Converte filtros em parâmetros de query do PostgREST, com a mesma
+    formatação (e aspas em listas) das condições de Consulta.
+
+    Formatos aceitos:
+        {"ativo": True}                         → ativo=eq.true
+        {"pet_id": None}                        → pet_id=is.null
+        {"id": [1, 2, 3]}                       → id=in.(1,2,3)
+        {"especie": ["cão", "a,b"]}             → especie=in.(cão,"a,b")
+        {"email": {"ilike": "ana*"}}            → email=ilike.ana*
+        {"criado_em": {"gte": a, "lt": b}}      → criado_em=gte.a&criado_em=lt.b
+
+    Raises:
+        ValueError: operador não suportado
+    """
+    params = {}
+    if filters:
+        for key, value in filters.items():
+            if isinstance(value, dict):
+                condicoes = [Condicao(key, op, v) for op, v in value.items()]
+            elif isinstance(value, (list, tuple, set)):
+                condicoes = [Condicao(key, "in", list(value))]
+            elif value is None:
+                condicoes = [Condicao(key, "is", None)]
+            else:
+                condicoes = [Condicao(key, "eq", value)]
+            valores = [c.parametro()[1] for c in condicoes]
+            params[key] = valores[0] if len(valores) == 1 else valores
+    return params
+
+
+def chave_cache(operacao: str, table: str, params: Dict[str, Any]) -> tuple:
+    """Chave de cache: usuário + operação + tabela + parâmetros da query."""
+    itens = tuple(sorted(
+        (k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()
+    ))
+    return (identidade_usuario(), operacao, table, itens)
+
+
+def tabelas_da_consulta(table: str, select: str) -> List[str]:
+    """Tabela principal mais os recursos embutidos (ex.: "pets(nome)")."""
+    return [table] + re.findall(r"(\w+)\s*\(", select or "")
+
+
+def total_content_range(response: Any) -> Optional[int]:
+    """Lê o total de um header Content-Range (ex.: "0-49/1234")."""
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+# ==========================================================
+# Requisição de leitura
+# ==========================================================
+@dataclass
+class Requisicao:
+    """
+    Uma leitura pronta para enviar: recurso, parâmetros, ajustes sobre os
+    headers padrão (None remove o header), chave de cache e como ler a
+    resposta. Não depende do transporte: a resposta só precisa de
+    status_code, headers, text e json().
+    """
+    metodo: str
+    recurso: str
+    descricao: str
+    params: Any = None
+    corpo: Any = None
+    headers: Dict[str, Optional[str]] = field(default_factory=dict)
+    formato: Formato = "json"
+    # Faixa além do fim do resultado (416) = página vazia
+    vazio_416: bool = False
+    chave: Optional[tuple] = None
+    tabelas: Tuple[str, ...] = ()
+
+    def url(self, url_base: str) -> str:
+        return f"{url_base}/rest/v1/{self.recurso}"
+
+    def montar_headers(self, padrao: Dict[str, str]) -> Dict[str, str]:
+        headers = dict(padrao)
+        for nome, valor in self.headers.items():
+            if valor is None:
+                headers.pop(nome, None)
+            else:
+                headers[nome] = valor
+        return headers
+
+    def em_cache(self, cache_ttl: Optional[float]) -> Tuple[bool, Any]:
+        if cache_ttl and self.chave is not None:
+            return consultas_cache.obter(self.chave)
+        return False, None
+
+    def concluir(self, response: Any, cache_ttl: Optional[float] = None) -> Any:
+        """
+        Interpreta a resposta e guarda o resultado no cache.
+
+        Raises:
+            ErroResposta: status de erro
+            ValueError: corpo que não é JSON
+        """
+        if self.vazio_416 and response.status_code == 416:
+            return [], total_content_range(response)
+        if response.status_code >= 400:
+            raise ErroResposta(response.status_code, response.text)
+
+        if self.formato == "total":
+            resultado = total_content_range(response)
+        elif self.formato == "json_total":
+            resultado = (response.json(), total_content_range(response))
+        else:
+            resultado = response.json()
+
+        if cache_ttl and self.chave is not None and resultado is not None:
+            consultas_cache.guardar(self.chave, resultado, list(self.tabelas), cache_ttl)
+        return resultado
+
+
+# ==========================================================
+# Montagem (mesmos parâmetros dos helpers REST)
+# ==========================================================
+def _projecao(table: str, select: Optional[str], permitir_sensiveis: bool) -> str:
+    """Perfil padrão sem `select`; colunas sensíveis só com opt-in."""
+    select = select or projecao_padrao(table)
+    return select if permitir_sensiveis else remover_sensiveis(select)
+
+
+def montar_select(
+    table: str,
+    select: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    order: Optional[str] = None,
+    limit: Optional[int] = None,
+    permitir_sensiveis: bool = False,
+) -> Requisicao:
+    select = _projecao(table, select, permitir_sensiveis)
+    params = {"select": select}
+    params.update(montar_filtros(filters))
+    if order:
+        params["order"] = order
+    if limit:
+        params["limit"] = limit
+    return Requisicao(
+        "GET", table, f"consultar tabela {table}",
+        params=params,
+        chave=chave_cache("select", table, params),
+        tabelas=tuple(tabelas_da_consulta(table, select)),
+    )
+
+
+def montar_select_pagina(
+    table: str,
+    select: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    order: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    permitir_sensiveis: bool = False,
+) -> Requisicao:
+    select = _projecao(table, select, permitir_sensiveis)
+    params = {"select": select, "limit": limit, "offset": offset}
+    params.update(montar_filtros(filters))
+    if order:
+        params["order"] = order
+    return Requisicao(
+        "GET", table, f"consultar tabela {table}",
+        params=params,
+        headers={"Prefer": "count=exact"},
+        formato="json_total",
+        chave=chave_cache("select_pagina", table, params),
+        tabelas=tuple(tabelas_da_consulta(table, select)),
+    )
+
+
+def montar_query(consulta: Consulta) -> Requisicao:
+    params, extras = consulta.compilar()
+    return Requisicao(
+        "GET", consulta.tabela, f"consultar tabela {consulta.tabela}",
+        params=params,
+        headers={"Prefer": None, **extras},
+        formato="json_total",
+        vazio_416=True,
+        chave=(identidade_usuario(), "query", consulta.tabela, tuple(params), tuple(sorted(extras.items()))),
+        tabelas=tuple(tabelas_da_consulta(consulta.tabela, params[0][1])),
+    )
+
+
+def montar_count(table: str, filters: Optional[Dict[str, Any]] = None) -> Requisicao:
+    params = {"select": "*"}
+    params.update(montar_filtros(filters))
+    return Requisicao(
+        "HEAD", table, f"contar registros de {table}",
+        params=params,
+        headers={"Prefer": "count=exact"},
+        formato="total",
+        chave=chave_cache("count", table, params),
+        tabelas=(table,),
+    )
+
+
+def montar_aggregate(
+    table: str,
+    agregados: Dict[str, str],
+    group_by: Optional[List[str]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    order: Optional[str] = None,
+) -> Requisicao:
+    colunas = list(group_by or [])
+    colunas += [f"{alias}:{expressao}" for alias, expressao in agregados.items()]
+    params = {"select": ",".join(colunas)}
+    params.update(montar_filtros(filters))
+    if order:
+        params["order"] = order
+    return Requisicao(
+        "GET", table, f"agregar {table}",
+        params=params,
+        chave=chave_cache("aggregate", table, params),
+        tabelas=(table,),
+    )
+
+
+def montar_rpc(
+    funcao: str,
+    params: Optional[Dict[str, Any]] = None,
+    tabelas: Tuple[str, ...] = (),
+) -> Requisicao:
+    corpo = params or {}
+    return Requisicao(
+        "POST", f"rpc/{funcao}", f"chamar RPC {funcao}",
+        corpo=corpo,
+        chave=chave_cache("rpc", funcao, {k: str(v) for k, v in corpo.items()}),
+        tabelas=tuple(tabelas),
+    )
+
+
+__all__ = [
+    "ErroResposta",
+    "Requisicao",
+    "montar_filtros",
+    "chave_cache",
+    "tabelas_da_consulta",
+    "total_content_range",
+    "montar_select",
+    "montar_select_pagina",
+    "montar_query",
+    "montar_count",
+    "montar_aggregate",
+    "montar_rpc",
+]
@@ -0,0 +1,63 @@
+# PETdor2/backend/database/saude.py
+"""
+Sonda de saúde para o contêiner.
+
+Lê o estado que o GerenciadorSupabase do app publica em
+SUPABASE_SAUDE_ARQUIVO (não abre conexão própria) e sai com 0 ou 1:
+
+    python -m backend.database.saude pronto   # readiness
+    python -m backend.database.saude vivo     # liveness
+"""
+
+import json
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from backend.utils.config import (
+    SUPABASE_SAUDE_ARQUIVO,
+    SUPABASE_SAUDE_INTERVALO,
+    SUPABASE_CONNECT_TIMEOUT,
+    SUPABASE_READ_TIMEOUT,
+)
+
+# Mesma tolerância do GerenciadorSupabase
+_IDADE_MAXIMA = 2 * SUPABASE_SAUDE_INTERVALO + SUPABASE_CONNECT_TIMEOUT + SUPABASE_READ_TIMEOUT
+
+
+def ler_estado(arquivo: str = SUPABASE_SAUDE_ARQUIVO) -> Optional[Dict[str, Any]]:
+    try:
+        with open(arquivo, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def verificar(sonda: str, arquivo: str = SUPABASE_SAUDE_ARQUIVO) -> bool:
+    estado = ler_estado(arquivo)
+    if estado is None:
+        # Ainda sem estado publicado: vivo (aquecendo), mas não pronto
+        return sonda == "vivo"
+
+    agora = time.time()
+    ultima = estado.get("ultima_verificacao") or 0
+    if sonda == "vivo":
+        # Estado parado = thread de verificação travada ou app morto
+        return agora - ultima <= _IDADE_MAXIMA
+    ultimo_sucesso = estado.get("ultimo_sucesso") or 0
+    return estado.get("erro") is None and agora - ultimo_sucesso <= _IDADE_MAXIMA
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    sonda = argv[0] if argv else "pronto"
+    if sonda not in ("pronto", "vivo"):
+        print("uso: python -m backend.database.saude [pronto|vivo]", file=sys.stderr)
+        return 2
+    ok = verificar(sonda)
+    print(json.dumps({"sonda": sonda, "ok": ok, "estado": ler_estado()}))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
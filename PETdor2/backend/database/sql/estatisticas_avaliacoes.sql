@@ -0,0 +1,78 @@
+-- PETdor2/backend/database/sql/estatisticas_avaliacoes.sql
+-- Agregados mensais do painel administrativo, chamados via
+-- supabase_rpc("avaliacoes_por_mes", {"meses": 12}).
+-- Sem SECURITY DEFINER: as políticas de RLS de "avaliacoes" continuam valendo.
+
+create or replace function public.avaliacoes_por_mes(meses integer default 12)
+returns table (mes date, total bigint, dor_media numeric, dor_maxima numeric)
+language sql
+stable
+as $$
+    select
+        date_trunc('month', data_avaliacao)::date as mes,
+        count(*) as total,
+        round(avg(percentual_dor)::numeric, 1) as dor_media,
+        max(percentual_dor)::numeric as dor_maxima
+    from public.avaliacoes
+    where data_avaliacao >= date_trunc('month', now()) - make_interval(months => meses - 1)
+    group by 1
+    order by 1;
+$$;
+
+-- Resumo do histórico do tutor (pages/historico.py), chamado via
+-- supabase_rpc("resumo_avaliacoes_usuario", {"p_usuario_id": id}).
+-- Não depende dos agregados do PostgREST (desabilitados por padrão).
+create or replace function public.resumo_avaliacoes_usuario(p_usuario_id bigint)
+returns table (total bigint, dor_media numeric, dor_maxima numeric)
+language sql
+stable
+as $$
+    select
+        count(*) as total,
+        round(avg(percentual_dor)::numeric, 1) as dor_media,
+        max(percentual_dor)::numeric as dor_maxima
+    from public.avaliacoes
+    where usuario_id = p_usuario_id;
+$$;
+
+-- Painel administrativo (pages/admin.py): alternativas aos agregados do
+-- PostgREST, que vêm desabilitados por padrão no Supabase.
+-- supabase_rpc("estatisticas_admin")
+create or replace function public.estatisticas_admin()
+returns table (total bigint, dor_media numeric, dor_maxima numeric)
+language sql
+stable
+as $$
+    select
+        count(*) as total,
+        round(avg(percentual_dor)::numeric, 1) as dor_media,
+        max(percentual_dor)::numeric as dor_maxima
+    from public.avaliacoes;
+$$;
+
+-- supabase_rpc("avaliacoes_por_especie")
+create or replace function public.avaliacoes_por_especie()
+returns table (especie text, total bigint, dor_media numeric)
+language sql
+stable
+as $$
+    select
+        especie::text as especie,
+        count(*) as total,
+        round(avg(percentual_dor)::numeric, 1) as dor_media
+    from public.avaliacoes
+    group by 1
+    order by 1;
+$$;
+
+-- supabase_rpc("pets_por_especie")
+create or replace function public.pets_por_especie()
+returns table (especie text, total bigint)
+language sql
+stable
+as $$
+    select especie::text as especie, count(*) as total
+    from public.pets
+    group by 1
+    order by 1;
+$$;
@@ -0,0 +1,237 @@
+# PETdor2/backend/database/supabase_async.py
+"""
+Variante assíncrona (httpx) dos helpers REST, para carregar em paralelo
+as consultas independentes de uma página.
+
+Um laço asyncio em thread própria mantém um único httpx.AsyncClient (pool
+keep-alive) por processo. Cada helper `async_*` resolve credenciais, JWT
+e cache na thread do script (onde st.secrets / st.session_state existem)
+e devolve um awaitable que só faz a requisição. `carregar_em_paralelo`
+dispara todas juntas, aplica o timeout de cada uma e devolve os
+resultados: o tempo total tende ao da consulta mais lenta, não à soma.
+A montagem das requisições e a leitura das respostas são as mesmas do
+cliente síncrono (backend.database.requisicoes); só o transporte muda.
+
+Exemplo:
+    dados = carregar_em_paralelo({
+        "total": async_table_count("pets", cache_ttl=TTL_PADRAO),
+        "recentes": (async_table_select("pets", order="criado_em.desc", limit=50), 2.0),
+    })
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from backend.utils.config import (
+    SUPABASE_POOL_SIZE,
+    SUPABASE_CONNECT_TIMEOUT,
+    SUPABASE_READ_TIMEOUT,
+    SUPABASE_MAX_RETRIES,
+    SUPABASE_ASYNC_TIMEOUT,
+)
+from backend.database.consulta import Consulta
+from backend.database.requisicoes import (
+    ErroResposta,
+    Requisicao,
+    montar_select,
+    montar_query,
+    montar_count,
+    montar_aggregate,
+    montar_rpc,
+)
+from backend.database.supabase_client import get_supabase_client, get_headers_with_jwt
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# Laço de eventos e cliente compartilhados
+# ==========================================================
+class _LacoHttp:
+    """Thread com um laço asyncio e o httpx.AsyncClient que vive nele."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._laco: Optional[asyncio.AbstractEventLoop] = None
+        self._cliente: Optional[httpx.AsyncClient] = None
+
+    def laco(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._laco is None:
+                laco = asyncio.new_event_loop()
+                threading.Thread(target=laco.run_forever, name="supabase-async", daemon=True).start()
+                self._laco = laco
+            return self._laco
+
+    def cliente(self) -> httpx.AsyncClient:
+        # Chamado apenas dentro do laço: sem concorrência entre threads
+        if self._cliente is None:
+            self._cliente = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=SUPABASE_POOL_SIZE,
+                    max_keepalive_connections=SUPABASE_POOL_SIZE,
+                ),
+                timeout=httpx.Timeout(SUPABASE_READ_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT),
+                # Repete apenas falhas de conexão (nada chegou ao servidor)
+                transport=httpx.AsyncHTTPTransport(retries=SUPABASE_MAX_RETRIES),
+                headers={"Connection": "keep-alive"},
+            )
+        return self._cliente
+
+
+_http = _LacoHttp()
+
+
+async def _valor(valor: Any) -> Any:
+    return valor
+
+
+def _preparar(req: Requisicao, cache_ttl: Optional[float]) -> Awaitable[Any]:
+    """
+    Resolve credenciais, headers (JWT) e cache na thread do script e
+    devolve o awaitable que só envia a requisição e interpreta a resposta.
+    """
+    client = get_supabase_client()
+    if not client:
+        return _valor(None)
+    encontrado, valor = req.em_cache(cache_ttl)
+    if encontrado:
+        return _valor(valor)
+
+    url = req.url(client["url"])
+    headers = req.montar_headers(get_headers_with_jwt())
+
+    async def executar():
+        try:
+            response = await _http.cliente().request(
+                req.metodo, url, headers=headers, params=req.params, json=req.corpo
+            )
+            return req.concluir(response, cache_ttl)
+        except (httpx.HTTPError, ErroResposta, ValueError) as e:
+            logger.warning(f"Erro ao {req.descricao} (async): {e}")
+            return None
+
+    return executar()
+
+
+# ==========================================================
+# Helpers (espelham os de supabase_client)
+# ==========================================================
+def async_table_select(
+    table: str,
+    select: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    order: Optional[str] = None,
+    limit: Optional[int] = None,
+    cache_ttl: Optional[float] = None,
+    permitir_sensiveis: bool = False,
+) -> Awaitable[Optional[List[Dict]]]:
+    """SELECT assíncrono; mesmos parâmetros de supabase_table_select."""
+    return _preparar(montar_select(table, select, filters, order, limit, permitir_sensiveis), cache_ttl)
+
+
+def async_table_query(
+    consulta: Consulta,
+    cache_ttl: Optional[float] = None,
+) -> Awaitable[Optional[Tuple[List[Dict], Optional[int]]]]:
+    """Executa uma Consulta; retorna (linhas, total) como supabase_table_query."""
+    return _preparar(montar_query(consulta), cache_ttl)
+
+
+def async_table_count(
+    table: str,
+    filters: Optional[Dict[str, Any]] = None,
+    cache_ttl: Optional[float] = None,
+) -> Awaitable[Optional[int]]:
+    """Contagem assíncrona (HEAD + count=exact)."""
+    return _preparar(montar_count(table, filters), cache_ttl)
+
+
+def async_table_aggregate(
+    table: str,
+    agregados: Dict[str, str],
+    group_by: Optional[List[str]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    order: Optional[str] = None,
+    cache_ttl: Optional[float] = None,
+) -> Awaitable[Optional[List[Dict]]]:
+    """Agregados do PostgREST (count, sum, avg, min, max), assíncrono."""
+    return _preparar(montar_aggregate(table, agregados, group_by, filters, order), cache_ttl)
+
+
+def async_rpc(
+    funcao: str,
+    params: Optional[Dict[str, Any]] = None,
+    tabelas: Tuple[str, ...] = (),
+    cache_ttl: Optional[float] = None,
+) -> Awaitable[Optional[Any]]:
+    """
+    Chama /rpc/<funcao> (POST). Com `cache_ttl`, o resultado fica em cache
+    e é invalidado por escritas em `tabelas`.
+    """
+    return _preparar(montar_rpc(funcao, params, tabelas), cache_ttl)
+
+
+# ==========================================================
+# Execução concorrente
+# ==========================================================
+Tarefa = Union[Awaitable[Any], Tuple[Awaitable[Any], float]]
+
+
+async def _com_timeout(nome: str, tarefa: Awaitable[Any], timeout: float) -> Any:
+    try:
+        return await asyncio.wait_for(tarefa, timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"⚠️ Consulta '{nome}' excedeu {timeout}s")
+    except Exception as e:
+        logger.warning(f"⚠️ Consulta '{nome}' falhou: {e}")
+    return None
+
+
+async def _reunir(tarefas: Dict[str, Tarefa], timeout: float) -> Dict[str, Any]:
+    nomes, execucoes = [], []
+    for nome, tarefa in tarefas.items():
+        limite = timeout
+        if isinstance(tarefa, tuple):
+            tarefa, limite = tarefa
+        nomes.append(nome)
+        execucoes.append(_com_timeout(nome, tarefa, limite))
+    return dict(zip(nomes, await asyncio.gather(*execucoes)))
+
+
+def carregar_em_paralelo(
+    tarefas: Dict[str, Tarefa],
+    timeout: float = SUPABASE_ASYNC_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Executa as consultas ao mesmo tempo e devolve {nome: resultado}.
+
+    Cada tarefa é um awaitable dos helpers `async_*` ou uma tupla
+    (awaitable, timeout em segundos). Consultas que falharem ou excederem
+    o timeout resultam em None, sem afetar as demais.
+    """
+    if not tarefas:
+        return {}
+    futuro = asyncio.run_coroutine_threadsafe(_reunir(tarefas, timeout), _http.laco())
+    # Margem sobre o maior timeout individual
+    limites = [t[1] if isinstance(t, tuple) else timeout for t in tarefas.values()]
+    try:
+        return futuro.result(max(limites) + 1.0)
+    except TimeoutError:
+        futuro.cancel()
+        logger.warning("⚠️ Carregamento em paralelo excedeu o tempo limite")
+        return {nome: None for nome in tarefas}
+
+
+__all__ = [
+    "async_table_select",
+    "async_table_query",
+    "async_table_count",
+    "async_table_aggregate",
+    "async_rpc",
+    "carregar_em_paralelo",
+]
@@ -1,15 +1,163 @@
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
 import streamlit as st
 import requests
-from typing import Optional, Dict, Any, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 
-def get_supabase_client():
+from backend.utils.config import (
+    SUPABASE_POOL_SIZE,
+    SUPABASE_CONNECT_TIMEOUT,
+    SUPABASE_READ_TIMEOUT,
+    SUPABASE_MAX_RETRIES,
+    SUPABASE_BACKOFF,
+    SUPABASE_LOTE_TAMANHO,
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    SUPABASE_SAUDE_INTERVALO,
+    SUPABASE_SAUDE_ARQUIVO,
+)
+
+from backend.database.cache import consultas_cache
+from backend.database.consulta import Consulta
+from backend.database.requisicoes import (
+    ErroResposta,
+    Requisicao,
+    montar_filtros,
+    total_content_range,
+    montar_select,
+    montar_select_pagina,
+    montar_query,
+    montar_count,
+    montar_aggregate,
+    montar_rpc,
+)
+from backend.database.projecoes import PING, projecao_padrao
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# Sessão HTTP compartilhada (pool keep-alive)
+# ==========================================================
+# Uma única sessão por processo, compartilhada entre todas as sessões do
+# Streamlit. Ela guarda apenas o pool de conexões TCP/TLS: os headers com
+# o JWT de cada usuário são enviados por requisição (get_headers_with_jwt),
+# nunca gravados na sessão.
+_http_session: Optional[requests.Session] = None
+# Mesma configuração, mas sem repetir requisições que chegaram ao servidor
+_http_session_sem_repeticao: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+# Status que justificam nova tentativa com backoff exponencial
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# POST não é repetido automaticamente para não duplicar inserts
+_RETRY_METHODS = frozenset({"GET", "HEAD", "PATCH", "DELETE"})
+
+
+def _criar_sessao_http(repetir_respostas: bool = True) -> requests.Session:
+    """
+    Cria a sessão HTTP com pool de conexões e política de retry.
+
+    Com `repetir_respostas=False` só falhas de conexão são repetidas (nada
+    chegou ao servidor); erros de leitura e status 5xx não, pois o
+    servidor pode ter aplicado a escrita e perdido apenas a resposta.
     """
-    Retorna as credenciais do Supabase configuradas via Streamlit Secrets.
+    if repetir_respostas:
+        retry = Retry(
+            total=SUPABASE_MAX_RETRIES,
+            backoff_factor=SUPABASE_BACKOFF,
+            status_forcelist=_RETRY_STATUS,
+            allowed_methods=_RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+    else:
+        retry = Retry(
+            total=SUPABASE_MAX_RETRIES,
+            connect=SUPABASE_MAX_RETRIES,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=SUPABASE_BACKOFF,
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+    adapter = HTTPAdapter(
+        pool_connections=SUPABASE_POOL_SIZE,
+        pool_maxsize=SUPABASE_POOL_SIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """
+    Retorna a sessão HTTP do processo, criando-a na primeira chamada.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                _http_session = _criar_sessao_http()
+    return _http_session
+
+
+def _get_http_session_sem_repeticao() -> requests.Session:
+    global _http_session_sem_repeticao
+    if _http_session_sem_repeticao is None:
+        with _http_session_lock:
+            if _http_session_sem_repeticao is None:
+                _http_session_sem_repeticao = _criar_sessao_http(repetir_respostas=False)
+    return _http_session_sem_repeticao
+
+
+def _request(method: str, url: str, repetir: bool = True, **kwargs) -> requests.Response:
+    """
+    Executa uma requisição pela sessão compartilhada, com timeout padrão
+    (conexão, leitura) quando o chamador não informar outro.
+
+    `repetir=False` para escritas não idempotentes (ex.: UPDATE condicional
+    que consome um token): só falhas de conexão são repetidas.
+    """
+    kwargs.setdefault("timeout", (SUPABASE_CONNECT_TIMEOUT, SUPABASE_READ_TIMEOUT))
+    sessao = get_http_session() if repetir else _get_http_session_sem_repeticao()
+    return sessao.request(method, url, **kwargs)
+
+
+def _credenciais() -> Dict[str, str]:
+    """
+    Credenciais do Supabase: Streamlit Secrets ou, fora do Streamlit Cloud,
+    as variáveis de ambiente (SUPABASE_URL / SUPABASE_KEY).
     """
     try:
         url = st.secrets["supabase"]["SUPABASE_URL"]
         key = st.secrets["supabase"]["SUPABASE_KEY"]
         return {"url": url, "key": key}
+    except Exception:
+        if SUPABASE_URL and SUPABASE_KEY:
+            return {"url": SUPABASE_URL, "key": SUPABASE_KEY}
+        raise
+
+
+def get_supabase_client():
+    """
+    Retorna as credenciais do Supabase configuradas via Streamlit Secrets
+    (ou variáveis de ambiente).
+    """
+    try:
+        return _credenciais()
     except Exception as e:
         st.error(f"Erro ao carregar credenciais do Supabase: {e}")
         return None
@@ -40,15 +188,96 @@ def get_headers_with_jwt() -> Dict[str, str]:
 
     return headers
 
+def _ler(req: Requisicao, cache_ttl: Optional[float] = None, alertar: bool = True) -> Optional[Any]:
+    """
+    Envia uma leitura montada em backend.database.requisicoes pela sessão
+    compartilhada. Com `alertar=False` a falha só vai para o log (para
+    caminhos com alternativa, como agregados e RPC).
+    """
+    client = get_supabase_client()
+    if not client:
+        return None
+
+    encontrado, valor = req.em_cache(cache_ttl)
+    if encontrado:
+        return valor
+
+    try:
+        response = _request(
+            req.metodo,
+            req.url(client["url"]),
+            headers=req.montar_headers(get_headers_with_jwt()),
+            params=req.params,
+            json=req.corpo,
+        )
+        return req.concluir(response, cache_ttl)
+    except (requests.exceptions.RequestException, ErroResposta, ValueError) as e:
+        if alertar:
+            st.error(f"Erro ao {req.descricao}: {e}")
+        else:
+            logger.warning(f"Erro ao {req.descricao}: {e}")
+        return None
+
 def supabase_table_select(
     table: str,
-    select: str = "*",
+    select: Optional[str] = None,
     filters: Optional[Dict[str, Any]] = None,
     order: Optional[str] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    cache_ttl: Optional[float] = None,
+    permitir_sensiveis: bool = False
 ) -> Optional[List[Dict]]:
     """
     Executa SELECT em uma tabela do Supabase via REST API.
+
+    Sem `select`, usa o perfil de projeção padrão da tabela
+    (backend.database.projecoes). Colunas sensíveis (hash de senha,
+    tokens) são retiradas do select, salvo com `permitir_sensiveis=True`.
+    Com `cache_ttl` (segundos), o resultado fica em cache por usuário até
+    expirar ou até uma escrita na tabela invalidá-lo.
+    """
+    return _ler(montar_select(table, select, filters, order, limit, permitir_sensiveis), cache_ttl)
+
+def supabase_table_select_pagina(
+    table: str,
+    select: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    order: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    cache_ttl: Optional[float] = None,
+    permitir_sensiveis: bool = False
+) -> Optional[Tuple[List[Dict], Optional[int]]]:
+    """
+    Executa SELECT paginado e retorna também o total de registros que
+    atendem aos filtros (`Prefer: count=exact`), na mesma requisição.
+
+    Returns:
+        Tupla (linhas da página, total) ou None em caso de erro
+    """
+    return _ler(montar_select_pagina(table, select, filters, order, limit, offset, permitir_sensiveis), cache_ttl)
+
+def supabase_table_query(
+    consulta: Consulta,
+    cache_ttl: Optional[float] = None
+) -> Optional[Tuple[List[Dict], Optional[int]]]:
+    """
+    Executa uma Consulta (backend.database.consulta) compilada para os
+    parâmetros e headers do PostgREST.
+
+    Returns:
+        Tupla (linhas, total) — total só quando a consulta pede contagem
+        (ou usa faixa) e o servidor informa; lista vazia se a faixa passar
+        do fim do resultado (416); None em caso de erro
+    """
+    return _ler(montar_query(consulta), cache_ttl)
+
+def supabase_table_insert(
+    table: str,
+    data: Dict[str, Any]
+) -> Optional[Dict]:
+    """
+    Insere um registro em uma tabela do Supabase via REST API.
     """
     client = get_supabase_client()
     if not client:
@@ -57,35 +286,209 @@ def supabase_table_select(
     url = f"{client['url']}/rest/v1/{table}"
     headers = get_headers_with_jwt()
 
-    params = {"select": select}
+    try:
+        response = _request("POST", url, headers=headers, json=data)
+        response.raise_for_status()
+        consultas_cache.invalidar_tabelas(table)
+        result = response.json()
+        return result[0] if result else None
+    except requests.exceptions.RequestException as e:
+        st.error(f"Erro ao inserir em {table}: {e}")
+        return None
 
-    if filters:
-        for key, value in filters.items():
-            if isinstance(value, bool):
-                params[key] = f"eq.{str(value).lower()}"
-            else:
-                params[key] = f"eq.{value}"
+def supabase_table_upsert(
+    table: str,
+    rows: List[Dict[str, Any]],
+    on_conflict: str = "id",
+    retornar: bool = False
+) -> Optional[List[Dict]]:
+    """
+    Insere ou atualiza vários registros em uma única requisição
+    (`Prefer: resolution=merge-duplicates`).
 
-    if order:
-        params["order"] = order
+    Args:
+        table: Nome da tabela
+        rows: Registros (todos com as mesmas colunas)
+        on_conflict: Coluna(s) da restrição única usada para o merge
+        retornar: Se False, usa `return=minimal` e não devolve as linhas
 
-    if limit:
-        params["limit"] = limit
+    Returns:
+        Linhas gravadas (ou lista vazia com retornar=False); None em caso de erro
+    """
+    client = get_supabase_client()
+    if not client:
+        return None
+    if not rows:
+        return []
+
+    url = f"{client['url']}/rest/v1/{table}"
+    headers = get_headers_with_jwt()
+    retorno = "return=representation" if retornar else "return=minimal"
+    headers["Prefer"] = f"resolution=merge-duplicates,{retorno}"
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = _request("POST", url, headers=headers, params={"on_conflict": on_conflict}, json=rows)
         response.raise_for_status()
-        return response.json()
+        consultas_cache.invalidar_tabelas(table)
+        return response.json() if retornar else []
     except requests.exceptions.RequestException as e:
-        st.error(f"Erro ao consultar tabela {table}: {e}")
+        st.error(f"Erro ao gravar (upsert) em {table}: {e}")
         return None
 
-def supabase_table_insert(
+# ==========================================================
+# Gravação em lote (bulk insert / upsert)
+# ==========================================================
+# Tamanho dos pedaços enviados no corpo chunked (evita um write por linha)
+_BUFFER_CORPO = 64 * 1024
+
+
+@dataclass
+class ResultadoGravacaoLote:
+    """Resultado de uma gravação em lote, com as falhas de cada lote."""
+    gravadas: int = 0
+    lotes: int = 0
+    linhas: List[Dict] = field(default_factory=list)
+    falhas: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.falhas
+
+
+def _corpo_json(linhas: Iterator[Dict[str, Any]], contador: List[int]) -> Iterator[bytes]:
+    """
+    Serializa as linhas como um array JSON sob demanda, em pedaços de até
+    _BUFFER_CORPO bytes (enviados com Transfer-Encoding: chunked).
+    """
+    buffer = bytearray(b"[")
+    for linha in linhas:
+        if contador[0]:
+            buffer += b","
+        buffer += json.dumps(linha, separators=(",", ":"), default=str).encode("utf-8")
+        contador[0] += 1
+        if len(buffer) >= _BUFFER_CORPO:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+def _gravar_em_lotes(
+    table: str,
+    rows: Iterable[Dict[str, Any]],
+    prefer: str,
+    params: Dict[str, Any],
+    tamanho_lote: int,
+    retornar: bool,
+    operacao: str,
+) -> Optional[ResultadoGravacaoLote]:
+    client = get_supabase_client()
+    if not client:
+        return None
+
+    url = f"{client['url']}/rest/v1/{table}"
+    headers = get_headers_with_jwt()
+    retorno = "return=representation" if retornar else "return=minimal"
+    headers["Prefer"] = f"{prefer},{retorno}" if prefer else retorno
+
+    resultado = ResultadoGravacaoLote()
+    inicio = 0
+    linhas = iter(rows)
+    tamanho_lote = max(tamanho_lote, 1)
+
+    while True:
+        # Só lê do iterável a linha que abre o lote; o restante é
+        # consumido enquanto o corpo é enviado
+        primeira = next(linhas, None)
+        if primeira is None:
+            break
+        contador = [0]
+        lote = itertools.chain((primeira,), itertools.islice(linhas, tamanho_lote - 1))
+
+        try:
+            response = _request("POST", url, headers=headers, params=params, data=_corpo_json(lote, contador))
+            response.raise_for_status()
+            resultado.gravadas += contador[0]
+            if retornar:
+                resultado.linhas.extend(response.json())
+        except (requests.exceptions.RequestException, TypeError, ValueError) as e:
+            for _ in lote:  # descarta o que sobrou do lote, se o envio parou no meio
+                contador[0] += 1
+            detalhe = getattr(getattr(e, "response", None), "text", "") or str(e)
+            resultado.falhas.append({
+                "lote": resultado.lotes,
+                "inicio": inicio,
+                "quantidade": contador[0],
+                "erro": detalhe[:500],
+            })
+            logger.warning(f"⚠️ Lote {resultado.lotes} ({operacao} em {table}, linhas {inicio}+{contador[0]}) falhou: {detalhe[:200]}")
+
+        inicio += contador[0]
+        resultado.lotes += 1
+
+    if resultado.gravadas:
+        consultas_cache.invalidar_tabelas(table)
+    if resultado.falhas:
+        st.error(f"Erro ao gravar ({operacao}) em {table}: {len(resultado.falhas)} de {resultado.lotes} lotes falharam")
+    return resultado
+
+
+def supabase_table_bulk_insert(
+    table: str,
+    rows: Iterable[Dict[str, Any]],
+    tamanho_lote: int = SUPABASE_LOTE_TAMANHO,
+    retornar: bool = False,
+    colunas: Optional[List[str]] = None
+) -> Optional[ResultadoGravacaoLote]:
+    """
+    Insere muitos registros em lotes de `tamanho_lote` linhas por requisição.
+
+    `rows` pode ser qualquer iterável (ex.: um gerador lendo um CSV): as
+    linhas são serializadas sob demanda, sem montar a lista inteira.
+
+    Args:
+        table: Nome da tabela
+        rows: Registros a inserir
+        tamanho_lote: Linhas por requisição
+        retornar: Se False, usa `return=minimal` e não devolve as linhas
+        colunas: Colunas a inserir (`columns`); chaves ausentes em uma linha
+            recebem o valor padrão da coluna
+
+    Returns:
+        ResultadoGravacaoLote com total gravado e falhas por lote (None sem credenciais)
+    """
+    params = {"columns": ",".join(colunas)} if colunas else {}
+    prefer = "missing=default" if colunas else ""
+    return _gravar_em_lotes(table, rows, prefer, params, tamanho_lote, retornar, "insert")
+
+
+def supabase_table_bulk_upsert(
     table: str,
+    rows: Iterable[Dict[str, Any]],
+    on_conflict: str = "id",
+    tamanho_lote: int = SUPABASE_LOTE_TAMANHO,
+    retornar: bool = False,
+    colunas: Optional[List[str]] = None
+) -> Optional[ResultadoGravacaoLote]:
+    """
+    Como supabase_table_bulk_insert, mas atualiza os registros que já
+    existem (`resolution=merge-duplicates` em `on_conflict`).
+    """
+    params = {"on_conflict": on_conflict}
+    prefer = "resolution=merge-duplicates"
+    if colunas:
+        params["columns"] = ",".join(colunas)
+        prefer += ",missing=default"
+    return _gravar_em_lotes(table, rows, prefer, params, tamanho_lote, retornar, "upsert")
+
+
+def supabase_table_update(
+    table: str,
+    filters: Dict[str, Any],
     data: Dict[str, Any]
-) -> Optional[Dict]:
+) -> Optional[List[Dict]]:
     """
-    Insere um registro em uma tabela do Supabase via REST API.
+    Atualiza registros em uma tabela do Supabase via REST API.
     """
     client = get_supabase_client()
     if not client:
@@ -94,22 +497,34 @@ def supabase_table_insert(
     url = f"{client['url']}/rest/v1/{table}"
     headers = get_headers_with_jwt()
 
+    params = montar_filtros(filters)
+
     try:
-        response = requests.post(url, headers=headers, json=data)
+        response = _request("PATCH", url, headers=headers, params=params, json=data)
         response.raise_for_status()
-        result = response.json()
-        return result[0] if result else None
+        consultas_cache.invalidar_tabelas(table)
+        return response.json()
     except requests.exceptions.RequestException as e:
-        st.error(f"Erro ao inserir em {table}: {e}")
+        st.error(f"Erro ao atualizar {table}: {e}")
         return None
 
-def supabase_table_update(
+def supabase_table_update_condicional(
     table: str,
     filters: Dict[str, Any],
     data: Dict[str, Any]
-) -> Optional[List[Dict]]:
+) -> Optional[int]:
     """
-    Atualiza registros em uma tabela do Supabase via REST API.
+    UPDATE condicional em um único round trip: os filtros são a condição
+    (ex.: token igual e ainda não expirado) e nenhuma linha é devolvida
+    (`return=minimal`); o número de linhas afetadas vem do Content-Range
+    (`count=exact`).
+
+    A requisição não é repetida em caso de erro de leitura ou 5xx: se a
+    primeira tentativa tivesse sido aplicada, a repetição não encontraria
+    mais a linha (condição já consumida) e retornaria 0.
+
+    Returns:
+        Linhas afetadas (0 = condição não atendida) ou None em caso de erro
     """
     client = get_supabase_client()
     if not client:
@@ -117,16 +532,17 @@ def supabase_table_update(
 
     url = f"{client['url']}/rest/v1/{table}"
     headers = get_headers_with_jwt()
+    headers["Prefer"] = "return=minimal,count=exact"
 
-    params = {}
-    if filters:
-        for key, value in filters.items():
-            params[key] = f"eq.{value}"
+    params = montar_filtros(filters)
 
     try:
-        response = requests.patch(url, headers=headers, params=params, json=data)
+        response = _request("PATCH", url, repetir=False, headers=headers, params=params, json=data)
         response.raise_for_status()
-        return response.json()
+        afetadas = total_content_range(response)
+        if afetadas:
+            consultas_cache.invalidar_tabelas(table)
+        return afetadas if afetadas is not None else 0
     except requests.exceptions.RequestException as e:
         st.error(f"Erro ao atualizar {table}: {e}")
         return None
@@ -145,22 +561,308 @@ def supabase_table_delete(
     url = f"{client['url']}/rest/v1/{table}"
     headers = get_headers_with_jwt()
 
-    params = {}
-    if filters:
-        for key, value in filters.items():
-            params[key] = f"eq.{value}"
+    params = montar_filtros(filters)
 
     try:
-        response = requests.delete(url, headers=headers, params=params)
+        response = _request("DELETE", url, headers=headers, params=params)
         response.raise_for_status()
+        consultas_cache.invalidar_tabelas(table)
         return True
     except requests.exceptions.RequestException as e:
         st.error(f"Erro ao deletar de {table}: {e}")
         return False
 
-def testar_conexao() -> bool:
+def supabase_table_count(
+    table: str,
+    filters: Optional[Dict[str, Any]] = None,
+    cache_ttl: Optional[float] = None
+) -> Optional[int]:
+    """
+    Conta registros sem baixar linhas: HEAD com `Prefer: count=exact`,
+    lendo o total do header Content-Range (ex.: "*/1234").
+    Aceita os mesmos filtros de supabase_table_select.
+    """
+    return _ler(montar_count(table, filters), cache_ttl)
+
+def supabase_table_aggregate(
+    table: str,
+    agregados: Dict[str, str],
+    group_by: Optional[List[str]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    order: Optional[str] = None,
+    cache_ttl: Optional[float] = None
+) -> Optional[List[Dict]]:
+    """
+    Executa funções de agregação do PostgREST (count, sum, avg, min, max).
+
+    Args:
+        table: Nome da tabela
+        agregados: Alias → expressão, ex.: {"total": "count()",
+            "dor_media": "percentual_dor.avg()"}
+        group_by: Colunas de agrupamento (ex.: ["especie"])
+        filters: Filtros de igualdade
+        order: Ordenação (ex.: "especie")
+
+    Returns:
+        Uma linha por grupo (ou uma única linha sem group_by), ou None se a
+        consulta falhar, por exemplo quando os agregados estão desabilitados
+        (`db-aggregates-enabled`).
+    """
+    return _ler(montar_aggregate(table, agregados, group_by, filters, order), cache_ttl, alertar=False)
+
+def supabase_rpc(
+    funcao: str,
+    params: Optional[Dict[str, Any]] = None,
+    tabelas: Tuple[str, ...] = (),
+    cache_ttl: Optional[float] = None
+) -> Optional[Any]:
+    """
+    Chama uma função do Postgres exposta pelo PostgREST (/rpc/<funcao>).
+    Com `cache_ttl`, o resultado fica em cache e é invalidado por escritas
+    em `tabelas`.
+    """
+    return _ler(montar_rpc(funcao, params, tabelas), cache_ttl, alertar=False)
+
+def testar_conexao(table: str = "usuarios") -> bool:
+    """
+    Testa a conexão com o Supabase: HEAD com `limit=0`, que passa pela
+    autenticação e pelo PostgREST sem trafegar nenhuma linha.
+    """
+    client = get_supabase_client()
+    if not client:
+        return False
+
+    headers = get_headers_with_jwt()
+    headers.pop("Prefer", None)
+
+    try:
+        _ping(client["url"], headers, table)
+        return True
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Falha no teste de conexão com o Supabase: {e}")
+        return False
+
+def _ping(url_base: str, headers: Dict[str, str], table: str = "usuarios") -> None:
+    """HEAD com `limit=0`; levanta RequestException em caso de falha."""
+    response = _request(
+        "HEAD",
+        f"{url_base}/rest/v1/{table}",
+        headers=headers,
+        params={"select": PING, "limit": 0},
+    )
+    response.raise_for_status()
+
+
+# ==========================================================
+# Cliente supabase-py (singleton) e saúde da conexão
+# ==========================================================
+class GerenciadorSupabase:
     """
-    Testa a conexão com o Supabase.
+    Dono, por processo, do cliente supabase-py e do pool HTTP dos helpers
+    REST: ambos são criados sob demanda, uma única vez (thread-safe).
+
+    `aquecer()` cria os dois em segundo plano e inicia uma verificação
+    periódica (HEAD com limit=0), que mantém o pool aquecido e alimenta
+    os estados de prontidão (`pronto`) e vivacidade (`vivo`). O estado é
+    publicado em SUPABASE_SAUDE_ARQUIVO para as sondas do contêiner
+    (`python -m backend.database.saude`).
     """
-    result = supabase_table_select("usuarios", limit=1)
-    return result is not None
+
+    def __init__(
+        self,
+        intervalo: float = SUPABASE_SAUDE_INTERVALO,
+        arquivo_estado: Optional[str] = SUPABASE_SAUDE_ARQUIVO,
+    ):
+        self.intervalo = intervalo
+        self.arquivo_estado = arquivo_estado
+        self._lock = threading.Lock()
+        self._cliente = None
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+        self._conectado = threading.Event()
+        self._estado: Dict[str, Any] = {
+            "iniciado_em": None,
+            "ultima_verificacao": None,
+            "ultimo_sucesso": None,
+            "latencia_ms": None,
+            "falhas_consecutivas": 0,
+            "erro": None,
+        }
+
+    # --- cliente --------------------------------------------------
+    def cliente(self):
+        """Cliente supabase-py do processo (criado na primeira chamada)."""
+        if self._cliente is None:
+            with self._lock:
+                if self._cliente is None:
+                    # Import pesado: só quando o cliente é de fato usado
+                    from supabase import create_client
+
+                    credenciais = _credenciais()
+                    cliente = create_client(credenciais["url"], credenciais["key"])
+                    # Cria o cliente PostgREST (preguiçoso no supabase-py)
+                    # aqui, sob o lock, e não na primeira consulta concorrente
+                    cliente.postgrest
+                    self._cliente = cliente
+                    logger.info("✅ Cliente Supabase criado")
+        return self._cliente
+
+    # --- saúde ----------------------------------------------------
+    def verificar(self) -> bool:
+        """Executa uma verificação de saúde agora e atualiza o estado."""
+        inicio = time.monotonic()
+        erro = None
+        try:
+            credenciais = _credenciais()
+            get_http_session()
+            self.cliente()
+            # Chave anon: a verificação não depende do usuário logado
+            _ping(credenciais["url"], {
+                "apikey": credenciais["key"],
+                "Authorization": f"Bearer {credenciais['key']}",
+            })
+        except Exception as e:
+            erro = str(e) or type(e).__name__
+        latencia = (time.monotonic() - inicio) * 1000
+
+        agora = time.time()
+        with self._lock:
+            estado = self._estado
+            estado["ultima_verificacao"] = agora
+            estado["erro"] = erro
+            if erro is None:
+                estado["ultimo_sucesso"] = agora
+                estado["latencia_ms"] = round(latencia, 1)
+                estado["falhas_consecutivas"] = 0
+            else:
+                estado["falhas_consecutivas"] += 1
+                falhas = estado["falhas_consecutivas"]
+
+        # Publica antes de acordar quem aguarda a conexão
+        self._publicar()
+
+        if erro is None:
+            if not self._conectado.is_set():
+                logger.info(f"✅ Supabase pronto ({latencia:.0f} ms)")
+            self._conectado.set()
+        else:
+            self._conectado.clear()
+            # Loga a primeira falha e depois só de vez em quando
+            if falhas == 1 or falhas % 10 == 0:
+                logger.warning(f"⚠️ Verificação de saúde do Supabase falhou ({falhas}x): {erro}")
+
+        return erro is None
+
+    def _executar(self) -> None:
+        while True:
+            self.verificar()
+            if self._parar.wait(self.intervalo):
+                return
+
+    def aquecer(self) -> None:
+        """Inicia (uma vez por processo) o aquecimento e a verificação periódica."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._parar.clear()
+            self._estado["iniciado_em"] = time.time()
+            self._thread = threading.Thread(target=self._executar, name="supabase-saude", daemon=True)
+            self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        """Bloqueia até a primeira verificação bem-sucedida (ou o timeout)."""
+        return self._conectado.wait(timeout)
+
+    # --- estados --------------------------------------------------
+    def _idade_maxima(self) -> float:
+        # Tolera uma verificação atrasada por lentidão do Supabase
+        return 2 * self.intervalo + SUPABASE_CONNECT_TIMEOUT + SUPABASE_READ_TIMEOUT
+
+    def pronto(self) -> bool:
+        """Prontidão: a última verificação passou e é recente."""
+        with self._lock:
+            estado = dict(self._estado)
+        return (
+            estado["erro"] is None
+            and estado["ultimo_sucesso"] is not None
+            and time.time() - estado["ultimo_sucesso"] <= self._idade_maxima()
+        )
+
+    def vivo(self) -> bool:
+        """
+        Vivacidade: a verificação periódica continua rodando. Falhas do
+        Supabase afetam só a prontidão; reiniciar o contêiner não as resolve.
+        """
+        with self._lock:
+            thread = self._thread
+            ultima = self._estado["ultima_verificacao"] or self._estado["iniciado_em"]
+        if thread is None:
+            return True
+        return thread.is_alive() and time.time() - ultima <= self._idade_maxima()
+
+    def estado(self) -> Dict[str, Any]:
+        with self._lock:
+            estado = dict(self._estado)
+        estado["pronto"] = self.pronto()
+        estado["vivo"] = self.vivo()
+        estado["intervalo"] = self.intervalo
+        estado["pid"] = os.getpid()
+        return estado
+
+    def _publicar(self) -> None:
+        if not self.arquivo_estado:
+            return
+        temporario = f"{self.arquivo_estado}.{os.getpid()}.tmp"
+        try:
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self.estado(), f)
+            os.replace(temporario, self.arquivo_estado)
+        except OSError as e:
+            logger.debug(f"Não foi possível publicar o estado da conexão: {e}")
+
+
+_gerenciador = GerenciadorSupabase()
+
+
+def get_supabase():
+    """
+    Cliente supabase-py compartilhado pelo processo.
+
+    Autentica sempre com a chave anon: ele é único por processo e não
+    carrega o JWT de nenhuma sessão. Consultas a dados do usuário (sob RLS)
+    devem usar os helpers REST / Consulta, que enviam o JWT da sessão em
+    cada requisição (get_headers_with_jwt).
+    """
+    return _gerenciador.cliente()
+
+
+def aquecer_supabase() -> None:
+    """Aquece cliente e pool em segundo plano (chamar na inicialização do app)."""
+    _gerenciador.aquecer()
+
+
+def aguardar_supabase(timeout: Optional[float] = None) -> bool:
+    """Aguarda a conexão ficar pronta; False se o timeout expirar."""
+    _gerenciador.aquecer()
+    return _gerenciador.aguardar(timeout)
+
+
+def verificar_conexao() -> bool:
+    """Verificação de saúde imediata (atualiza o estado publicado)."""
+    return _gerenciador.verificar()
+
+
+def supabase_pronto() -> bool:
+    return _gerenciador.pronto()
+
+
+def supabase_vivo() -> bool:
+    return _gerenciador.vivo()
+
+
+def estado_conexao() -> Dict[str, Any]:
+    """Estado da conexão (prontidão, vivacidade, latência, último erro)."""
+    return _gerenciador.estado()
@@ -1,11 +1,9 @@
-from .supabase_client import supabase
-
-def testar_conexao():
-    try:
-        # Faz uma simples consulta no Supabase
-        response = supabase.table("teste").select("*").limit(1).execute()
-        print("Conexão com Supabase OK!")
-        return True
-    except Exception as e:
-        print("Erro ao conectar ao Supabase:", e)
-        return False
+from .supabase_client import testar_conexao as _ping
+
+def testar_conexao():
+    # HEAD com limit=0: confirma acesso ao PostgREST sem trafegar linhas
+    if _ping():
+        print("Conexão com Supabase OK!")
+        return True
+    print("Erro ao conectar ao Supabase")
+    return False
@@ -1,25 +1,34 @@
-  # PETdor2/backend/especies/base.py
-  from dataclasses import dataclass, field
-  from typing import List, Dict, Any
-
-  @dataclass
-  class Pergunta:
-      id: str
-      texto: str
-      escala: str  # Ex: "0-7", "sim-nao"
-      peso: float = 1.0  # Peso da pergunta na pontuação final
-
-  @dataclass
-  class EspecieConfig:
-      id: str
-      nome: str
-      perguntas: List[Pergunta]
-      limites_dor: Dict[str, str] = field(default_factory=dict)  # Ex: {"0-2": "Baixa", "3-5": "Média", "6-7": "Alta"}
-
-      def to_dict(self):
-          return {
-              "id": self.id,
-              "nome": self.nome,
-              "perguntas": [p.__dict__ for p in self.perguntas],
-              "limites_dor": self.limites_dor
-          }
+# PETdor2/backend/especies/base.py
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Any
+
+
+@dataclass
+class Pergunta:
+    texto: str
+    invertida: bool = False  # True: resposta alta indica MENOS dor
+    peso: float = 1.0  # Peso da pergunta na pontuação final
+
+
+@dataclass
+class EspecieConfig:
+    nome: str
+    especie_id: str
+    descricao: str = ""
+    opcoes_escala: List[str] = field(default_factory=list)  # Ex: ["0 - Nunca", ..., "7 - Constante"]
+    perguntas: List[Pergunta] = field(default_factory=list)
+    limites_dor: Dict[str, str] = field(default_factory=dict)  # Faixas de percentual, ex: {"0-30": "Leve", "31-60": "Moderada"}
+
+    @property
+    def id(self) -> str:
+        return self.especie_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.especie_id,
+            "nome": self.nome,
+            "descricao": self.descricao,
+            "opcoes_escala": list(self.opcoes_escala),
+            "perguntas": [asdict(p) for p in self.perguntas],
+            "limites_dor": dict(self.limites_dor),
+        }
@@ -0,0 +1,184 @@
+# PETdor2/backend/especies/catalogo.py
+"""
+Snapshot compilado do catálogo de espécies.
+
+Todas as EspecieConfig são serializadas em um único JSON compacto
+(`catalogo.json`) com versão de formato e hash do código-fonte das
+espécies. O registro (index.py) carrega o arquivo com uma única leitura
+em vez de importar cada módulo; se o hash não bater com as fontes atuais,
+o snapshot é reconstruído e regravado automaticamente.
+
+Gerado no build da imagem (backend/Dockerfile):
+    python -m backend.especies.catalogo
+"""
+import hashlib
+import importlib
+import json
+import logging
+import os
+import pkgutil
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+from .base import EspecieConfig
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando o formato do arquivo mudar
+VERSAO_CATALOGO = 1
+
+_DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_CATALOGO = os.environ.get("PETDOR_CATALOGO_ESPECIES", os.path.join(_DIRETORIO, "catalogo.json"))
+
+# Módulos do pacote que não são espécies
+MODULOS_INTERNOS = {"base", "catalogo", "index", "loader", "scoring"}
+
+
+# ==========================================================
+# Fontes das espécies
+# ==========================================================
+def descobrir_modulos() -> List[str]:
+    """Lista os módulos de espécie do pacote sem importá-los."""
+    return sorted(
+        info.name
+        for info in pkgutil.iter_modules([_DIRETORIO])
+        if not info.ispkg and info.name not in MODULOS_INTERNOS and not info.name.startswith("_")
+    )
+
+
+def configs_do_modulo(modulo: str) -> List[EspecieConfig]:
+    """Importa um módulo de espécie e retorna as CONFIG_* que ele define."""
+    mod = importlib.import_module(f".{modulo}", __package__)
+    return [v for k, v in vars(mod).items() if k.startswith("CONFIG_") and isinstance(v, EspecieConfig)]
+
+
+def hash_fontes(modulos: Sequence[str]) -> Optional[str]:
+    """
+    Hash SHA-256 do código-fonte de base.py e dos módulos de espécie.
+    Retorna None se alguma fonte não estiver disponível (ex.: só .pyc).
+    """
+    h = hashlib.sha256(f"v{VERSAO_CATALOGO}".encode())
+    for modulo in ["base", *sorted(modulos)]:
+        try:
+            with open(os.path.join(_DIRETORIO, f"{modulo}.py"), "rb") as f:
+                conteudo = f.read()
+        except OSError:
+            return None
+        h.update(modulo.encode())
+        h.update(b"\0")
+        h.update(conteudo)
+    return h.hexdigest()
+
+
+# ==========================================================
+# Construção, gravação e leitura
+# ==========================================================
+def construir_catalogo(modulos: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Importa os módulos de espécie e monta o snapshot em memória."""
+    modulos = list(descobrir_modulos() if modulos is None else modulos)
+    especies = []
+    completo = True
+    for modulo in modulos:
+        try:
+            configs = configs_do_modulo(modulo)
+        except Exception as e:
+            logger.error(f"❌ Erro ao carregar espécie {modulo}: {e}")
+            completo = False
+            continue
+        if not configs:
+            logger.error(f"❌ Módulo de espécie '{modulo}' não define nenhuma CONFIG_*")
+        especies.extend(config.to_dict() for config in configs)
+
+    return {
+        "versao": VERSAO_CATALOGO,
+        # Sem hash, um catálogo parcial nunca é considerado válido
+        "hash": hash_fontes(modulos) if completo else None,
+        "modulos": modulos,
+        "especies": especies,
+    }
+
+
+def gravar_catalogo(catalogo: Dict[str, Any], caminho: str = CAMINHO_CATALOGO) -> bool:
+    """Grava o snapshot de forma atômica. Retorna False se não for possível."""
+    dados = json.dumps(catalogo, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    try:
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), prefix=".catalogo-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(dados)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except OSError as e:
+        logger.warning(f"⚠️ Não foi possível gravar o catálogo de espécies em {caminho}: {e}")
+        return False
+    logger.info(f"✅ Catálogo de espécies gravado em {caminho} ({len(dados)} bytes)")
+    return True
+
+
+def _ler_catalogo(caminho: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(caminho, "rb") as f:
+            catalogo = json.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Catálogo de espécies ilegível ({caminho}): {e}")
+        return None
+    if not isinstance(catalogo, dict) or catalogo.get("versao") != VERSAO_CATALOGO:
+        return None
+    return catalogo
+
+
+def carregar_catalogo(
+    modulos: Optional[Sequence[str]] = None,
+    caminho: str = CAMINHO_CATALOGO,
+    reconstruir: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    Lê o snapshot e confere o hash com as fontes atuais.
+
+    Se o arquivo não existir, tiver outra versão ou estiver desatualizado,
+    reconstrói a partir dos módulos (e tenta regravar) quando `reconstruir`
+    for True; caso contrário retorna None.
+    """
+    modulos = list(descobrir_modulos() if modulos is None else modulos)
+    hash_atual = hash_fontes(modulos)
+    catalogo = _ler_catalogo(caminho)
+
+    if catalogo is not None and catalogo.get("modulos") == modulos:
+        # Sem as fontes (hash_atual None), confia no snapshot do build
+        if hash_atual is None or catalogo.get("hash") == hash_atual:
+            return catalogo
+
+    if not reconstruir:
+        return None
+
+    motivo = "ausente" if catalogo is None else "desatualizado"
+    logger.info(f"🔄 Catálogo de espécies {motivo}; reconstruindo")
+    catalogo = construir_catalogo(modulos)
+    if catalogo["hash"]:
+        gravar_catalogo(catalogo, caminho)
+    return catalogo
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    catalogo = construir_catalogo()
+    if not catalogo["hash"] or not gravar_catalogo(catalogo):
+        return 1
+    print(f"{len(catalogo['especies'])} espécies, hash {catalogo['hash']}")
+    return 0
+
+
+__all__ = [
+    "VERSAO_CATALOGO",
+    "CAMINHO_CATALOGO",
+    "descobrir_modulos",
+    "hash_fontes",
+    "construir_catalogo",
+    "gravar_catalogo",
+    "carregar_catalogo",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,50 +1,201 @@
 # PETdor2/backend/especies/index.py
 """
 Sistema central de registro e consulta das espécies e suas configurações.
+
+O registro é preguiçoso: importar este módulo não carrega nenhuma espécie.
+Na primeira consulta, todas as espécies são lidas do catálogo compilado
+(catalogo.py, um único arquivo JSON reconstruído se o hash das fontes
+mudar). Sem catálogo utilizável, os módulos de espécie descobertos
+(pkgutil, sem import) são importados sob demanda, um a um. A
+configuração carregada é congelada uma única vez por processo
+(MappingProxyType + tuplas) e compartilhada por todas as sessões.
+
+Para medir o custo de inicialização:
+    python -m backend.especies.index
 """
 import logging
-from typing import Dict, List, Optional
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+from . import catalogo
 from .base import EspecieConfig, Pergunta # Importação correta de .base
 
 logger = logging.getLogger(__name__)
 
-# Onde todas as espécies são armazenadas
-_ESPECIES_REGISTRADAS: Dict[str, dict] = {}
+# Ordem de exibição (espécies descobertas fora desta lista vêm depois)
+ORDEM_ESPECIES = ("cao", "gato", "coelho", "porquinho_da_india", "aves", "repteis")
+
+# Configurações congeladas, por ID da espécie
+_ESPECIES_REGISTRADAS: Dict[str, Mapping[str, Any]] = {}
+
+# Módulos de espécie descobertos e ainda não importados
+_MODULOS_PENDENTES: Optional[List[str]] = None
+
+# True depois da primeira tentativa de carregar o catálogo compilado
+_SNAPSHOT_TENTADO = False
+
+# Tempo de carga (segundos) do catálogo e de cada módulo de espécie
+_TEMPOS_CARGA: Dict[str, float] = {}
+
+_LOCK = threading.RLock()
+
 
 # ==========================================================
-# Funções de registro e busca
+# Representação imutável
 # ==========================================================
-def registrar_especie(config):
+def _congelar(config: Union[EspecieConfig, Mapping[str, Any]]) -> Mapping[str, Any]:
     """
-    Registra a configuração de uma espécie.
-    Aceita EspecieConfig (dataclass) ou dict.
+    Converte a configuração em um mapeamento somente leitura.
+    Listas viram tuplas e cada pergunta vira um MappingProxyType.
     """
-    # Se for dataclass, converte para dict
     if isinstance(config, EspecieConfig):
         config = config.to_dict()
-    especie_id = config.get("id") # Pega o 'id' que vem do to_dict() da EspecieConfig
+    congelada = dict(config)
+    congelada["opcoes_escala"] = tuple(config.get("opcoes_escala", ()))
+    congelada["perguntas"] = tuple(MappingProxyType(dict(p)) for p in config.get("perguntas", ()))
+    congelada["limites_dor"] = MappingProxyType(dict(config.get("limites_dor", {})))
+    return MappingProxyType(congelada)
+
+
+# ==========================================================
+# Descoberta e carga preguiçosa
+# ==========================================================
+def _descobrir_modulos() -> List[str]:
+    """Lista os módulos de espécie do pacote sem importá-los."""
+    global _MODULOS_PENDENTES
+    if _MODULOS_PENDENTES is None:
+        _MODULOS_PENDENTES = sorted(catalogo.descobrir_modulos(), key=_posicao)
+    return _MODULOS_PENDENTES
+
+
+def _posicao(especie_id: str):
+    if especie_id in ORDEM_ESPECIES:
+        return (ORDEM_ESPECIES.index(especie_id), especie_id)
+    return (len(ORDEM_ESPECIES), especie_id)
+
+
+def _carregar_snapshot() -> bool:
+    """
+    Registra todas as espécies a partir do catálogo compilado (uma leitura
+    de arquivo). O catálogo é reconstruído se estiver desatualizado.
+    """
+    global _SNAPSHOT_TENTADO
+    if _SNAPSHOT_TENTADO:
+        return False
+    _SNAPSHOT_TENTADO = True
+
+    inicio = time.perf_counter()
+    try:
+        compilado = catalogo.carregar_catalogo()
+    except Exception as e:
+        logger.error(f"❌ Erro ao carregar o catálogo de espécies: {e}")
+        return False
+    finally:
+        _TEMPOS_CARGA["catalogo"] = time.perf_counter() - inicio
+    if not compilado:
+        return False
+
+    for config in compilado["especies"]:
+        # Registros explícitos (registrar_especie) têm precedência
+        if config.get("id") not in _ESPECIES_REGISTRADAS:
+            _registrar(config)
+    _descobrir_modulos().clear()
+    return True
+
+
+def _carregar_modulo(modulo: str) -> None:
+    """Importa um módulo de espécie e registra as EspecieConfig que ele define."""
+    inicio = time.perf_counter()
+    try:
+        configs = catalogo.configs_do_modulo(modulo)
+        if not configs:
+            logger.error(f"❌ Módulo de espécie '{modulo}' não define nenhuma CONFIG_*")
+        for config in configs:
+            _registrar(config)
+    except Exception as e:
+        logger.error(f"❌ Erro ao registrar {modulo}: {e}")
+    finally:
+        _TEMPOS_CARGA[modulo] = time.perf_counter() - inicio
+
+
+def _garantir_carregada(especie_id: str) -> None:
+    """Carrega a espécie (catálogo ou módulo), se ainda estiver pendente."""
+    with _LOCK:
+        pendentes = _descobrir_modulos()
+        if especie_id in _ESPECIES_REGISTRADAS or not pendentes:
+            return
+        if _carregar_snapshot():
+            return
+        if especie_id in pendentes:
+            # Convenção: o módulo tem o mesmo nome do ID da espécie
+            pendentes.remove(especie_id)
+            _carregar_modulo(especie_id)
+        if especie_id not in _ESPECIES_REGISTRADAS:
+            _garantir_todas()
+
+
+def _garantir_todas() -> None:
+    """Carrega todas as espécies ainda pendentes."""
+    with _LOCK:
+        pendentes = _descobrir_modulos()
+        if not pendentes:
+            return
+        if not _carregar_snapshot():
+            while pendentes:
+                _carregar_modulo(pendentes.pop(0))
+        logger.info(f"✅ Total de espécies registradas: {len(_ESPECIES_REGISTRADAS)}")
+
+
+# ==========================================================
+# Funções de registro e busca
+# ==========================================================
+def _registrar(config) -> str:
+    congelada = _congelar(config)
+    especie_id = congelada.get("id") # Pega o 'id' que vem do to_dict() da EspecieConfig
     if not especie_id:
         raise ValueError("Configuração de espécie inválida: falta o campo 'id'.")
     if especie_id in _ESPECIES_REGISTRADAS:
         logger.warning(f"⚠️ Espécie '{especie_id}' já registrada. Atualizando...")
-    _ESPECIES_REGISTRADAS[especie_id] = config
-    logger.info(f"✅ Espécie '{config.get('nome')}' registrada com sucesso")
+    _ESPECIES_REGISTRADAS[especie_id] = congelada
+    logger.info(f"✅ Espécie '{congelada.get('nome')}' registrada com sucesso")
+    return especie_id
+
+
+def registrar_especie(config):
+    """
+    Registra a configuração de uma espécie.
+    Aceita EspecieConfig (dataclass) ou dict.
+    """
+    with _LOCK:
+        _registrar(config)
+
+
+def buscar_especie_por_id(especie_id: str) -> Optional[Mapping[str, Any]]:
+    """Retorna a configuração completa (somente leitura) da espécie."""
+    config = _ESPECIES_REGISTRADAS.get(especie_id)
+    if config is None and isinstance(especie_id, str) and especie_id:
+        _garantir_carregada(especie_id)
+        config = _ESPECIES_REGISTRADAS.get(especie_id)
+    return config
 
-def buscar_especie_por_id(especie_id: str) -> Optional[dict]:
-    """Retorna a configuração completa da espécie."""
-    return _ESPECIES_REGISTRADAS.get(especie_id)
 
-def listar_especies() -> List[dict]:
+def listar_especies() -> List[Mapping[str, Any]]:
     """Lista todas as espécies registradas."""
-    return list(_ESPECIES_REGISTRADAS.values())
+    _garantir_todas()
+    return [_ESPECIES_REGISTRADAS[i] for i in sorted(_ESPECIES_REGISTRADAS, key=_posicao)]
+
 
 def get_especies_nomes() -> List[str]:
     """Retorna somente os nomes das espécies registradas."""
-    return [config["nome"] for config in _ESPECIES_REGISTRADAS.values()]
+    return [config["nome"] for config in listar_especies()]
+
 
 def get_especies_ids() -> List[str]:
     """Retorna somente os IDs das espécies registradas."""
-    return list(_ESPECIES_REGISTRADAS.keys())
+    return [config["id"] for config in listar_especies()]
+
 
 def get_escala_labels(escala: str) -> List[str]:
     """
@@ -65,6 +216,18 @@ def get_escala_labels(escala: str) -> List[str]:
             raise ValueError(f"Escala desconhecida: {escala}")
     raise ValueError(f"Escala desconhecida: {escala}")
 
+
+def estatisticas_registro() -> Dict[str, Any]:
+    """Módulos carregados, pendentes e tempo de carga de cada um."""
+    with _LOCK:
+        return {
+            "registradas": list(_ESPECIES_REGISTRADAS.keys()),
+            "pendentes": list(_descobrir_modulos()),
+            "tempos_carga": dict(_TEMPOS_CARGA),
+            "segundos_total": sum(_TEMPOS_CARGA.values()),
+        }
+
+
 # ==========================================================
 # Função para Streamlit carregar espécies
 # ==========================================================
@@ -75,27 +238,23 @@ def carregar_especies():
     """
     return listar_especies()
 
-# ==========================================================
-# Importar e registrar automaticamente todas as espécies
-# ==========================================================
-ESPECIES_IMPORTS = {
-    "cao": "CONFIG_CAES",
-    "gato": "CONFIG_GATOS",
-    "coelho": "CONFIG_COELHO",
-    "porquinho_da_india": "CONFIG_PORQUINHO_DA_INDIA", # <--- CORRIGIDO AQUI!
-    "aves": "CONFIG_AVES",
-    "repteis": "CONFIG_REPTEIS"
-}
-
-for modulo, config_attr in ESPECIES_IMPORTS.items():
-    try:
-        # A importação relativa funciona porque index.py está dentro de um pacote
-        mod = __import__(f".{modulo}", globals(), locals(), [config_attr])
-        registrar_especie(getattr(mod, config_attr))
-    except Exception as e:
-        logger.error(f"❌ Erro ao registrar {modulo}: {e}")
 
-logger.info(f"✅ Total de espécies registradas: {len(_ESPECIES_REGISTRADAS)}")
+def _medir_inicializacao() -> None:
+    """Mede tempo e memória da carga completa do catálogo."""
+    import tracemalloc
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    _garantir_todas()
+    segundos = time.perf_counter() - inicio
+    atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Espécies: {get_especies_ids()}")
+    print(f"Carga completa: {segundos * 1000:.2f} ms, memória {atual / 1024:.1f} KiB (pico {pico / 1024:.1f} KiB)")
+    for modulo, tempo in sorted(_TEMPOS_CARGA.items()):
+        print(f"  {modulo}: {tempo * 1000:.2f} ms")
+
 
 __all__ = [
     "EspecieConfig",
@@ -106,5 +265,10 @@ __all__ = [
     "get_especies_nomes",
     "get_especies_ids",
     "get_escala_labels",
+    "estatisticas_registro",
     "carregar_especies",
 ]
+
+
+if __name__ == "__main__":
+    _medir_inicializacao()
@@ -5,8 +5,7 @@ Módulo para carregar e gerenciar dados de espécies.
 """
 # -------------------------------------------------------------------
 # A importação de .index está correta, pois get_especies_nomes reside lá.
-# O importante é garantir que o index.py seja executado (importado)
-# em algum ponto do app para que as espécies sejam registradas.
+# As espécies são carregadas sob demanda na primeira consulta ao registro.
 # -------------------------------------------------------------------
 from .index import get_especies_nomes
 
@@ -19,7 +18,4 @@ def listar_especies():
 
 # Exemplo de uso (opcional, para testes)
 if __name__ == "__main__":
-    # Para que este teste funcione, o index.py precisa ter sido executado
-    # e registrado as espécies. Em um ambiente de app, a importação
-    # do pacote backend.especies já cuidaria disso.
     print("Espécies listadas pelo loader:", listar_especies())
@@ -0,0 +1,214 @@
+# PETdor2/backend/especies/scoring.py
+"""
+Motor de pontuação pré-compilado por espécie.
+
+Cada EspecieConfig é compilada uma única vez em arrays NumPy (rótulo →
+valor, pesos, máscara de itens invertidos e faixas de `limites_dor`).
+O mesmo motor é usado pela página de avaliação, pelas exportações e pelo
+recálculo em lote de avaliações antigas.
+"""
+
+import bisect
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .base import EspecieConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ResultadoPontuacao:
+    pontuacao_total: float
+    percentual_dor: float
+    classificacao: Optional[str] = None
+
+
+class MotorPontuacao:
+    """
+    Pontuação de uma espécie, compilada a partir da configuração.
+
+    Regras:
+        - valor da resposta = posição do rótulo em `opcoes_escala` (0..n-1);
+        - itens invertidos usam (valor_maximo - valor);
+        - pontuação total = soma ponderada pelos pesos;
+        - percentual = pontuação total / pontuação máxima * 100.
+    """
+
+    def __init__(self, config: Union[EspecieConfig, Mapping[str, Any]]):
+        if isinstance(config, EspecieConfig):
+            config = config.to_dict()
+
+        perguntas = config.get("perguntas", [])
+
+        self.especie_id: str = config.get("id", "")
+        self.nome: str = config.get("nome", "")
+        self.labels: Tuple[str, ...] = tuple(config.get("opcoes_escala", []))
+        self.textos: Tuple[str, ...] = tuple(p["texto"] for p in perguntas)
+
+        self._valor_por_label: Dict[str, int] = {label: i for i, label in enumerate(self.labels)}
+        self._indice_por_texto: Dict[str, int] = {texto: i for i, texto in enumerate(self.textos)}
+
+        self.pesos = np.array([float(p.get("peso", 1.0)) for p in perguntas], dtype=np.float64)
+        self.invertidas = np.array([bool(p.get("invertida", False)) for p in perguntas], dtype=bool)
+        self.valor_maximo = max(len(self.labels) - 1, 0)
+        self.pontuacao_maxima = float(self.pesos.sum() * self.valor_maximo)
+
+        # Faixas "min-max" de percentual → rótulo, ordenadas pelo limite inferior
+        faixas = sorted(_parse_faixa(chave) + (rotulo,) for chave, rotulo in config.get("limites_dor", {}).items())
+        self._faixas_inicio: List[float] = [f[0] for f in faixas]
+        self._faixas: List[Tuple[float, float, str]] = faixas
+
+        for arr in (self.pesos, self.invertidas):
+            arr.setflags(write=False)
+
+    @property
+    def num_perguntas(self) -> int:
+        return len(self.textos)
+
+    # ------------------------------------------------------------
+    # Codificação das respostas
+    # ------------------------------------------------------------
+    def valor_label(self, resposta: Union[str, int]) -> int:
+        """Converte um rótulo da escala (ou seu índice) em valor numérico."""
+        if isinstance(resposta, (int, np.integer)) and not isinstance(resposta, bool):
+            valor = int(resposta)
+            if 0 <= valor <= self.valor_maximo:
+                return valor
+        elif resposta in self._valor_por_label:
+            return self._valor_por_label[resposta]
+        raise ValueError(f"Resposta fora da escala de {self.especie_id}: {resposta!r}")
+
+    def codificar(self, respostas: Union[Mapping[str, Any], Sequence[Any]]) -> np.ndarray:
+        """
+        Converte respostas em um vetor de valores, na ordem das perguntas.
+
+        Aceita um dicionário texto da pergunta → resposta (formato salvo em
+        `respostas_json`) ou uma sequência na ordem das perguntas.
+        """
+        vetor = np.empty(self.num_perguntas, dtype=np.int16)
+        if isinstance(respostas, Mapping):
+            if len(respostas) != self.num_perguntas:
+                faltando = [t for t in self.textos if t not in respostas]
+                raise ValueError(f"Respostas incompletas para {self.especie_id}: {faltando}")
+            for texto, resposta in respostas.items():
+                indice = self._indice_por_texto.get(texto)
+                if indice is None:
+                    raise ValueError(f"Pergunta desconhecida para {self.especie_id}: {texto!r}")
+                vetor[indice] = self.valor_label(resposta)
+        else:
+            if len(respostas) != self.num_perguntas:
+                raise ValueError(
+                    f"Esperadas {self.num_perguntas} respostas para {self.especie_id}, recebidas {len(respostas)}"
+                )
+            for indice, resposta in enumerate(respostas):
+                vetor[indice] = self.valor_label(resposta)
+        return vetor
+
+    # ------------------------------------------------------------
+    # Pontuação
+    # ------------------------------------------------------------
+    def score(self, respostas: Union[Mapping[str, Any], Sequence[Any]]) -> ResultadoPontuacao:
+        """Pontua uma avaliação."""
+        totais, percentuais = self.score_many(self.codificar(respostas)[np.newaxis, :])
+        percentual = float(percentuais[0])
+        return ResultadoPontuacao(
+            pontuacao_total=float(totais[0]),
+            percentual_dor=percentual,
+            classificacao=self.classificar(percentual),
+        )
+
+    def score_many(self, matriz: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pontua várias avaliações de uma vez.
+
+        Args:
+            matriz: array (n_avaliacoes, n_perguntas) com os valores já
+                codificados (ver `codificar`).
+
+        Returns:
+            Tupla (pontuações totais, percentuais de dor), arrays de tamanho n.
+        """
+        matriz = np.asarray(matriz)
+        if matriz.ndim != 2 or matriz.shape[1] != self.num_perguntas:
+            raise ValueError(
+                f"Matriz deve ter formato (n, {self.num_perguntas}) para {self.especie_id}, recebido {matriz.shape}"
+            )
+
+        ajustada = np.where(self.invertidas, self.valor_maximo - matriz, matriz)
+        totais = ajustada @ self.pesos
+        if self.pontuacao_maxima > 0:
+            percentuais = totais * (100.0 / self.pontuacao_maxima)
+        else:
+            percentuais = np.zeros_like(totais)
+        return totais, percentuais
+
+    def classificar(self, percentual: float) -> Optional[str]:
+        """
+        Retorna o rótulo de `limites_dor` para o percentual. Valores entre
+        duas faixas (ex.: 30.5 entre "0-30" e "31-60") ficam na faixa anterior.
+        """
+        posicao = bisect.bisect_right(self._faixas_inicio, percentual) - 1
+        if posicao < 0:
+            return None
+        _, fim, rotulo = self._faixas[posicao]
+        if posicao == len(self._faixas) - 1 and percentual > fim:
+            return None
+        return rotulo
+
+
+def _parse_faixa(chave: str) -> Tuple[float, float]:
+    """Converte "30-60" em (30.0, 60.0)."""
+    inicio, _, fim = str(chave).partition("-")
+    try:
+        return float(inicio), float(fim or inicio)
+    except ValueError:
+        raise ValueError(f"Faixa de limites_dor inválida: {chave!r}")
+
+
+# ==========================================================
+# Motores compilados (um por espécie, por processo)
+# ==========================================================
+_MOTORES: Dict[str, Tuple[int, MotorPontuacao]] = {}
+_MOTORES_LOCK = threading.Lock()
+
+
+def _resolver_config(especie: str) -> Optional[Mapping[str, Any]]:
+    """Busca a configuração pelo ID da espécie ou pelo nome exibido."""
+    from .index import buscar_especie_por_id, listar_especies
+
+    config = buscar_especie_por_id(especie)
+    if config:
+        return config
+    chave = str(especie).strip().lower()
+    return next((c for c in listar_especies() if str(c.get("nome", "")).lower() == chave), None)
+
+
+def obter_motor(especie: str) -> Optional[MotorPontuacao]:
+    """
+    Retorna o motor compilado da espécie (por ID ou nome), ou None se a
+    espécie não estiver registrada. Recompila se a configuração mudar.
+    """
+    config = _resolver_config(especie)
+    if not config:
+        return None
+
+    with _MOTORES_LOCK:
+        cache = _MOTORES.get(config["id"])
+        if cache and cache[0] == id(config):
+            return cache[1]
+        motor = MotorPontuacao(config)
+        _MOTORES[config["id"]] = (id(config), motor)
+        logger.debug(f"Motor de pontuação compilado para '{motor.especie_id}'")
+        return motor
+
+
+__all__ = [
+    "ResultadoPontuacao",
+    "MotorPontuacao",
+    "obter_motor",
+]
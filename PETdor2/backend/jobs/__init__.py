@@ -0,0 +1,2 @@
+# backend/jobs/__init__.py
+# Tarefas em lote executadas fora do Streamlit (ex.: python -m backend.jobs.<tarefa>)
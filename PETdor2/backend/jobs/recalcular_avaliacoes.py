@@ -0,0 +1,245 @@
+# PETdor2/backend/jobs/recalcular_avaliacoes.py
+"""
+Recálculo em lote de `pontuacao_total` / `percentual_dor` das avaliações.
+
+Quando os pesos ou perguntas de uma espécie mudam em backend/especies/*.py,
+os valores gravados ficam desatualizados. Esta tarefa:
+
+1. lê `avaliacoes` em páginas (keyset por id);
+2. decodifica `respostas_json` em uma matriz NumPy por espécie;
+3. pontua cada matriz de uma vez com MotorPontuacao.score_many;
+4. grava apenas as linhas que mudaram com upsert em lote;
+5. reporta throughput (linhas/s), divergências e erros.
+
+Uso (a partir de PETdor2/, com credenciais que enxerguem todas as linhas):
+    python -m backend.jobs.recalcular_avaliacoes --especie cao --gravar
+"""
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from backend.database.supabase_client import supabase_table_select, supabase_table_upsert
+from backend.especies.scoring import MotorPontuacao, obter_motor
+
+logger = logging.getLogger(__name__)
+
+# Colunas relidas e regravadas no upsert (cobrem as colunas obrigatórias
+# gravadas por pages/avaliacao.salvar_avaliacao)
+_CAMPOS = "id, usuario_id, pet_id, especie, respostas_json, pontuacao_total, percentual_dor"
+
+# Mesmo arredondamento usado ao salvar pela página de avaliação
+# (pontuacao_total é inteira)
+_CASAS_PONTUACAO = 0
+_CASAS_PERCENTUAL = 1
+
+
+@dataclass
+class RelatorioRecalculo:
+    lidas: int = 0
+    recalculadas: int = 0
+    gravadas: int = 0
+    divergentes: List[Dict[str, Any]] = field(default_factory=list)
+    erros: List[Dict[str, Any]] = field(default_factory=list)
+    segundos: float = 0.0
+
+    @property
+    def linhas_por_segundo(self) -> float:
+        return self.lidas / self.segundos if self.segundos else 0.0
+
+    def resumo(self) -> str:
+        return (
+            f"{self.lidas} lidas, {self.recalculadas} recalculadas, "
+            f"{len(self.divergentes)} divergentes, {self.gravadas} gravadas, "
+            f"{len(self.erros)} erros em {self.segundos:.2f}s "
+            f"({self.linhas_por_segundo:.0f} linhas/s)"
+        )
+
+
+def iterar_avaliacoes(
+    tamanho_pagina: int = 500,
+    especie: Optional[str] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Percorre a tabela `avaliacoes` em páginas ordenadas por id (keyset),
+    até uma página vazia.
+    """
+    valores_especie = _valores_especie(especie) if especie else None
+    ultimo_id = None
+    while True:
+        filtros: Dict[str, Any] = {}
+        if valores_especie:
+            filtros["especie"] = valores_especie
+        if ultimo_id is not None:
+            filtros["id"] = {"gt": ultimo_id}
+
+        pagina = supabase_table_select(
+            "avaliacoes",
+            _CAMPOS,
+            filters=filtros,
+            order="id.asc",
+            limit=tamanho_pagina,
+        )
+        if pagina is None:
+            raise RuntimeError(f"Falha ao ler avaliações após id={ultimo_id}")
+        if not pagina:
+            return
+
+        yield pagina
+        # Só a página vazia encerra: o PostgREST corta em `max-rows` sem
+        # avisar, então uma página curta não significa fim da tabela
+        ultimo_id = pagina[-1]["id"]
+
+
+def _valores_especie(especie: str) -> List[str]:
+    """
+    Valores de `avaliacoes.especie` que correspondem à espécie: a coluna
+    guarda o valor do pet (nome de exibição, ex.: "Cachorro"), mas aceita-se
+    o ID ("cao") na linha de comando e em linhas que o tenham gravado.
+    """
+    motor = obter_motor(especie)
+    valores = {especie}
+    if motor:
+        valores.update((motor.nome, motor.especie_id))
+    return sorted(valores)
+
+
+def _decodificar_respostas(bruto: Any) -> Any:
+    """respostas_json pode vir como texto JSON (json.dumps) ou jsonb."""
+    if isinstance(bruto, str):
+        return json.loads(bruto)
+    return bruto
+
+
+def _recalcular_grupo(
+    motor: MotorPontuacao,
+    linhas: List[Dict[str, Any]],
+    relatorio: RelatorioRecalculo,
+) -> List[Dict[str, Any]]:
+    """
+    Pontua as linhas de uma espécie em uma única chamada vetorizada e
+    retorna as linhas cujos valores mudaram, prontas para o upsert.
+    """
+    validas = []
+    matriz = np.empty((len(linhas), motor.num_perguntas), dtype=np.int16)
+    for linha in linhas:
+        try:
+            matriz[len(validas)] = motor.codificar(_decodificar_respostas(linha.get("respostas_json")))
+            validas.append(linha)
+        except (ValueError, TypeError) as e:
+            relatorio.erros.append({"id": linha.get("id"), "erro": str(e)})
+
+    if not validas:
+        return []
+
+    totais, percentuais = motor.score_many(matriz[:len(validas)])
+    totais = np.round(totais, _CASAS_PONTUACAO)
+    percentuais = np.round(percentuais, _CASAS_PERCENTUAL)
+
+    antigos_totais = np.array([_numero(l.get("pontuacao_total")) for l in validas])
+    antigos_percentuais = np.array([_numero(l.get("percentual_dor")) for l in validas])
+    mudou = ~(np.isclose(totais, antigos_totais) & np.isclose(percentuais, antigos_percentuais))
+
+    relatorio.recalculadas += len(validas)
+
+    alteradas = []
+    for i in np.flatnonzero(mudou):
+        linha = validas[i]
+        novo_total = int(totais[i])
+        novo_percentual = float(percentuais[i])
+        relatorio.divergentes.append({
+            "id": linha["id"],
+            "especie": motor.especie_id,
+            "pontuacao_total": (linha.get("pontuacao_total"), novo_total),
+            "percentual_dor": (linha.get("percentual_dor"), novo_percentual),
+        })
+        alteradas.append({
+            **{k: linha.get(k) for k in ("id", "usuario_id", "pet_id", "especie", "respostas_json")},
+            "pontuacao_total": novo_total,
+            "percentual_dor": novo_percentual,
+        })
+    return alteradas
+
+
+def _numero(valor: Any) -> float:
+    """Valor numérico gravado (NaN quando ausente, para sempre divergir)."""
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def recalcular_avaliacoes(
+    gravar: bool = False,
+    especie: Optional[str] = None,
+    tamanho_pagina: int = 500,
+) -> RelatorioRecalculo:
+    """
+    Recalcula as pontuações de todas as avaliações (ou de uma espécie).
+
+    Args:
+        gravar: Se False (padrão), apenas reporta as divergências
+        especie: ID ou nome da espécie a recalcular (None = todas)
+        tamanho_pagina: Linhas lidas (e gravadas) por requisição
+    """
+    relatorio = RelatorioRecalculo()
+    inicio = time.perf_counter()
+
+    for pagina in iterar_avaliacoes(tamanho_pagina, especie):
+        relatorio.lidas += len(pagina)
+
+        por_especie: Dict[str, List[Dict[str, Any]]] = {}
+        for linha in pagina:
+            por_especie.setdefault(linha.get("especie") or "", []).append(linha)
+
+        alteradas = []
+        for especie_linha, linhas in por_especie.items():
+            motor = obter_motor(especie_linha)
+            if not motor:
+                relatorio.erros.extend(
+                    {"id": l.get("id"), "erro": f"Espécie não registrada: {especie_linha!r}"} for l in linhas
+                )
+                continue
+            alteradas.extend(_recalcular_grupo(motor, linhas, relatorio))
+
+        if gravar and alteradas:
+            if supabase_table_upsert("avaliacoes", alteradas, on_conflict="id") is None:
+                relatorio.erros.extend({"id": l["id"], "erro": "Falha no upsert"} for l in alteradas)
+            else:
+                relatorio.gravadas += len(alteradas)
+
+        logger.info(f"Recálculo parcial: {relatorio.lidas} linhas lidas")
+
+    relatorio.segundos = time.perf_counter() - inicio
+    logger.info(f"✅ Recálculo concluído: {relatorio.resumo()}")
+    return relatorio
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recalcula pontuações de avaliações de dor.")
+    parser.add_argument("--especie", help="ID ou nome da espécie (padrão: todas)")
+    parser.add_argument("--lote", type=int, default=500, help="Linhas por página (padrão: 500)")
+    parser.add_argument("--gravar", action="store_true", help="Grava os valores recalculados")
+    parser.add_argument("--detalhes", action="store_true", help="Lista cada linha divergente")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    relatorio = recalcular_avaliacoes(gravar=args.gravar, especie=args.especie, tamanho_pagina=args.lote)
+
+    print(relatorio.resumo())
+    if args.detalhes:
+        for divergente in relatorio.divergentes:
+            print(json.dumps(divergente, ensure_ascii=False))
+    for erro in relatorio.erros:
+        print(f"ERRO id={erro['id']}: {erro['erro']}")
+    return 1 if relatorio.erros else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
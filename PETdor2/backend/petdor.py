@@ -24,7 +24,7 @@ if BASE_DIR not in sys.path:
 # =======================================
 
 # Banco de dados
-from backend.database import testar_conexao, get_supabase
+from backend.database import aguardar_supabase, estado_conexao
 
 # Autenticação
 from backend.auth.user import (
@@ -60,17 +60,14 @@ from pages.confirmar_email import render as confirmar_email_app
 # =======================================
 # 🔧 Inicialização do Supabase
 # =======================================
-def inicializar_supabase():
+def inicializar_supabase(timeout: float = 30):
     """
     Inicializa o Supabase e testa a conexão.
     Retorna (True, None) se OK, ou (False, mensagem de erro) se falhar.
     """
     try:
-        get_supabase()
-        ok, msg = testar_conexao()
-
-        if not ok:
-            return False, f"Falha ao conectar ao Supabase: {msg}"
+        if not aguardar_supabase(timeout):
+            return False, f"Falha ao conectar ao Supabase: {estado_conexao()['erro'] or 'tempo esgotado'}"
 
         logger.info("✅ Supabase inicializado com sucesso.")
         return True, None
@@ -29,6 +29,25 @@ APP_CONFIG = {
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY") or os.getenv("SUPABASE_KEY")
 
+# Pool HTTP compartilhado pelos helpers REST (PostgREST)
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "3.05"))
+SUPABASE_READ_TIMEOUT = float(os.getenv("SUPABASE_READ_TIMEOUT", "15"))
+SUPABASE_MAX_RETRIES = int(os.getenv("SUPABASE_MAX_RETRIES", "3"))
+SUPABASE_BACKOFF = float(os.getenv("SUPABASE_BACKOFF", "0.3"))
+# Timeout padrão (segundos) de cada consulta no carregamento em paralelo (httpx)
+SUPABASE_ASYNC_TIMEOUT = float(os.getenv("SUPABASE_ASYNC_TIMEOUT", "5"))
+# Linhas por requisição nas gravações em lote (bulk insert/upsert)
+SUPABASE_LOTE_TAMANHO = int(os.getenv("SUPABASE_LOTE_TAMANHO", "500"))
+# Verificação de saúde em segundo plano (intervalo em segundos) e arquivo
+# onde o estado é publicado para as sondas do contêiner ("" desativa)
+SUPABASE_SAUDE_INTERVALO = float(os.getenv("SUPABASE_SAUDE_INTERVALO", "30"))
+SUPABASE_SAUDE_ARQUIVO = os.getenv("SUPABASE_SAUDE_ARQUIVO", str(ROOT_DIR / "supabase_saude.json"))
+
+# Cache de consultas de leitura (TTL em segundos; 0 desativa)
+SUPABASE_CACHE_TTL = float(os.getenv("SUPABASE_CACHE_TTL", "30"))
+SUPABASE_CACHE_MAX_ITENS = int(os.getenv("SUPABASE_CACHE_MAX_ITENS", "1024"))
+
 # ================================
 # CONFIG SMTP (EMAIL)
 # ================================
@@ -41,10 +60,54 @@ SMTP_REMETENTE = os.getenv("EMAIL_SENDER", SMTP_EMAIL)
 
 SMTP_USAR_SSL = os.getenv("EMAIL_USE_SSL", "True").lower() == "true"
 
+# Fila de envio em segundo plano (SQLite; sobrevive a reinícios)
+EMAIL_FILA_ARQUIVO = os.getenv("EMAIL_FILA_ARQUIVO", str(ROOT_DIR / "fila_emails.sqlite3"))
+# Threads de envio; cada uma mantém a própria conexão SMTP autenticada
+EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", "2"))
+# Tentativas por mensagem e espera inicial (dobra a cada falha)
+EMAIL_MAX_TENTATIVAS = int(os.getenv("EMAIL_MAX_TENTATIVAS", "5"))
+EMAIL_BACKOFF_SEGUNDOS = float(os.getenv("EMAIL_BACKOFF_SEGUNDOS", "10"))
+# Mensagens finalizadas (enviadas ou falhas) ficam só para diagnóstico, já
+# sem o corpo, e são apagadas após EMAIL_RETENCAO_SEGUNDOS
+EMAIL_RETENCAO_SEGUNDOS = float(os.getenv("EMAIL_RETENCAO_SEGUNDOS", str(24 * 3600)))
+EMAIL_LIMPEZA_INTERVALO = float(os.getenv("EMAIL_LIMPEZA_INTERVALO", "3600"))
+# Envio em lote (resumos): teto de mensagens por minuto (0 = sem limite)
+EMAIL_LOTE_LIMITE_MINUTO = int(os.getenv("EMAIL_LOTE_LIMITE_MINUTO", "60"))
+
 # ================================
 # SEGURANÇA
 # ================================
 SECRET_KEY = os.getenv("SECRET_KEY", "CHAVE_SECRETA_TEMPORARIA")
+# Chaveiro para rotação de chaves de token: "kid:segredo,kid:segredo"
+SECRET_KEYS = os.getenv("SECRET_KEYS", "")
+SECRET_KEY_ID = os.getenv("SECRET_KEY_ID", "")
+
+# ================================
+# AUTENTICAÇÃO (bcrypt fora da thread do Streamlit)
+# ================================
+# Workers do pool de processos (0 = um por núcleo)
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", "0"))
+# Tarefas aguardando além dos workers antes de rejeitar com "tente novamente"
+AUTH_FILA_MAX = int(os.getenv("AUTH_FILA_MAX", "32"))
+AUTH_TIMEOUT = float(os.getenv("AUTH_TIMEOUT", "10"))
+# Custo do bcrypt: calibrado no host para caber no orçamento de latência,
+# entre AUTH_BCRYPT_CUSTO_MIN (piso) e AUTH_BCRYPT_CUSTO_MAX
+# (AUTH_BCRYPT_CUSTO > 0 fixa o custo e desativa a calibração)
+AUTH_BCRYPT_ORCAMENTO_MS = float(os.getenv("AUTH_BCRYPT_ORCAMENTO_MS", "250"))
+AUTH_BCRYPT_CUSTO_MIN = int(os.getenv("AUTH_BCRYPT_CUSTO_MIN", "10"))
+AUTH_BCRYPT_CUSTO_MAX = int(os.getenv("AUTH_BCRYPT_CUSTO_MAX", "16"))
+AUTH_BCRYPT_CUSTO = int(os.getenv("AUTH_BCRYPT_CUSTO", "0"))
+# Limite de tentativas de login (token bucket): N tentativas por janela
+LOGIN_LIMITE_EMAIL = int(os.getenv("LOGIN_LIMITE_EMAIL", "5"))
+LOGIN_LIMITE_IP = int(os.getenv("LOGIN_LIMITE_IP", "20"))
+LOGIN_JANELA_SEGUNDOS = float(os.getenv("LOGIN_JANELA_SEGUNDOS", "300"))
+# Proxies confiáveis à frente do app: cada um acrescenta um endereço ao
+# X-Forwarded-For. 0 ignora o header e usa o endereço do socket.
+LOGIN_PROXIES_CONFIAVEIS = int(os.getenv("LOGIN_PROXIES_CONFIAVEIS", "1"))
+# Redis opcional para compartilhar os contadores entre réplicas
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "")
+# Tokens JWT já verificados mantidos em memória (até o exp de cada um)
+JWT_CACHE_MAX_ITENS = int(os.getenv("JWT_CACHE_MAX_ITENS", "4096"))
 
 # ================================
 # URL DO APP STREAMLIT
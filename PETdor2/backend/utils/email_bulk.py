@@ -0,0 +1,136 @@
+# PETdor2/backend/utils/email_bulk.py
+"""
+Envio de e-mails em lote (resumos periódicos para tutores, clínicas).
+
+`enviar_em_lote` consome um iterável de (destinatário, modelo, contexto)
+sem materializá-lo: cada mensagem é renderizada só quando chega a sua vez
+e todas passam pela mesma sessão SMTP autenticada. Um limite de mensagens
+por minuto (EMAIL_LOTE_LIMITE_MINUTO) espaça os envios para respeitar a
+cota do provedor. Falhas de uma mensagem não interrompem o lote.
+
+Para testar contra um servidor SMTP local (ex.: aiosmtpd):
+    conexao = ConexaoSMTP("127.0.0.1", 8025, usuario=None, senha=None,
+                          usar_ssl=False, starttls=False)
+    enviar_em_lote(itens, conexao=conexao)
+"""
+
+import logging
+import smtplib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Mapping, Optional, Tuple, Union
+
+from backend.utils.config import EMAIL_LOTE_LIMITE_MINUTO
+from backend.utils.email_sender import ConexaoSMTP, _montar_mensagem
+from backend.utils.email_templates import MODELO_RESUMO_DOR, ModeloEmail, obter_modelo
+
+logger = logging.getLogger(__name__)
+
+# Recusas por mensagem que não invalidam a sessão SMTP
+_RECUSAS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+# ============================================================
+#   LIMITE DE TAXA
+# ============================================================
+
+class LimitadorTaxa:
+    """Espaça os envios uniformemente para no máximo `por_minuto` mensagens."""
+
+    def __init__(self, por_minuto: int):
+        self.intervalo = 60.0 / por_minuto if por_minuto > 0 else 0.0
+        self._proximo = 0.0
+
+    def aguardar(self) -> None:
+        if not self.intervalo:
+            return
+        agora = time.monotonic()
+        if self._proximo > agora:
+            time.sleep(self._proximo - agora)
+            agora = self._proximo
+        self._proximo = agora + self.intervalo
+
+
+# ============================================================
+#   ENVIO EM LOTE
+# ============================================================
+
+@dataclass
+class ResultadoLote:
+    enviados: int = 0
+    falhas: List[Tuple[str, str]] = field(default_factory=list)
+    segundos: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return self.enviados + len(self.falhas)
+
+
+def enviar_em_lote(
+    itens: Iterable[Tuple[str, Union[str, ModeloEmail], Mapping[str, Any]]],
+    limite_por_minuto: int = EMAIL_LOTE_LIMITE_MINUTO,
+    conexao: Optional[ConexaoSMTP] = None,
+) -> ResultadoLote:
+    """
+    Envia cada (destinatário, modelo, contexto) pela mesma sessão SMTP.
+
+    Args:
+        itens: iterável (pode ser um gerador) consumido sob demanda; o
+            modelo pode ser um ModeloEmail ou o nome de um modelo registrado.
+        limite_por_minuto: teto de mensagens por minuto (0 = sem limite).
+        conexao: conexão a usar; por padrão uma ConexaoSMTP da configuração,
+            fechada ao final do lote.
+    """
+    resultado = ResultadoLote()
+    limitador = LimitadorTaxa(limite_por_minuto)
+    propria = conexao is None
+    conexao = conexao or ConexaoSMTP()
+    inicio = time.perf_counter()
+
+    try:
+        for destinatario, modelo, contexto in itens:
+            if not destinatario:
+                resultado.falhas.append((destinatario, "Endereço de e-mail do destinatário está vazio."))
+                continue
+            try:
+                if isinstance(modelo, str):
+                    modelo = obter_modelo(modelo)
+                assunto, texto, corpo_html = modelo.renderizar(contexto)
+            except (KeyError, ValueError) as e:
+                resultado.falhas.append((destinatario, f"Erro ao renderizar modelo: {e}"))
+                continue
+
+            limitador.aguardar()
+            try:
+                conexao.enviar(_montar_mensagem(destinatario, assunto, texto, corpo_html), destinatario)
+            except _RECUSAS as e:
+                # O smtplib já fez RSET: a sessão continua utilizável
+                resultado.falhas.append((destinatario, str(e)))
+                logger.warning(f"⚠️ Servidor recusou {destinatario} no envio em lote: {e}")
+                continue
+            except Exception as e:
+                # Sessão em estado desconhecido: a próxima mensagem reconecta
+                conexao.fechar()
+                resultado.falhas.append((destinatario, str(e)))
+                logger.warning(f"⚠️ Falha no envio em lote para {destinatario}: {e}")
+                continue
+            resultado.enviados += 1
+    finally:
+        if propria:
+            conexao.fechar()
+        resultado.segundos = time.perf_counter() - inicio
+
+    logger.info(
+        f"📧 Lote concluído: {resultado.enviados} enviados, {len(resultado.falhas)} falhas "
+        f"em {resultado.segundos:.1f}s"
+    )
+    return resultado
+
+
+__all__ = [
+    "ModeloEmail",
+    "MODELO_RESUMO_DOR",
+    "LimitadorTaxa",
+    "ResultadoLote",
+    "enviar_em_lote",
+]
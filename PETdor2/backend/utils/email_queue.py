@@ -0,0 +1,329 @@
+# PETdor2/backend/utils/email_queue.py
+"""
+Fila de envio de e-mails em segundo plano.
+
+As mensagens são gravadas em uma tabela SQLite (EMAIL_FILA_ARQUIVO) e
+entregues por threads de envio; quem enfileira (cadastro, reset de senha)
+retorna imediatamente, sem esperar o handshake SMTP. Cada thread mantém
+uma conexão SMTP autenticada aberta e a reutiliza entre mensagens.
+
+Falhas temporárias são reprogramadas com backoff exponencial
+(EMAIL_BACKOFF_SEGUNDOS, dobrando até EMAIL_MAX_TENTATIVAS); recusas
+permanentes do servidor (5xx) marcam a mensagem como falhou na hora.
+Como a fila fica em disco, mensagens pendentes sobrevivem a reinícios.
+
+Os corpos levam links de confirmação e de redefinição de senha, então são
+apagados (texto e HTML em branco) assim que a mensagem é finalizada; as
+linhas finalizadas são removidas após EMAIL_RETENCAO_SEGUNDOS por uma
+limpeza periódica feita pelas próprias threads de envio. Threads que
+morrerem são recriadas no próximo enfileiramento.
+
+Situação de cada mensagem: pendente → enviando → enviado | falhou.
+"""
+
+import logging
+import smtplib
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from backend.utils.config import (
+    EMAIL_FILA_ARQUIVO,
+    EMAIL_WORKERS,
+    EMAIL_MAX_TENTATIVAS,
+    EMAIL_BACKOFF_SEGUNDOS,
+    EMAIL_RETENCAO_SEGUNDOS,
+    EMAIL_LIMPEZA_INTERVALO,
+)
+
+logger = logging.getLogger(__name__)
+
+PENDENTE = "pendente"
+ENVIANDO = "enviando"
+ENVIADO = "enviado"
+FALHOU = "falhou"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS fila_emails (
+    id TEXT PRIMARY KEY,
+    destinatario TEXT NOT NULL,
+    assunto TEXT NOT NULL,
+    texto TEXT NOT NULL,
+    html TEXT NOT NULL,
+    status TEXT NOT NULL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa REAL NOT NULL,
+    erro TEXT,
+    criado_em REAL NOT NULL,
+    atualizado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fila_emails_pendentes
+    ON fila_emails (status, proxima_tentativa);
+"""
+
+
+def _erro_permanente(erro: Exception) -> bool:
+    """Recusas 5xx do servidor (e mensagens malformadas) não melhoram com nova tentativa."""
+    if isinstance(erro, ValueError):
+        return True
+    if isinstance(erro, smtplib.SMTPRecipientsRefused):
+        return all(codigo >= 500 for codigo, _ in erro.recipients.values())
+    if isinstance(erro, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        return erro.smtp_code >= 500
+    return False
+
+
+class FilaEmails:
+    """Fila persistente com threads de envio e conexões SMTP reutilizadas."""
+
+    def __init__(
+        self,
+        caminho: str = EMAIL_FILA_ARQUIVO,
+        workers: int = EMAIL_WORKERS,
+        max_tentativas: int = EMAIL_MAX_TENTATIVAS,
+        backoff_segundos: float = EMAIL_BACKOFF_SEGUNDOS,
+        fabrica_conexao=None,
+        retencao_segundos: float = EMAIL_RETENCAO_SEGUNDOS,
+        limpeza_intervalo: float = EMAIL_LIMPEZA_INTERVALO,
+    ):
+        self.caminho = caminho
+        self.workers = max(workers, 1)
+        self.max_tentativas = max(max_tentativas, 1)
+        self.backoff_segundos = backoff_segundos
+        self.retencao_segundos = retencao_segundos
+        self.limpeza_intervalo = limpeza_intervalo
+        if fabrica_conexao is None:
+            from backend.utils.email_sender import ConexaoSMTP as fabrica_conexao
+        self._fabrica_conexao = fabrica_conexao
+
+        self._lock = threading.Lock()
+        self._sinal = threading.Condition(self._lock)
+        self._threads: List[Optional[threading.Thread]] = []
+        # Mensagem em envio por thread (recolocada na fila se a thread morrer)
+        self._em_envio: Dict[str, str] = {}
+        self._parar = False
+        self._proxima_limpeza = 0.0
+
+        self._db = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_ESQUEMA)
+        # Mensagens que estavam sendo enviadas quando o processo caiu
+        recuperadas = self._db.execute(
+            "UPDATE fila_emails SET status = ? WHERE status = ?", (PENDENTE, ENVIANDO)
+        ).rowcount
+        if recuperadas:
+            logger.info(f"📧 {recuperadas} e-mails recolocados na fila após reinício")
+        # Filas gravadas antes de os corpos serem apagados ao finalizar
+        self._db.execute(
+            "UPDATE fila_emails SET texto = '', html = '' WHERE status IN (?, ?) AND (texto != '' OR html != '')",
+            (ENVIADO, FALHOU),
+        )
+
+    # ------------------------------------------------------------
+    # Threads de envio
+    # ------------------------------------------------------------
+    def iniciar(self) -> None:
+        """Inicia as threads de envio e recria as que tiverem morrido."""
+        with self._lock:
+            if not self._threads:
+                self._parar = False
+                self._threads = [None] * self.workers
+                logger.info(f"📧 Fila de e-mails iniciada ({self.workers} threads, {self.caminho})")
+            for i, thread in enumerate(self._threads):
+                if thread is not None and thread.is_alive():
+                    continue
+                if thread is not None:
+                    logger.warning(f"⚠️ Thread {thread.name} da fila de e-mails morreu; recriando")
+                    id_mensagem = self._em_envio.pop(thread.name, None)
+                    if id_mensagem is not None:
+                        self._db.execute(
+                            "UPDATE fila_emails SET status = ? WHERE id = ? AND status = ?",
+                            (PENDENTE, id_mensagem, ENVIANDO),
+                        )
+                novo = threading.Thread(target=self._trabalhar, name=f"fila-emails-{i}", daemon=True)
+                novo.start()
+                self._threads[i] = novo
+
+    def encerrar(self, timeout: float = 5.0) -> None:
+        with self._sinal:
+            self._parar = True
+            self._sinal.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            if thread is not None:
+                thread.join(timeout)
+
+    def _trabalhar(self) -> None:
+        conexao = self._fabrica_conexao()
+        nome = threading.current_thread().name
+        try:
+            while True:
+                mensagem = self._proxima()
+                if mensagem is None:
+                    return
+                self._em_envio[nome] = mensagem["id"]
+                self._entregar(conexao, mensagem)
+                self._em_envio.pop(nome, None)
+        finally:
+            conexao.fechar()
+
+    def _proxima(self) -> Optional[Dict[str, Any]]:
+        """Reserva a próxima mensagem vencida; espera até haver uma."""
+        with self._sinal:
+            while not self._parar:
+                agora = time.time()
+                if agora >= self._proxima_limpeza:
+                    self._proxima_limpeza = agora + self.limpeza_intervalo
+                    self._limpar_finalizadas(agora)
+                linha = self._db.execute(
+                    "SELECT id, destinatario, assunto, texto, html, tentativas FROM fila_emails "
+                    "WHERE status = ? AND proxima_tentativa <= ? ORDER BY proxima_tentativa LIMIT 1",
+                    (PENDENTE, agora),
+                ).fetchone()
+                if linha is not None:
+                    self._db.execute(
+                        "UPDATE fila_emails SET status = ?, atualizado_em = ? WHERE id = ?",
+                        (ENVIANDO, agora, linha[0]),
+                    )
+                    chaves = ("id", "destinatario", "assunto", "texto", "html", "tentativas")
+                    return dict(zip(chaves, linha))
+
+                # Dorme até a próxima tentativa agendada (ou até um novo e-mail)
+                proxima = self._db.execute(
+                    "SELECT MIN(proxima_tentativa) FROM fila_emails WHERE status = ?", (PENDENTE,)
+                ).fetchone()[0]
+                espera = 30.0 if proxima is None else min(max(proxima - agora, 0.05), 30.0)
+                self._sinal.wait(min(espera, max(self._proxima_limpeza - agora, 0.05)))
+        return None
+
+    def _entregar(self, conexao, mensagem: Dict[str, Any]) -> None:
+        from backend.utils.email_sender import _montar_mensagem
+
+        tentativas = mensagem["tentativas"] + 1
+        try:
+            msg = _montar_mensagem(mensagem["destinatario"], mensagem["assunto"], mensagem["texto"], mensagem["html"])
+            conexao.enviar(msg, mensagem["destinatario"])
+        except Exception as e:
+            # Conexão em estado desconhecido: a próxima mensagem reconecta
+            conexao.fechar()
+            if _erro_permanente(e) or tentativas >= self.max_tentativas:
+                logger.error(f"❌ E-mail {mensagem['id']} para {mensagem['destinatario']} falhou: {e}")
+                self._atualizar(mensagem["id"], FALHOU, tentativas, erro=str(e))
+            else:
+                espera = self.backoff_segundos * 2 ** (tentativas - 1)
+                logger.warning(
+                    f"⚠️ E-mail {mensagem['id']} falhou (tentativa {tentativas}); nova tentativa em {espera:.0f}s: {e}"
+                )
+                self._atualizar(mensagem["id"], PENDENTE, tentativas, erro=str(e), espera=espera)
+            return
+
+        self._atualizar(mensagem["id"], ENVIADO, tentativas)
+        logger.info(f"📧 Email enviado com sucesso → {mensagem['destinatario']}")
+
+    def _atualizar(self, id_mensagem: str, status: str, tentativas: int, erro: Optional[str] = None, espera: float = 0.0) -> None:
+        agora = time.time()
+        with self._sinal:
+            if status == PENDENTE:
+                self._db.execute(
+                    "UPDATE fila_emails SET status = ?, tentativas = ?, erro = ?, proxima_tentativa = ?, "
+                    "atualizado_em = ? WHERE id = ?",
+                    (status, tentativas, erro, agora + espera, agora, id_mensagem),
+                )
+                self._sinal.notify()
+            else:
+                # Finalizada: o corpo (com links de uso único) não fica em disco
+                self._db.execute(
+                    "UPDATE fila_emails SET status = ?, tentativas = ?, erro = ?, proxima_tentativa = ?, "
+                    "atualizado_em = ?, texto = '', html = '' WHERE id = ?",
+                    (status, tentativas, erro, agora + espera, agora, id_mensagem),
+                )
+
+    def _limpar_finalizadas(self, agora: float) -> None:
+        """Remove mensagens finalizadas além da retenção (chamada com o lock)."""
+        removidas = self._db.execute(
+            "DELETE FROM fila_emails WHERE status IN (?, ?) AND atualizado_em < ?",
+            (ENVIADO, FALHOU, agora - self.retencao_segundos),
+        ).rowcount
+        if removidas:
+            logger.info(f"📧 {removidas} e-mails finalizados removidos da fila")
+
+    # ------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------
+    def enfileirar(self, destinatario: str, assunto: str, texto: str, html: str) -> str:
+        """Grava a mensagem na fila e retorna seu ID, sem esperar o envio."""
+        id_mensagem = uuid.uuid4().hex
+        agora = time.time()
+        with self._sinal:
+            self._db.execute(
+                "INSERT INTO fila_emails (id, destinatario, assunto, texto, html, status, proxima_tentativa, "
+                "criado_em, atualizado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (id_mensagem, destinatario, assunto, texto, html, PENDENTE, agora, agora, agora),
+            )
+            self._sinal.notify()
+        self.iniciar()
+        logger.debug(f"📧 E-mail {id_mensagem} enfileirado → {destinatario}")
+        return id_mensagem
+
+    def status(self, id_mensagem: str) -> Optional[Dict[str, Any]]:
+        """Situação, tentativas e último erro de uma mensagem."""
+        with self._lock:
+            linha = self._db.execute(
+                "SELECT status, tentativas, erro, criado_em, atualizado_em FROM fila_emails WHERE id = ?",
+                (id_mensagem,),
+            ).fetchone()
+        if linha is None:
+            return None
+        return dict(zip(("status", "tentativas", "erro", "criado_em", "atualizado_em"), linha))
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Quantidade de mensagens por situação."""
+        with self._lock:
+            linhas = self._db.execute("SELECT status, COUNT(*) FROM fila_emails GROUP BY status").fetchall()
+        contagem = {PENDENTE: 0, ENVIANDO: 0, ENVIADO: 0, FALHOU: 0}
+        contagem.update(dict(linhas))
+        return contagem
+
+    def limpar_enviados(self, idade_segundos: float = 7 * 24 * 3600) -> int:
+        """
+        Remove mensagens entregues há mais de `idade_segundos` (as threads
+        de envio já limpam periodicamente com EMAIL_RETENCAO_SEGUNDOS).
+        """
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM fila_emails WHERE status = ? AND atualizado_em < ?",
+                (ENVIADO, time.time() - idade_segundos),
+            ).rowcount
+
+
+_fila: Optional[FilaEmails] = None
+_fila_lock = threading.Lock()
+
+
+def fila_emails() -> FilaEmails:
+    """Fila única por processo, criada (e iniciada) no primeiro uso."""
+    global _fila
+    if _fila is None:
+        with _fila_lock:
+            if _fila is None:
+                fila = FilaEmails()
+                fila.iniciar()
+                _fila = fila
+    return _fila
+
+
+def status_email(id_mensagem: str) -> Optional[Dict[str, Any]]:
+    return fila_emails().status(id_mensagem)
+
+
+__all__ = [
+    "PENDENTE",
+    "ENVIANDO",
+    "ENVIADO",
+    "FALHOU",
+    "FilaEmails",
+    "fila_emails",
+    "status_email",
+]
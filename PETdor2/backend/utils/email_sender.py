@@ -2,9 +2,9 @@
 
 import smtplib
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Tuple
+import time
+from email.message import Message
+from typing import Optional, Tuple, Union
 
 from backend.utils.config import (
     SMTP_SERVIDOR,
@@ -13,12 +13,118 @@ from backend.utils.config import (
     SMTP_SENHA,
     SMTP_USAR_SSL,
 )
+from backend.utils.email_templates import MODELO_RECUPERACAO_SENHA, montar_mime
 
 logger = logging.getLogger(__name__)
 
 
 # ============================================================
-#   FUNÇÃO INTERNA DE ENVIO
+#   MONTAGEM DA MENSAGEM
+# ============================================================
+
+def _montar_mensagem(destinatario: str, assunto: str, texto: str, html: str) -> bytes:
+    """multipart/alternative (texto + HTML) com as partes fixas em cache."""
+    return montar_mime(destinatario, assunto, texto, html, remetente=SMTP_EMAIL)
+
+
+# ============================================================
+#   CONEXÃO SMTP REUTILIZÁVEL
+# ============================================================
+
+class ConexaoSMTP:
+    """
+    Conexão SMTP autenticada mantida aberta entre mensagens.
+
+    Reconecta sozinha quando o servidor encerra a sessão e confere com
+    NOOP conexões paradas há mais de `ociosidade_max` segundos. Não é
+    thread-safe: use uma conexão por thread.
+    """
+
+    def __init__(
+        self,
+        servidor: str = SMTP_SERVIDOR,
+        porta: int = SMTP_PORTA,
+        usuario: Optional[str] = SMTP_EMAIL,
+        senha: Optional[str] = SMTP_SENHA,
+        usar_ssl: bool = SMTP_USAR_SSL,
+        starttls: bool = True,
+        timeout: float = 30.0,
+        ociosidade_max: float = 60.0,
+    ):
+        self.servidor = servidor
+        self.porta = porta
+        self.usuario = usuario
+        self.senha = senha
+        self.usar_ssl = usar_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.ociosidade_max = ociosidade_max
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._ultimo_uso = 0.0
+
+    def _conectar(self) -> None:
+        if self.usar_ssl:
+            smtp = smtplib.SMTP_SSL(self.servidor, self.porta, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.servidor, self.porta, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls()
+        if self.usuario and self.senha:
+            smtp.login(self.usuario, self.senha)
+        self._smtp = smtp
+        self._ultimo_uso = time.monotonic()
+        logger.debug(f"📧 Conexão SMTP aberta com {self.servidor}:{self.porta}")
+
+    def _garantir_conexao(self) -> smtplib.SMTP:
+        if self._smtp is not None and time.monotonic() - self._ultimo_uso > self.ociosidade_max:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self.fechar()
+            except smtplib.SMTPException:
+                self.fechar()
+            except OSError:
+                self.fechar()
+        if self._smtp is None:
+            self._conectar()
+        return self._smtp
+
+    def enviar(self, msg: Union[Message, bytes], destinatario: str, remetente: str = SMTP_EMAIL) -> None:
+        """
+        Envia pela conexão aberta; reconecta uma vez se ela tiver caído.
+        Aceita um Message ou a mensagem já serializada (montar_mime).
+        """
+        try:
+            self._transmitir(msg, destinatario, remetente)
+        except smtplib.SMTPServerDisconnected:
+            self.fechar()
+            self._transmitir(msg, destinatario, remetente)
+        self._ultimo_uso = time.monotonic()
+
+    def _transmitir(self, msg: Union[Message, bytes], destinatario: str, remetente: str) -> None:
+        smtp = self._garantir_conexao()
+        if isinstance(msg, bytes):
+            smtp.sendmail(remetente, [destinatario], msg)
+        else:
+            smtp.send_message(msg, remetente, [destinatario])
+
+    def fechar(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def __enter__(self) -> "ConexaoSMTP":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+
+# ============================================================
+#   FUNÇÃO INTERNA DE ENVIO (síncrono, uma conexão por mensagem)
 # ============================================================
 
 def _enviar_email(destinatario: str, assunto: str, texto: str, html: str) -> Tuple[bool, str]:
@@ -28,24 +134,10 @@ def _enviar_email(destinatario: str, assunto: str, texto: str, html: str) -> Tup
         return False, "Endereço de e-mail do destinatário está vazio."
 
     try:
-        msg = MIMEMultipart("alternative")
-        msg["From"] = SMTP_EMAIL
-        msg["To"] = destinatario
-        msg["Subject"] = assunto
-
-        msg.attach(MIMEText(texto, "plain"))
-        msg.attach(MIMEText(html, "html"))
+        msg = _montar_mensagem(destinatario, assunto, texto, html)
 
-        # Definição do servidor
-        if SMTP_USAR_SSL:
-            server = smtplib.SMTP_SSL(SMTP_SERVIDOR, SMTP_PORTA)
-        else:
-            server = smtplib.SMTP(SMTP_SERVIDOR, SMTP_PORTA)
-            server.starttls()
-
-        with server:
-            server.login(SMTP_EMAIL, SMTP_SENHA)
-            server.sendmail(SMTP_EMAIL, destinatario, msg.as_string())
+        with ConexaoSMTP() as conexao:
+            conexao.enviar(msg, destinatario)
 
         logger.info(f"📧 Email enviado com sucesso → {destinatario}")
         return True, "E-mail enviado com sucesso."
@@ -55,42 +147,38 @@ def _enviar_email(destinatario: str, assunto: str, texto: str, html: str) -> Tup
         return False, f"Erro ao enviar e-mail: {e}"
 
 
+def _enfileirar(destinatario: str, assunto: str, texto: str, html: str) -> Tuple[bool, str]:
+    """Coloca a mensagem na fila de envio em segundo plano."""
+    from backend.utils.email_queue import fila_emails
+
+    if not destinatario:
+        return False, "Endereço de e-mail do destinatário está vazio."
+
+    try:
+        id_mensagem = fila_emails().enfileirar(destinatario, assunto, texto, html)
+    except Exception as e:
+        logger.error(f"❌ Erro ao enfileirar e-mail para {destinatario}: {e}", exc_info=True)
+        return False, f"Erro ao enfileirar e-mail: {e}"
+    return True, f"E-mail enfileirado para envio ({id_mensagem})."
+
+
 # ============================================================
 #   FUNÇÕES PÚBLICAS
 # ============================================================
 
 def enviar_email_confirmacao_generico(destinatario_email: str, assunto: str, corpo_html: str, corpo_texto: str):
-    """E-mail genérico usado pelo sistema."""
-    return _enviar_email(destinatario_email, assunto, corpo_texto, corpo_html)
+    """E-mail genérico usado pelo sistema (enfileirado; retorna sem esperar o SMTP)."""
+    return _enfileirar(destinatario_email, assunto, corpo_texto, corpo_html)
 
 
 def enviar_email_recuperacao_senha(destinatario_email: str, link_recuperacao: str):
-    """Envia o link de recuperação de senha."""
-
-    assunto = "Recuperação de Senha - PetDor"
-
-    corpo_texto = (
-        "Olá! Você solicitou a recuperação da sua senha.\n\n"
-        f"Acesse o link abaixo:\n{link_recuperacao}\n\n"
-        "Se não foi você, ignore esta mensagem."
-    )
-
-    corpo_html = f"""
-    <p>Olá! Você solicitou a recuperação da sua senha.</p>
-    <p>Clique abaixo para redefinir:</p>
-    <p>
-        <a href="{link_recuperacao}" 
-           style="padding:10px 20px;background:#4CAF50;color:white;text-decoration:none;
-                  border-radius:6px;font-weight:bold;">
-           Redefinir Senha
-        </a>
-    </p>
-    """
-
-    return _enviar_email(destinatario_email, assunto, corpo_texto, corpo_html)
+    """Enfileira o e-mail com o link de recuperação de senha."""
+    assunto, corpo_texto, corpo_html = MODELO_RECUPERACAO_SENHA.renderizar({"link": link_recuperacao})
+    return _enfileirar(destinatario_email, assunto, corpo_texto, corpo_html)
 
 
 __all__ = [
+    "ConexaoSMTP",
     "enviar_email_confirmacao_generico",
     "enviar_email_recuperacao_senha",
 ]
@@ -0,0 +1,262 @@
+# PETdor2/backend/utils/email_templates.py
+"""
+Modelos de e-mail pré-compilados.
+
+Cada modelo (assunto, texto e HTML com marcadores `$nome` / `${nome}`) é
+analisado uma única vez em segmentos fixos e marcadores; renderizar só
+preenche os marcadores (nome, link...). No HTML os valores são escapados.
+
+A montagem MIME também reaproveita as partes fixas: cabeçalhos comuns,
+boundary e cabeçalhos de cada parte ficam em cache, e por mensagem só se
+gera Date, Message-ID, To, Subject e o base64 dos corpos — sem construir
+MIMEMultipart/MIMEText nem passar pelo gerador do pacote `email`.
+"""
+
+import base64
+import html
+import threading
+import time
+import uuid
+from email.header import Header
+from email.utils import formatdate
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from backend.utils.config import SMTP_EMAIL
+
+
+class _Marcador(str):
+    """Segmento compilado que é o nome de um marcador (os demais são texto fixo)."""
+
+
+def _compilar(modelo: str) -> Tuple[str, ...]:
+    """Divide o modelo em segmentos fixos e marcadores (sintaxe de string.Template)."""
+    segmentos: List[str] = []
+    fixo: List[str] = []
+    posicao = 0
+    for achado in Template.pattern.finditer(modelo):
+        fixo.append(modelo[posicao:achado.start()])
+        posicao = achado.end()
+        if achado.group("escaped") is not None:
+            fixo.append(Template.delimiter)
+            continue
+        nome = achado.group("named") or achado.group("braced")
+        if nome is None:
+            raise ValueError(f"Marcador inválido na posição {achado.start()} do modelo")
+        segmentos.append("".join(fixo))
+        segmentos.append(_Marcador(nome))
+        fixo = []
+    fixo.append(modelo[posicao:])
+    segmentos.append("".join(fixo))
+    return tuple(s for s in segmentos if s or isinstance(s, _Marcador))
+
+
+def _preencher(segmentos: Tuple[str, ...], valores: Mapping[str, Any]) -> str:
+    return "".join(valores[s] if isinstance(s, _Marcador) else s for s in segmentos)
+
+
+class ModeloEmail:
+    """Assunto, texto e HTML compilados uma vez; renderiza só os marcadores."""
+
+    def __init__(self, assunto: str, texto: str, html: str):
+        self._assunto = _compilar(assunto)
+        self._texto = _compilar(texto)
+        self._html = _compilar(html)
+        self.marcadores = frozenset(
+            s for s in self._assunto + self._texto + self._html if isinstance(s, _Marcador)
+        )
+
+    def renderizar(self, contexto: Mapping[str, Any]) -> Tuple[str, str, str]:
+        """Retorna (assunto, texto, html). KeyError se faltar algum marcador."""
+        faltando = self.marcadores.difference(contexto)
+        if faltando:
+            raise KeyError(", ".join(sorted(faltando)))
+        valores = {nome: str(contexto[nome]) for nome in self.marcadores}
+        escapados = {nome: html.escape(valor) for nome, valor in valores.items()}
+        return (
+            _preencher(self._assunto, valores),
+            _preencher(self._texto, valores),
+            _preencher(self._html, escapados),
+        )
+
+
+# ============================================================
+#   MONTAGEM MIME COM PARTES FIXAS EM CACHE
+# ============================================================
+
+_BOUNDARY = "=_petdor_" + uuid.uuid4().hex  # "_" não ocorre em base64
+
+
+def _cabecalho(valor: str) -> str:
+    if "\r" in valor or "\n" in valor:
+        raise ValueError("Quebra de linha não permitida em cabeçalho de e-mail")
+    if valor.isascii():
+        return valor
+    # Valores longos são dobrados em várias linhas: com CRLF, como o resto
+    return Header(valor, "utf-8").encode(linesep="\r\n")
+
+
+@lru_cache(maxsize=16)
+def _partes_fixas(remetente: str) -> Tuple[bytes, bytes, bytes, str]:
+    """Cabeçalhos comuns + parte texto, parte HTML, fechamento e domínio do Message-ID."""
+    comum = (
+        f"From: {_cabecalho(remetente)}\r\n"
+        "MIME-Version: 1.0\r\n"
+        f'Content-Type: multipart/alternative; boundary="{_BOUNDARY}"\r\n'
+    ).encode("ascii")
+    parte = (
+        f"\r\n--{_BOUNDARY}\r\n"
+        'Content-Type: text/{}; charset="utf-8"\r\n'
+        "MIME-Version: 1.0\r\n"
+        "Content-Transfer-Encoding: base64\r\n\r\n"
+    )
+    fim = f"\r\n--{_BOUNDARY}--\r\n".encode("ascii")
+    dominio = remetente.rpartition("@")[2] or "petdor.app"
+    return comum + parte.format("plain").encode("ascii"), parte.format("html").encode("ascii"), fim, dominio
+
+
+_data_cache: List[Any] = [0, ""]
+_data_lock = threading.Lock()
+
+
+def _data_atual() -> str:
+    # formatdate é relativamente caro; a resolução de um segundo basta
+    agora = int(time.time())
+    with _data_lock:
+        if _data_cache[0] != agora:
+            _data_cache[0] = agora
+            _data_cache[1] = formatdate(agora, usegmt=True)
+        return _data_cache[1]
+
+
+def montar_mime(
+    destinatario: str,
+    assunto: str,
+    texto: str,
+    corpo_html: str,
+    remetente: Optional[str] = None,
+) -> bytes:
+    """Mensagem multipart/alternative (texto + HTML) pronta para o SMTP."""
+    inicio_texto, inicio_html, fim, dominio = _partes_fixas(remetente or SMTP_EMAIL)
+    variavel = (
+        f"To: {_cabecalho(destinatario)}\r\n"
+        f"Subject: {_cabecalho(assunto)}\r\n"
+        f"Date: {_data_atual()}\r\n"
+        f"Message-ID: <{uuid.uuid4().hex}@{dominio}>\r\n"
+    ).encode("ascii")
+    return b"".join((
+        variavel,
+        inicio_texto,
+        base64.encodebytes(texto.encode("utf-8")).replace(b"\n", b"\r\n"),
+        inicio_html,
+        base64.encodebytes(corpo_html.encode("utf-8")).replace(b"\n", b"\r\n"),
+        fim,
+    ))
+
+
+# ============================================================
+#   REGISTRO DE MODELOS
+# ============================================================
+
+MODELO_CONFIRMACAO_EMAIL = ModeloEmail(
+    assunto="Confirme seu e-mail - PETDor",
+    texto="""
+Olá, $nome!
+
+Obrigado por se cadastrar no PETDor.
+
+Para ativar sua conta, acesse o link abaixo:
+
+🔗 $link
+
+Se você não criou esta conta, apenas ignore este e-mail.
+""",
+    html="""
+        <html>
+        <body>
+            <p>Olá, $nome!</p>
+            <p>Obrigado por se cadastrar no PETDor.</p>
+            <p>Para ativar sua conta, clique no link abaixo:</p>
+            <p><a href="$link">🔗 Confirmar meu E-mail</a></p>
+            <br/>
+            <p>Se você não criou esta conta, ignore este e-mail.</p>
+        </body>
+        </html>
+        """,
+)
+
+MODELO_RECUPERACAO_SENHA = ModeloEmail(
+    assunto="Recuperação de Senha - PetDor",
+    texto=(
+        "Olá! Você solicitou a recuperação da sua senha.\n\n"
+        "Acesse o link abaixo:\n$link\n\n"
+        "Se não foi você, ignore esta mensagem."
+    ),
+    html="""
+    <p>Olá! Você solicitou a recuperação da sua senha.</p>
+    <p>Clique abaixo para redefinir:</p>
+    <p>
+        <a href="$link"
+           style="padding:10px 20px;background:#4CAF50;color:white;text-decoration:none;
+                  border-radius:6px;font-weight:bold;">
+           Redefinir Senha
+        </a>
+    </p>
+    """,
+)
+
+MODELO_RESUMO_DOR = ModeloEmail(
+    assunto="Resumo de dor de $pet - PetDor",
+    texto="""
+Olá, $nome!
+
+Resumo das avaliações de dor de $pet no período $periodo:
+
+$resumo
+
+Acesse o PetDor para ver o histórico completo.
+""",
+    html="""
+<html>
+<body>
+    <p>Olá, $nome!</p>
+    <p>Resumo das avaliações de dor de <b>$pet</b> no período $periodo:</p>
+    <p>$resumo</p>
+    <p>Acesse o PetDor para ver o histórico completo.</p>
+</body>
+</html>
+""",
+)
+
+_MODELOS: Dict[str, ModeloEmail] = {
+    "confirmacao_email": MODELO_CONFIRMACAO_EMAIL,
+    "recuperacao_senha": MODELO_RECUPERACAO_SENHA,
+    "resumo_dor": MODELO_RESUMO_DOR,
+}
+
+
+def registrar_modelo(nome: str, modelo: ModeloEmail) -> None:
+    _MODELOS[nome] = modelo
+
+
+def obter_modelo(nome: str) -> ModeloEmail:
+    """KeyError se o modelo não estiver registrado."""
+    return _MODELOS[nome]
+
+
+def renderizar_email(nome: str, contexto: Mapping[str, Any]) -> Tuple[str, str, str]:
+    """Atalho: (assunto, texto, html) do modelo registrado `nome`."""
+    return _MODELOS[nome].renderizar(contexto)
+
+
+__all__ = [
+    "ModeloEmail",
+    "MODELO_CONFIRMACAO_EMAIL",
+    "MODELO_RECUPERACAO_SENHA",
+    "MODELO_RESUMO_DOR",
+    "montar_mime",
+    "registrar_modelo",
+    "obter_modelo",
+    "renderizar_email",
+]
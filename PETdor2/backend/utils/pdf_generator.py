@@ -1,13 +1,47 @@
 from fpdf import FPDF
 from datetime import datetime
+from functools import lru_cache
+import io
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+# Logo do relatório (backend/assets/PETDOR.jpg)
+LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "PETDOR.jpg")
+
+
+@lru_cache(maxsize=1)
+def _carregar_logo():
+    """
+    Lê e decodifica o logo uma única vez por processo.
+    Retorna (bytes do arquivo, info do fpdf) ou None se o logo não existir.
+    """
+    try:
+        with open(LOGO_PATH, "rb") as f:
+            dados = f.read()
+        info = FPDF()._parsejpg(LOGO_PATH)
+    except Exception as e:
+        logger.warning(f"⚠️ Logo do relatório indisponível ({LOGO_PATH}): {e}")
+        return None
+    return dados, info
+
+
 class PDFRelatorio(FPDF):
     def header(self):
-        # Logo no topo
-        logo_path = "assets/logo.png"
-        if os.path.exists(logo_path):
-            self.image(logo_path, 10, 8, 25)  # imagem, x, y, tamanho
+        # Logo no topo (decodificado uma vez por processo; embutido uma vez por documento)
+        logo = _carregar_logo()
+        if logo is not None:
+            dados, info = logo
+            imagens = getattr(self, "images", None)
+            if isinstance(imagens, dict):
+                # pyfpdf: registra a imagem já decodificada, sem reler o arquivo
+                if LOGO_PATH not in imagens:
+                    imagens[LOGO_PATH] = dict(info, i=len(imagens) + 1)
+                self.image(LOGO_PATH, 10, 8, 25)  # imagem, x, y, tamanho
+            else:
+                # fpdf2 aceita arquivos em memória
+                self.image(io.BytesIO(dados), 10, 8, 25)
         self.set_font('Arial', 'B', 14)
         self.cell(0, 10, 'PETDor - Relatório de Avaliação', ln=True, align='C')
         self.ln(5)
@@ -26,8 +60,13 @@ def gerar_pdf_relatorio(
     veterinario,
     avaliacao,
     observacoes,
-    output_path="relatorio.pdf"
-):
+    output_path=None
+) -> bytes:
+    """
+    Gera o relatório em memória e retorna os bytes do PDF (pronto para
+    `st.download_button`). Nada é gravado em disco, a menos que
+    `output_path` seja informado.
+    """
     pdf = PDFRelatorio()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -84,8 +123,21 @@ def gerar_pdf_relatorio(
     pdf.cell(0, 10, f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", 0, 1, "R")
 
     # ---------------------------
-    # Salva arquivo
+    # Gera em memória
     # ---------------------------
-    pdf.output(output_path)
+    dados = pdf.output(dest="S")
+    if isinstance(dados, str):
+        # pyfpdf devolve str latin-1; fpdf2 devolve bytearray
+        dados = dados.encode("latin-1")
+    dados = bytes(dados)
+
+    if output_path:
+        with open(output_path, "wb") as f:
+            f.write(dados)
+
+    return dados
+
 
-    return output_path
+def gerar_pdf_relatorio_stream(*args, **kwargs) -> io.BytesIO:
+    """Mesmo relatório, como stream em memória (BytesIO)."""
+    return io.BytesIO(gerar_pdf_relatorio(*args, **kwargs))
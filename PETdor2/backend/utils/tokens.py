@@ -1,70 +1,299 @@
-# PETdor2/utils/tokens.py
-
-"""
-Módulo unificado de tokens para o PETdor2.
-Gera e valida tokens JWT para:
-- Confirmação de e-mail
-- Redefinição de senha
-"""
-
-import os
-from datetime import datetime, timedelta
-import jwt
-
-# Chave secreta (use variável de ambiente em produção)
-SECRET_KEY = os.getenv("SECRET_KEY", "chave_super_secreta_petdor")
-ALGORITHM = "HS256"
-
-# Expirações
-EMAIL_TOKEN_EXPIRE_HOURS = 24
-RESET_TOKEN_EXPIRE_HOURS = 1
-
-
-# ==========================================================
-# GERAR TOKEN DE CONFIRMAÇÃO DE E-MAIL
-# ==========================================================
-def gerar_token_confirmacao(email: str) -> str:
-    payload = {
-        "sub": email,
-        "type": "email_confirmation",
-        "exp": datetime.utcnow() + timedelta(hours=EMAIL_TOKEN_EXPIRE_HOURS)
-    }
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
-
-
-# ==========================================================
-# VALIDAR TOKEN DE CONFIRMAÇÃO DE E-MAIL
-# ==========================================================
-def validar_token_confirmacao(token: str) -> str | None:
-    try:
-        dados = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if dados.get("type") != "email_confirmation":
-            return None
-        return dados.get("sub")
-    except Exception:
-        return None
-
-
-# ==========================================================
-# GERAR TOKEN DE RESET DE SENHA
-# ==========================================================
-def gerar_token_reset(email: str) -> str:
-    payload = {
-        "sub": email,
-        "type": "password_reset",
-        "exp": datetime.utcnow() + timedelta(hours=RESET_TOKEN_EXPIRE_HOURS)
-    }
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
-
-
-# ==========================================================
-# VALIDAR TOKEN DE RESET DE SENHA
-# ==========================================================
-def validar_token_reset(token: str) -> str | None:
-    try:
-        dados = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if dados.get("type") != "password_reset":
-            return None
-        return dados.get("sub")
-    except Exception:
-        return None
+# PETdor2/backend/utils/tokens.py
+
+"""
+Serviço unificado de tokens do PETdor2.
+
+Um único formato (JWT HS256) e um único caminho de decodificação para:
+- sessão (login)
+- confirmação de e-mail
+- redefinição de senha
+
+Cada token leva no cabeçalho o `kid` da chave que o assinou. As chaves
+ficam em um chaveiro (kid → segredo): novos tokens usam a chave ativa e
+os emitidos com chaves antigas continuam válidos enquanto o kid estiver
+no chaveiro. Assinatura e verificação ficam com o PyJWT; tokens já
+verificados ficam em um LRU até o `exp`, então validar de novo o mesmo
+token não consulta o banco nem refaz a verificação.
+
+Configuração (st.secrets ou variáveis de ambiente):
+    SECRET_KEYS   = {"2024-06": "...", "2025-01": "..."}  (ou "kid:segredo,kid:segredo")
+    SECRET_KEY_ID = "2025-01"                               (kid ativo)
+    SECRET_KEY    = "..."  (chave única, kid "padrao", se SECRET_KEYS não existir)
+
+Medição:
+    python -m backend.utils.tokens
+"""
+
+import hashlib
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import jwt
+
+from backend.utils.config import SECRET_KEY, SECRET_KEYS, SECRET_KEY_ID, JWT_CACHE_MAX_ITENS
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+
+# Finalidades
+TIPO_SESSAO = "sessao"
+TIPO_CONFIRMACAO_EMAIL = "confirmacao_email"
+TIPO_RESET_SENHA = "reset_senha"
+
+# Expirações padrão
+VALIDADE_PADRAO = {
+    TIPO_SESSAO: timedelta(hours=24),
+    TIPO_CONFIRMACAO_EMAIL: timedelta(hours=24),
+    TIPO_RESET_SENHA: timedelta(hours=1),
+}
+
+KID_PADRAO = "padrao"
+
+
+class TokenInvalido(ValueError):
+    """Token malformado, com assinatura inválida ou de outra finalidade."""
+
+
+class TokenExpirado(TokenInvalido):
+    """Token com `exp` no passado."""
+
+
+class ServicoTokens:
+    """Emissão e validação de tokens com chaveiro e cache de verificados."""
+
+    def __init__(self, chaves: Mapping[str, str], chave_ativa: str, cache_max_itens: int = 4096):
+        self.cache_max_itens = cache_max_itens
+        self._lock = threading.Lock()
+        self._verificados: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._configurar(chaves, chave_ativa)
+
+    # ------------------------------------------------------------
+    # Chaveiro
+    # ------------------------------------------------------------
+    def _configurar(self, chaves: Mapping[str, str], chave_ativa: str) -> None:
+        if chave_ativa not in chaves:
+            raise ValueError(f"Chave ativa '{chave_ativa}' não está no chaveiro")
+        self._chaves = {str(kid): str(segredo) for kid, segredo in chaves.items()}
+        self.chave_ativa = chave_ativa
+
+    def rotacionar(self, chaves: Mapping[str, str], chave_ativa: str) -> None:
+        """
+        Substitui o chaveiro. Tokens de kids removidos deixam de ser aceitos
+        e o cache de tokens verificados é descartado.
+        """
+        with self._lock:
+            self._configurar(chaves, chave_ativa)
+            self._verificados.clear()
+        logger.info(f"🔑 Chaves de token rotacionadas (ativa: {chave_ativa}, total: {len(chaves)})")
+
+    # ------------------------------------------------------------
+    # Emissão
+    # ------------------------------------------------------------
+    def emitir(self, tipo: str, claims: Optional[Mapping[str, Any]] = None, validade: Optional[timedelta] = None) -> str:
+        """Assina um token da finalidade `tipo` com a chave ativa."""
+        agora = int(time.time())
+        validade = validade or VALIDADE_PADRAO.get(tipo, timedelta(hours=1))
+        payload = dict(claims or {})
+        payload.update({"tipo": tipo, "iat": agora, "exp": agora + int(validade.total_seconds())})
+        if tipo != TIPO_SESSAO:
+            # Tokens de uso único nunca se repetem, mesmo emitidos no mesmo segundo
+            payload.setdefault("jti", secrets.token_urlsafe(12))
+
+        kid = self.chave_ativa
+        return jwt.encode(payload, self._chaves[kid], algorithm=ALGORITHM, headers={"kid": kid})
+
+    # ------------------------------------------------------------
+    # Validação
+    # ------------------------------------------------------------
+    def decodificar(self, token: str) -> Dict[str, Any]:
+        """
+        Verifica assinatura e expiração e retorna uma cópia do payload.
+
+        Raises:
+            TokenExpirado, TokenInvalido
+        """
+        digest = hashlib.sha256(str(token).encode("utf-8")).hexdigest()
+        agora = time.time()
+        with self._lock:
+            item = self._verificados.get(digest)
+            if item is not None:
+                if item[0] > agora:
+                    self._verificados.move_to_end(digest)
+                    return dict(item[1])
+                del self._verificados[digest]
+
+        try:
+            cabecalho = jwt.get_unverified_header(token)
+            # Tokens sem kid (emitidos antes do chaveiro) usam a chave ativa
+            kid = cabecalho.get("kid", self.chave_ativa)
+            if not isinstance(kid, str) or kid not in self._chaves:
+                raise TokenInvalido("Chave do token desconhecida")
+            payload = jwt.decode(
+                token,
+                self._chaves[kid],
+                algorithms=[ALGORITHM],
+                options={"require": ["exp"], "verify_iat": False},
+            )
+        except jwt.ExpiredSignatureError:
+            raise TokenExpirado("Token expirado")
+        except TokenInvalido:
+            raise
+        except (jwt.InvalidTokenError, ValueError, TypeError) as e:
+            # Qualquer falha de análise ou verificação (token vem de links)
+            raise TokenInvalido(f"Token inválido: {type(e).__name__}")
+        exp = payload["exp"]
+        if not isinstance(exp, (int, float)):
+            raise TokenInvalido("Token sem expiração")
+
+        with self._lock:
+            self._verificados[digest] = (float(exp), dict(payload))
+            while len(self._verificados) > self.cache_max_itens:
+                self._verificados.popitem(last=False)
+        return payload
+
+    def validar(self, token: str, tipo: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Decodifica e confere a finalidade.
+
+        Returns:
+            (payload, "Token válido.") ou (None, mensagem de erro)
+        """
+        try:
+            payload = self.decodificar(token)
+        except TokenExpirado:
+            return None, "Token expirado."
+        except TokenInvalido:
+            return None, "Token inválido."
+
+        # Tokens de sessão emitidos antes do serviço não têm "tipo"
+        tipo_token = payload.get("tipo", TIPO_SESSAO)
+        if tipo_token != tipo:
+            return None, "Token inválido."
+        return payload, "Token válido."
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "chave_ativa": self.chave_ativa,
+                "chaves": sorted(self._chaves),
+                "tokens_em_cache": len(self._verificados),
+            }
+
+
+# ==========================================================
+# Carregamento das chaves e instância do processo
+# ==========================================================
+def _ler_segredo(nome: str) -> Any:
+    try:
+        import streamlit as st
+        valor = st.secrets.get(nome)
+        if valor:
+            return valor
+    except Exception:
+        pass  # sem secrets.toml (scripts, jobs): usa o ambiente
+    return None
+
+
+def carregar_chaves() -> Tuple[Dict[str, str], str]:
+    """Lê o chaveiro de st.secrets ou do ambiente. Retorna (chaves, kid ativo)."""
+    chaves_cfg = _ler_segredo("SECRET_KEYS") or SECRET_KEYS
+    if isinstance(chaves_cfg, str):
+        chaves = dict(
+            item.strip().split(":", 1) for item in chaves_cfg.split(",") if ":" in item
+        )
+    else:
+        chaves = {str(kid): str(segredo) for kid, segredo in dict(chaves_cfg or {}).items()}
+
+    if chaves:
+        ativa = str(_ler_segredo("SECRET_KEY_ID") or SECRET_KEY_ID or sorted(chaves)[-1])
+        return chaves, ativa
+
+    segredo = _ler_segredo("SECRET_KEY") or SECRET_KEY
+    return {KID_PADRAO: str(segredo)}, KID_PADRAO
+
+
+_servico: Optional[ServicoTokens] = None
+_servico_lock = threading.Lock()
+
+
+def servico_tokens() -> ServicoTokens:
+    """Serviço de tokens do processo (chaves carregadas uma única vez)."""
+    global _servico
+    if _servico is None:
+        with _servico_lock:
+            if _servico is None:
+                chaves, ativa = carregar_chaves()
+                _servico = ServicoTokens(chaves, ativa, cache_max_itens=JWT_CACHE_MAX_ITENS)
+    return _servico
+
+
+def emitir_token(tipo: str, claims: Optional[Mapping[str, Any]] = None, validade: Optional[timedelta] = None) -> str:
+    return servico_tokens().emitir(tipo, claims, validade)
+
+
+def decodificar_token(token: str) -> Dict[str, Any]:
+    return servico_tokens().decodificar(token)
+
+
+def validar_token(token: str, tipo: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    return servico_tokens().validar(token, tipo)
+
+
+def rotacionar_chaves(chaves: Optional[Mapping[str, str]] = None, chave_ativa: Optional[str] = None) -> None:
+    """Aplica um novo chaveiro (ou relê a configuração se nenhum for passado)."""
+    if chaves is None:
+        chaves, chave_ativa = carregar_chaves()
+    servico_tokens().rotacionar(chaves, chave_ativa or sorted(chaves)[-1])
+
+
+def medir_desempenho(iteracoes: int = 20000) -> Dict[str, float]:
+    """Microsegundos por emissão, validação sem cache e validação com cache."""
+    servico = ServicoTokens({"bench": secrets.token_hex(32)}, "bench", cache_max_itens=iteracoes + 1)
+    claims = {"id": "1", "email": "bench@petdor.app"}
+
+    inicio = time.perf_counter()
+    tokens = [servico.emitir(TIPO_SESSAO, claims) for _ in range(iteracoes)]
+    emitir_us = (time.perf_counter() - inicio) / iteracoes * 1e6
+
+    # Tokens distintos (claims iguais no mesmo segundo geram o mesmo token)
+    tokens = [servico.emitir(TIPO_RESET_SENHA, claims) for _ in range(iteracoes)]
+    inicio = time.perf_counter()
+    for token in tokens:
+        servico.decodificar(token)
+    validar_us = (time.perf_counter() - inicio) / iteracoes * 1e6
+
+    inicio = time.perf_counter()
+    for token in tokens:
+        servico.decodificar(token)
+    cache_us = (time.perf_counter() - inicio) / iteracoes * 1e6
+
+    return {"emitir_us": emitir_us, "validar_us": validar_us, "validar_cache_us": cache_us}
+
+
+__all__ = [
+    "TIPO_SESSAO",
+    "TIPO_CONFIRMACAO_EMAIL",
+    "TIPO_RESET_SENHA",
+    "VALIDADE_PADRAO",
+    "TokenInvalido",
+    "TokenExpirado",
+    "ServicoTokens",
+    "carregar_chaves",
+    "servico_tokens",
+    "emitir_token",
+    "decodificar_token",
+    "validar_token",
+    "rotacionar_chaves",
+    "medir_desempenho",
+]
+
+
+if __name__ == "__main__":
+    for nome, valor in medir_desempenho().items():
+        print(f"{nome}: {valor:.2f}")
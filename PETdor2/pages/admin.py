@@ -7,19 +7,27 @@ Apenas usuários com role 'admin' podem acessar.
 import streamlit as st
 import pandas as pd
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 
 # ============================================================
 # 🔧 IMPORTS ABSOLUTOS
 # ============================================================
 from backend.database.supabase_client import (
-    supabase_table_select,
-    supabase_table_update,
+    supabase_table_select_pagina,
+    verificar_conexao,
+    estado_conexao,
 )
-from backend.auth.user import (
-    atualizar_status_usuario,
-    atualizar_usuario,
+from backend.database.supabase_async import (
+    async_table_select,
+    async_table_count,
+    async_table_aggregate,
+    async_rpc,
+    carregar_em_paralelo,
 )
+from backend.database.cache import TTL_PADRAO
+from backend.database.projecoes import USER_ADMIN_LIST, PET_ADMIN_LIST, EVAL_ADMIN_LIST
+from backend.auth.user import atualizar_usuarios_em_lote
 
 logger = logging.getLogger(__name__)
 
@@ -34,45 +42,298 @@ def is_admin(user_data: dict) -> bool:
 # 📦 FUNÇÕES DE DADOS
 # ============================================================
 
-def listar_usuarios() -> list:
-    ok, data = supabase_table_select(
+_CAMPOS_USUARIO = USER_ADMIN_LIST
+
+_OPCOES_SIM_NAO = {"Todos": None, "Sim": True, "Não": False}
+
+
+def montar_filtros_usuarios(
+    email_prefixo: str = "",
+    ativo: bool | None = None,
+    confirmado: bool | None = None,
+    criado_de=None,
+    criado_ate=None,
+) -> dict:
+    """Converte os filtros da tela em filtros PostgREST (aplicados no servidor)."""
+    filtros = {}
+    if email_prefixo:
+        filtros["email"] = {"ilike": f"{email_prefixo.strip().lower()}*"}
+    if ativo is not None:
+        filtros["ativo"] = ativo
+    if confirmado is not None:
+        filtros["email_confirmado"] = confirmado
+
+    criado_em = {}
+    if criado_de:
+        criado_em["gte"] = criado_de.isoformat()
+    if criado_ate:
+        # Data final inclusiva: tudo antes do dia seguinte
+        criado_em["lt"] = (criado_ate + timedelta(days=1)).isoformat()
+    if criado_em:
+        filtros["criado_em"] = criado_em
+    return filtros
+
+
+def buscar_usuarios_pagina(filtros: dict, pagina: int, tamanho: int) -> tuple[list, int]:
+    """Retorna (usuários da página, total filtrado)."""
+    resultado = supabase_table_select_pagina(
         "usuarios",
-        "id, nome, email, tipo, pais, email_confirmado, ativo, is_admin, criado_em"
+        _CAMPOS_USUARIO,
+        filters=filtros,
+        order="criado_em.desc,id.desc",
+        limit=tamanho,
+        offset=pagina * tamanho,
+        cache_ttl=TTL_PADRAO
     )
-    if not ok:
-        st.error(data)
-        logger.error(data)
-        return []
-    return data or []
+    if resultado is None:
+        logger.error("Falha ao listar usuários")
+        return [], 0
+    usuarios, total = resultado
+    return usuarios, total or 0
 
 
-def listar_pets() -> list:
-    ok, data = supabase_table_select(
-        "pets",
-        "id, nome, especie, raca, proprietario_id, criado_em"
-    )
-    if not ok:
-        st.error(data)
-        logger.error(data)
-        return []
-    return data or []
+# ============================================================
+# 📈 PAINEL (consultas independentes, disparadas em paralelo)
+# ============================================================
+
+# Estatísticas por função no banco (backend/database/sql/estatisticas_avaliacoes.sql);
+# sem ela, agregados do PostgREST (desabilitados por padrão no Supabase) e,
+# por último, cálculo a partir das colunas
+_ESTATISTICAS_RPC = {
+    "pets_por_especie": ("pets_por_especie", ("pets",)),
+    "resumo_avaliacoes": ("estatisticas_admin", ("avaliacoes",)),
+    "avaliacoes_por_especie": ("avaliacoes_por_especie", ("avaliacoes",)),
+}
+
+# Caminho que falhou não é tentado de novo a cada execução do script, só
+# após _REVERIFICAR_SEGUNDOS (a configuração do banco pode mudar)
+_REVERIFICAR_SEGUNDOS = 600
+_indisponivel_ate: dict[str, float] = {}
+
+
+def _disponivel(caminho: str) -> bool:
+    return time.time() >= _indisponivel_ate.get(caminho, 0.0)
 
 
-def listar_avaliacoes() -> list:
-    ok, data = supabase_table_select(
+def _marcar_indisponivel(caminho: str) -> None:
+    if _disponivel(caminho):
+        logger.warning(f"Estatísticas via {caminho} indisponíveis; usando alternativa por {_REVERIFICAR_SEGUNDOS}s")
+    _indisponivel_ate[caminho] = time.time() + _REVERIFICAR_SEGUNDOS
+
+
+def _estatisticas_por_agregados(chave: str):
+    if chave == "pets_por_especie":
+        return async_table_aggregate(
+            "pets",
+            {"total": "count()"},
+            group_by=["especie"],
+            order="especie",
+            cache_ttl=TTL_PADRAO
+        )
+    if chave == "resumo_avaliacoes":
+        return async_table_aggregate(
+            "avaliacoes",
+            {
+                "total": "count()",
+                "dor_media": "percentual_dor.avg()",
+                "dor_maxima": "percentual_dor.max()",
+            },
+            cache_ttl=TTL_PADRAO
+        )
+    return async_table_aggregate(
         "avaliacoes",
-        "id, usuario_id, pet_id, percentual_dor, data_avaliacao"
+        {
+            "total": "count()",
+            "dor_media": "percentual_dor.avg()",
+        },
+        group_by=["especie"],
+        order="especie",
+        cache_ttl=TTL_PADRAO
     )
-    if not ok:
-        st.error(data)
-        logger.error(data)
-        return []
-    return data or []
+
+
+def _estatisticas_no_cliente(chaves: list) -> dict:
+    """Último recurso: lê só as colunas necessárias e calcula aqui."""
+    tarefas = {}
+    if "pets_por_especie" in chaves:
+        tarefas["pets"] = async_table_select("pets", "especie", cache_ttl=TTL_PADRAO)
+    if "resumo_avaliacoes" in chaves or "avaliacoes_por_especie" in chaves:
+        tarefas["avaliacoes"] = async_table_select("avaliacoes", "especie, percentual_dor", cache_ttl=TTL_PADRAO)
+    linhas = carregar_em_paralelo(tarefas)
+
+    resultado = {}
+    if linhas.get("pets") is not None:
+        df = pd.DataFrame(linhas["pets"], columns=["especie"])
+        resultado["pets_por_especie"] = (
+            df.groupby("especie").size().rename("total").reset_index().to_dict("records")
+        )
+    if linhas.get("avaliacoes") is not None:
+        df = pd.DataFrame(linhas["avaliacoes"], columns=["especie", "percentual_dor"])
+        df["percentual_dor"] = pd.to_numeric(df["percentual_dor"], errors="coerce")
+        resultado["resumo_avaliacoes"] = [] if df.empty else [{
+            "total": len(df),
+            "dor_media": round(float(df["percentual_dor"].mean()), 1),
+            "dor_maxima": float(df["percentual_dor"].max()),
+        }]
+        resultado["avaliacoes_por_especie"] = (
+            df.groupby("especie")["percentual_dor"]
+            .agg(total="size", dor_media="mean")
+            .round(1)
+            .reset_index()
+            .to_dict("records")
+        )
+    return {chave: resultado.get(chave) for chave in chaves}
+
+
+def carregar_painel(limite_recentes: int = 100) -> dict:
+    """
+    Carrega os dados das abas Pets e Avaliações de uma só vez: as consultas
+    são independentes, então rodam ao mesmo tempo (httpx assíncrono) e o
+    tempo total fica próximo ao da mais lenta. Falhas viram None.
+
+    As estatísticas vêm das funções no banco; as que falharem são refeitas
+    com agregados do PostgREST e, sem eles, calculadas a partir das colunas.
+    """
+    tarefas = {
+        "total_pets": async_table_count("pets", cache_ttl=TTL_PADRAO),
+        "pets_recentes": async_table_select(
+            "pets",
+            PET_ADMIN_LIST,
+            order="criado_em.desc",
+            limit=limite_recentes,
+            cache_ttl=TTL_PADRAO
+        ),
+        "total_avaliacoes": async_table_count("avaliacoes", cache_ttl=TTL_PADRAO),
+        # Agregado mensal via RPC (ver backend/database/sql/estatisticas_avaliacoes.sql)
+        "avaliacoes_por_mes": async_rpc(
+            "avaliacoes_por_mes",
+            {"meses": 12},
+            tabelas=("avaliacoes",),
+            cache_ttl=TTL_PADRAO
+        ),
+        "avaliacoes_recentes": async_table_select(
+            "avaliacoes",
+            EVAL_ADMIN_LIST,
+            order="data_avaliacao.desc",
+            limit=limite_recentes,
+            cache_ttl=TTL_PADRAO
+        ),
+    }
+    for chave, (funcao, tabelas) in _ESTATISTICAS_RPC.items():
+        if _disponivel(f"rpc {funcao}"):
+            tarefas[chave] = async_rpc(funcao, tabelas=tabelas, cache_ttl=TTL_PADRAO)
+    dados = carregar_em_paralelo(tarefas)
+
+    faltando = [chave for chave in _ESTATISTICAS_RPC if dados.get(chave) is None]
+    for chave in faltando:
+        if chave in tarefas:
+            _marcar_indisponivel(f"rpc {_ESTATISTICAS_RPC[chave][0]}")
+
+    if faltando and _disponivel("agregados"):
+        dados.update(carregar_em_paralelo({chave: _estatisticas_por_agregados(chave) for chave in faltando}))
+        if any(dados[chave] is None for chave in faltando):
+            _marcar_indisponivel("agregados")
+        faltando = [chave for chave in faltando if dados[chave] is None]
+
+    if faltando:
+        dados.update(_estatisticas_no_cliente(faltando))
+
+    for chave in ("pets_recentes", "avaliacoes_recentes", *faltando):
+        if dados[chave] is None:
+            logger.error(f"Falha ao carregar {chave}")
+
+    resumo = dados["resumo_avaliacoes"]
+    return {
+        "total_pets": dados["total_pets"] or 0,
+        "pets_por_especie": dados["pets_por_especie"] or [],
+        "pets_recentes": dados["pets_recentes"] or [],
+        "total_avaliacoes": dados["total_avaliacoes"] or 0,
+        "resumo_avaliacoes": resumo[0] if resumo else None,
+        "avaliacoes_por_especie": dados["avaliacoes_por_especie"] or [],
+        "avaliacoes_por_mes": dados["avaliacoes_por_mes"] or [],
+        "avaliacoes_recentes": dados["avaliacoes_recentes"] or [],
+    }
 
 # ============================================================
 # 🖥️ RENDERIZAÇÃO
 # ============================================================
 
+_ACOES_EM_LOTE = {
+    "🔓 Ativar": {"ativo": True},
+    "🔒 Desativar": {"ativo": False},
+    "👑 Promover a admin": {"is_admin": True},
+    "➖ Remover admin": {"is_admin": False},
+}
+
+
+def _render_usuarios():
+    """Grade paginada de usuários com filtros no servidor e ações em lote."""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    email_prefixo = col1.text_input("E-mail começa com", key="adm_usr_email")
+    ativo = col2.selectbox("Ativo", list(_OPCOES_SIM_NAO), key="adm_usr_ativo")
+    confirmado = col3.selectbox("E-mail confirmado", list(_OPCOES_SIM_NAO), key="adm_usr_confirmado")
+
+    col4, col5, col6 = st.columns([1, 1, 1])
+    criado_de = col4.date_input("Criado a partir de", value=None, key="adm_usr_de")
+    criado_ate = col5.date_input("Criado até", value=None, key="adm_usr_ate")
+    tamanho = col6.selectbox("Por página", [25, 50, 100], key="adm_usr_tamanho")
+
+    filtros = montar_filtros_usuarios(
+        email_prefixo,
+        _OPCOES_SIM_NAO[ativo],
+        _OPCOES_SIM_NAO[confirmado],
+        criado_de,
+        criado_ate,
+    )
+
+    # Volta para a primeira página quando os filtros mudam
+    assinatura = (repr(filtros), tamanho)
+    if st.session_state.get("adm_usr_assinatura") != assinatura:
+        st.session_state["adm_usr_assinatura"] = assinatura
+        st.session_state["adm_usr_pagina"] = 0
+
+    pagina = st.session_state.get("adm_usr_pagina", 0)
+    usuarios, total = buscar_usuarios_pagina(filtros, pagina, tamanho)
+
+    st.metric("Usuários encontrados", total)
+    if not usuarios:
+        st.info("Nenhum usuário encontrado.")
+        return
+
+    df = pd.DataFrame(usuarios)
+    df.insert(0, "selecionar", False)
+    editado = st.data_editor(
+        df,
+        hide_index=True,
+        use_container_width=True,
+        disabled=[c for c in df.columns if c != "selecionar"],
+        key=f"adm_usr_grade_{pagina}",
+    )
+    selecionados = editado.loc[editado["selecionar"], "id"].tolist()
+
+    total_paginas = max(1, -(-total // tamanho))
+    col_ant, col_info, col_prox = st.columns([1, 2, 1])
+    if col_ant.button("⬅️ Anterior", disabled=pagina == 0, key="adm_usr_ant"):
+        st.session_state["adm_usr_pagina"] = pagina - 1
+        st.rerun()
+    col_info.write(f"Página {pagina + 1} de {total_paginas}")
+    if col_prox.button("Próxima ➡️", disabled=pagina + 1 >= total_paginas, key="adm_usr_prox"):
+        st.session_state["adm_usr_pagina"] = pagina + 1
+        st.rerun()
+
+    st.divider()
+    st.write(f"**Ações em lote** — {len(selecionados)} selecionado(s)")
+    colunas = st.columns(len(_ACOES_EM_LOTE))
+    for coluna, (rotulo, dados) in zip(colunas, _ACOES_EM_LOTE.items()):
+        if coluna.button(rotulo, disabled=not selecionados, key=f"adm_usr_lote_{rotulo}"):
+            resultado = atualizar_usuarios_em_lote(selecionados, dados)
+            if resultado is None:
+                st.error("Erro ao atualizar usuários.")
+            else:
+                st.success(f"{len(resultado)} usuário(s) atualizado(s).")
+                st.rerun()
+
+
 def render(user_data: dict = None):
     st.title("🔐 Painel Administrativo — PETdor")
 
@@ -90,89 +351,63 @@ def render(user_data: dict = None):
         "⚙️ Sistema"
     ])
 
+    # As abas são todas executadas a cada execução do script: os dados de
+    # Pets e Avaliações são buscados juntos, antes de desenhá-las
+    painel = carregar_painel()
+
     # ========================================================
     # 👥 USUÁRIOS
     # ========================================================
     with tab1:
-        usuarios = listar_usuarios()
-
-        if not usuarios:
-            st.info("Nenhum usuário cadastrado.")
-            return
-
-        st.metric("Total de Usuários", len(usuarios))
-        st.divider()
-
-        for u in usuarios:
-            uid = u["id"]
-
-            with st.expander(f"👤 {u['nome']} ({u['email']})"):
-                col1, col2, col3 = st.columns([2, 1, 1])
-
-                with col1:
-                    st.write(f"**País:** {u.get('pais', '-')}")
-                    st.write(f"**Criado em:** {u.get('criado_em', '-')}")
-                    st.write("**Email confirmado:**", "✅" if u["email_confirmado"] else "❌")
-                    st.write("**Admin:**", "👑 Sim" if u["is_admin"] else "Não")
-
-                with col2:
-                    novo_tipo = st.selectbox(
-                        "Tipo",
-                        ["Tutor", "Veterinario", "Admin"],
-                        index=0,
-                        key=f"tipo_{uid}"
-                    )
-                    novo_admin = st.checkbox(
-                        "Administrador",
-                        value=u["is_admin"],
-                        key=f"admin_{uid}"
-                    )
-
-                    if st.button("💾 Salvar", key=f"save_{uid}"):
-                        ok, msg = atualizar_usuario(
-                            uid,
-                            tipo=novo_tipo,
-                            is_admin=novo_admin
-                        )
-                        if ok:
-                            st.success("Atualizado!")
-                            st.rerun()
-                        else:
-                            st.error(msg)
-
-                with col3:
-                    label = "🔒 Desativar" if u["ativo"] else "🔓 Ativar"
-                    if st.button(label, key=f"status_{uid}"):
-                        ok, msg = atualizar_status_usuario(uid, not u["ativo"])
-                        if ok:
-                            st.success("Status atualizado!")
-                            st.rerun()
-                        else:
-                            st.error(msg)
+        _render_usuarios()
 
     # ========================================================
     # 🐾 PETS
     # ========================================================
     with tab2:
-        pets = listar_pets()
-        if not pets:
+        total_pets = painel["total_pets"]
+        if not total_pets:
             st.info("Nenhum pet cadastrado.")
         else:
-            st.metric("Total de Pets", len(pets))
-            st.dataframe(pd.DataFrame(pets), use_container_width=True)
+            st.metric("Total de Pets", total_pets)
+
+            por_especie = painel["pets_por_especie"]
+            if por_especie:
+                st.subheader("Pets por espécie")
+                st.bar_chart(pd.DataFrame(por_especie).set_index("especie")["total"])
+
+            st.subheader("Cadastros recentes")
+            st.dataframe(pd.DataFrame(painel["pets_recentes"]), use_container_width=True)
 
     # ========================================================
     # 📊 AVALIAÇÕES
     # ========================================================
     with tab3:
-        avaliacoes = listar_avaliacoes()
-        if not avaliacoes:
+        total_avaliacoes = painel["total_avaliacoes"]
+        if not total_avaliacoes:
             st.info("Nenhuma avaliação registrada.")
         else:
-            df = pd.DataFrame(avaliacoes)
-            st.metric("Total", len(df))
-            st.metric("Dor Média", f"{df['percentual_dor'].mean():.1f}%")
-            st.dataframe(df, use_container_width=True)
+            resumo = painel["resumo_avaliacoes"]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Total", total_avaliacoes)
+            if resumo:
+                col2.metric("Dor Média", f"{float(resumo.get('dor_media') or 0):.1f}%")
+                col3.metric("Dor Máxima", f"{resumo.get('dor_maxima') or 0}%")
+            else:
+                st.caption("Média e máxima indisponíveis no momento.")
+
+            por_especie = painel["avaliacoes_por_especie"]
+            if por_especie:
+                st.subheader("Por espécie")
+                st.dataframe(pd.DataFrame(por_especie), use_container_width=True)
+
+            por_mes = painel["avaliacoes_por_mes"]
+            if por_mes:
+                st.subheader("Por mês (últimos 12 meses)")
+                st.bar_chart(pd.DataFrame(por_mes).set_index("mes")["total"])
+
+            st.subheader("Avaliações recentes")
+            st.dataframe(pd.DataFrame(painel["avaliacoes_recentes"]), use_container_width=True)
 
     # ========================================================
     # ⚙️ SISTEMA
@@ -181,7 +416,18 @@ def render(user_data: dict = None):
         st.info("📦 **PETdor 2.0**")
         st.info(f"🕒 {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
         if st.button("🔄 Testar Conexão Supabase"):
-            st.success("Conexão ativa ✅")
+            verificar_conexao()
+
+        estado = estado_conexao()
+        if estado["pronto"]:
+            st.success(f"Conexão ativa ✅ ({estado['latencia_ms']} ms)")
+        elif estado["ultima_verificacao"] is None:
+            st.info("⏳ Verificando conexão com o Supabase...")
+        else:
+            st.error(f"❌ Supabase indisponível: {estado['erro']}")
+        if estado["ultima_verificacao"]:
+            ultima = datetime.fromtimestamp(estado["ultima_verificacao"])
+            st.caption(f"Última verificação: {ultima.strftime('%d/%m/%Y %H:%M:%S')}")
 
 
 __all__ = ["render"]
@@ -12,12 +12,10 @@ from typing import List, Dict, Any
 # ============================================================
 # 🔧 IMPORTS ABSOLUTOS
 # ============================================================
-from backend.database.supabase_client import get_supabase
-from backend.especies.index import (
-    get_especies_nomes,
-    buscar_especie_por_id,
-    get_escala_labels
-)
+from backend.database.supabase_client import supabase_table_select, supabase_table_insert
+from backend.database.cache import TTL_PADRAO
+from backend.database.projecoes import PET_LIST
+from backend.especies.scoring import obter_motor
 
 logger = logging.getLogger(__name__)
 
@@ -27,50 +25,43 @@ logger = logging.getLogger(__name__)
 # ============================================================
 
 def carregar_pets_do_usuario(usuario_id: int) -> List[Dict[str, Any]]:
-    """Retorna todos os pets cadastrados pelo usuário via Supabase."""
-    try:
-        supabase = get_supabase()
-
-        response = (
-            supabase
-            .from_("pets")
-            .select("id, nome, especie")
-            .eq("tutor_id", usuario_id)
-            .order("nome", desc=False)
-            .execute()
-        )
-
-        pets = getattr(response, "data", None) or response.get("data") if isinstance(response, dict) else []
-        return pets or []
-
-    except Exception as e:
-        logger.error(f"[ERRO] Falha ao carregar pets do usuário {usuario_id}: {e}", exc_info=True)
+    """Retorna todos os pets cadastrados pelo usuário via Supabase (com cache)."""
+    pets = supabase_table_select(
+        "pets",
+        PET_LIST,
+        filters={"tutor_id": usuario_id},
+        order="nome.asc",
+        cache_ttl=TTL_PADRAO,
+    )
+
+    if pets is None:
+        logger.error(f"[ERRO] Falha ao carregar pets do usuário {usuario_id}")
         st.error("❌ Erro ao carregar seus pets. Tente novamente.")
         return []
 
+    return pets
+
 
 def salvar_avaliacao(pet_id: int, usuario_id: int, especie: str,
-                     respostas_json: str, pontuacao_total: int) -> None:
-    """Salva a avaliação na tabela `avaliacoes`."""
-    try:
-        supabase = get_supabase()
-
-        payload = {
-            "pet_id": pet_id,
-            "usuario_id": usuario_id,
-            "especie": especie,
-            "respostas_json": respostas_json,
-            "pontuacao_total": pontuacao_total,
-            "criado_em": datetime.now(timezone.utc).isoformat()
-        }
-
-        supabase.from_("avaliacoes").insert(payload).execute()
-        logger.info(f"✔ Avaliação salva com sucesso para pet_id={pet_id}")
-
-    except Exception as e:
-        logger.error(f"[ERRO] Falha ao salvar avaliação: {e}", exc_info=True)
+                     respostas_json: str, pontuacao_total: int,
+                     percentual_dor: float) -> None:
+    """Salva a avaliação na tabela `avaliacoes` (invalida o cache da tabela)."""
+    payload = {
+        "pet_id": pet_id,
+        "usuario_id": usuario_id,
+        "especie": especie,
+        "respostas_json": respostas_json,
+        "pontuacao_total": pontuacao_total,
+        "percentual_dor": percentual_dor,
+        "criado_em": datetime.now(timezone.utc).isoformat()
+    }
+
+    if supabase_table_insert("avaliacoes", payload) is None:
+        logger.error(f"[ERRO] Falha ao salvar avaliação para pet_id={pet_id}")
         raise RuntimeError("Erro ao salvar avaliação. Contate o suporte.")
 
+    logger.info(f"✔ Avaliação salva com sucesso para pet_id={pet_id}")
+
 
 # ============================================================
 # 🔹 Função principal da página
@@ -116,40 +107,28 @@ def render():
         st.error("⚠ Erro ao identificar a espécie do pet selecionado.")
         return
 
-    especie_cfg = buscar_especie_por_id(especie)
-    if not especie_cfg:
+    # Motor compilado uma vez por espécie (aceita ID ou nome da espécie)
+    motor = obter_motor(especie)
+    if not motor or not motor.num_perguntas:
         st.error(f"⚠ A espécie '{especie}' não possui escala configurada.")
         return
 
     # ------------------------------------------------------------
     # 📋 Perguntas da avaliação
     # ------------------------------------------------------------
-    st.subheader(f"🧪 Avaliação para: **{especie_cfg['nome']}**")
+    st.subheader(f"🧪 Avaliação para: **{motor.nome}**")
 
-    categorias = especie_cfg.get("categorias", [])
     respostas: Dict[str, str] = {}
-    pontuacao_total = 0
-
-    for categoria in categorias:
-        st.markdown(f"### 🔹 {categoria['nome']}")
-
-        for pergunta in categoria.get("perguntas", []):
-            texto = pergunta["texto"]
-            labels = get_escala_labels(pergunta["escala"])
-
-            escolha = st.radio(texto, labels, key=f"{categoria['nome']}_{texto}")
-
-            respostas[texto] = escolha
-
-            # Soma pontuação baseada no índice do item
-            try:
-                pontuacao_total += labels.index(escolha)
-            except Exception:
-                pass
+    for texto in motor.textos:
+        respostas[texto] = st.radio(texto, motor.labels, key=f"{motor.especie_id}_{texto}")
 
-        st.divider()
+    resultado = motor.score(respostas)
 
-    st.markdown(f"## 🧮 Pontuação Total: **{pontuacao_total}**")
+    st.divider()
+    st.markdown(f"## 🧮 Pontuação Total: **{resultado.pontuacao_total:g}**")
+    st.markdown(f"### 🔥 Percentual de Dor: **{resultado.percentual_dor:.1f}%**")
+    if resultado.classificacao:
+        st.markdown(f"### 🏷️ Classificação: **{resultado.classificacao}**")
 
     # ------------------------------------------------------------
     # 💾 Salvar Avaliação
@@ -157,7 +136,16 @@ def render():
     if st.button("💾 Salvar Avaliação"):
         try:
             respostas_json = json.dumps(respostas, ensure_ascii=False)
-            salvar_avaliacao(pet_id, usuario_id, especie, respostas_json, pontuacao_total)
+            # `especie` como está no pet (mesmo valor das avaliações
+            # anteriores); a pontuação total é uma coluna inteira
+            salvar_avaliacao(
+                pet_id,
+                usuario_id,
+                especie,
+                respostas_json,
+                int(round(resultado.pontuacao_total)),
+                round(resultado.percentual_dor, 1),
+            )
             st.success("✅ Avaliação salva com sucesso!")
         except Exception as e:
             st.error(f"❌ Erro ao salvar avaliação: {e}")
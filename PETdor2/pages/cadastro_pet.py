@@ -11,7 +11,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 # 🔧 Imports absolutos do backend
-from backend.database.supabase_client import supabase_table_insert, supabase_table_select
+from backend.database.supabase_client import supabase_table_insert
+from backend.database.consulta import Consulta
+from backend.database.projecoes import PET_CARD
+from backend.database.cache import TTL_PADRAO
 from backend.especies.index import listar_especies  # lista de espécies registradas localmente
 
 # ==========================================================
@@ -38,11 +41,11 @@ def cadastrar_pet_db(
             "peso": peso
         }
 
-        sucesso, mensagem = supabase_table_insert("pets", pet_data)
+        # A escrita invalida o cache de "pets": a lista abaixo já traz o novo pet
+        pet = supabase_table_insert("pets", pet_data)
 
-        if not sucesso:
-            st.error(f"❌ Erro ao cadastrar pet: {mensagem}")
-            logger.error(f"Erro ao cadastrar pet no Supabase: {mensagem}")
+        if pet is None:
+            logger.error(f"Erro ao cadastrar pet no Supabase para tutor_id={tutor_id}")
             return False
 
         logger.info(f"✅ Pet '{nome}' cadastrado com sucesso para tutor_id={tutor_id}")
@@ -56,15 +59,20 @@ def cadastrar_pet_db(
 def listar_pets_db(tutor_id: int) -> List[Dict[str, Any]]:
     """Lista pets do tutor usando a API do Supabase."""
     try:
-        filtros = {"tutor_id": {"eq": tutor_id}}
-        sucesso, pets_data = supabase_table_select("pets", filtros=filtros)
+        resultado = (
+            Consulta("pets")
+            .select(PET_CARD)
+            .eq("tutor_id", tutor_id)
+            .order("nome")
+            .executar(cache_ttl=TTL_PADRAO)
+        )
 
-        if not sucesso:
-            st.error(f"❌ Erro ao listar pets: {pets_data}")
-            logger.error(f"Erro ao listar pets do Supabase: {pets_data}")
+        if resultado is None:
+            logger.error(f"Erro ao listar pets do Supabase para tutor_id={tutor_id}")
             return []
 
-        return pets_data or []
+        pets_data, _ = resultado
+        return pets_data
 
     except Exception as e:
         st.error(f"❌ Erro inesperado ao listar pets: {e}")
@@ -8,7 +8,7 @@ import streamlit as st
 import logging
 
 # 🔧 Imports absolutos do backend
-from backend.auth.email_confirmation import validar_token_confirmacao, confirmar_email
+from backend.auth.email_confirmation import confirmar_email_com_token
 
 logger = logging.getLogger(__name__)
 
@@ -30,24 +30,18 @@ def render():
 
     # Obtém token da URL
     query_params = get_query_params()
-    token = query_params.get("token", [None])[0]
+    token = query_params.get("token")
+    if isinstance(token, list):  # experimental_get_query_params retorna listas
+        token = token[0] if token else None
 
     if not token:
         st.warning("⚠️ Token de confirmação não fornecido.")
         st.info("Verifique o link enviado para seu e-mail.")
         return
 
-    # Valida token
-    token_valido, usuario_id = validar_token_confirmacao(token)
-
-    if not token_valido:
-        st.error("❌ Token inválido ou expirado.")
-        st.info("Solicite um novo link de confirmação.")
-        return
-
-    # Token válido - confirma e-mail
+    # Valida o token e confirma o e-mail
     try:
-        sucesso, mensagem = confirmar_email(usuario_id)
+        sucesso, mensagem = confirmar_email_com_token(token)
         if sucesso:
             st.success("✅ E-mail confirmado com sucesso!")
             st.info("Você já pode fazer login na plataforma.")
@@ -55,10 +49,11 @@ def render():
                 st.session_state.pagina = "login"
                 st.rerun()
         else:
-            st.error(f"❌ Erro ao confirmar e-mail: {mensagem}")
+            st.error(f"❌ {mensagem}")
+            st.info("Solicite um novo link de confirmação.")
 
     except Exception as e:
         st.error(f"❌ Erro inesperado ao confirmar e-mail: {e}")
-        logger.exception(f"Erro inesperado ao confirmar e-mail para usuario_id={usuario_id}")
+        logger.exception("Erro inesperado ao confirmar e-mail")
 
 __all__ = ["render"]
@@ -13,7 +13,7 @@ from backend.auth.user import (
     redefinir_senha,
     atualizar_status_usuario,
 )
-from backend.database.supabase_client import get_supabase
+from backend.database.supabase_client import supabase_table_update
 
 logger = logging.getLogger(__name__)
 
@@ -23,11 +23,13 @@ logger = logging.getLogger(__name__)
 def atualizar_dados_usuario(user_id: int, nome: str, email: str) -> bool:
     """Atualiza nome e email do usuário no Supabase."""
     try:
-        supabase = get_supabase()
-        supabase.from_("usuarios").update({
-            "nome": nome,
-            "email": email.lower()
-        }).eq("id", user_id).execute()
+        atualizado = supabase_table_update(
+            "usuarios",
+            {"id": user_id},
+            {"nome": nome, "email": email.lower()},
+        )
+        if atualizado is None:
+            return False
         logger.info(f"✅ Dados do usuário {user_id} atualizados")
         return True
     except Exception as e:
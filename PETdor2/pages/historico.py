@@ -1,7 +1,8 @@
 # PETdor2/pages/historico.py
 """
 Página de histórico de avaliações do pet.
-Exibe todas as avaliações realizadas pelo usuário logado.
+Exibe as avaliações do usuário logado em páginas (keyset), com resumo
+calculado no banco.
 """
 
 import streamlit as st
@@ -9,58 +10,323 @@ import pandas as pd
 from datetime import datetime
 import logging
 import json
+import time
 
 # 🔧 Imports absolutos
-from backend.database.supabase_client import get_supabase
+from backend.database.supabase_client import (
+    supabase_table_select,
+    supabase_table_aggregate,
+    supabase_table_delete,
+    supabase_rpc,
+)
+from backend.database.consulta import Consulta, col, ou, e_
+from backend.database.cache import NaoArmazenar, cache_consulta
+from backend.database.projecoes import EVAL_HISTORY, PET_LIST
+from backend.especies.scoring import obter_motor
 
 logger = logging.getLogger(__name__)
 
 # ==========================================================
 # Funções de banco
 # ==========================================================
+_CAMPOS_AVALIACAO = EVAL_HISTORY
+
+# Quantidade máxima de IDs por filtro id=in.(...) (limita o tamanho da URL)
+_LOTE_PETS = 200
+
+
+def _preencher_pet(aval: dict, pet: dict | None) -> None:
+    """Copia nome e espécie do pet para a avaliação, com valores padrão."""
+    pet = pet or {}
+    aval["pet_nome"] = pet.get("nome", "Desconhecido")
+    aval["pet_especie"] = pet.get("especie", "Desconhecida")
+
+
+def _buscar_pets_por_ids(pet_ids: set) -> dict:
+    """Busca os pets em lote (id=in.(...)) e retorna um dicionário id → pet."""
+    ids = sorted(pet_ids)
+    pets_por_id = {}
+    for inicio in range(0, len(ids), _LOTE_PETS):
+        lote = ids[inicio:inicio + _LOTE_PETS]
+        pets = supabase_table_select("pets", PET_LIST, {"id": lote})
+        if pets is None:
+            # Sem os pets a página sairia com "Desconhecido" (e iria ao cache)
+            raise RuntimeError(f"Falha ao buscar pets {lote}")
+        for pet in pets:
+            pets_por_id[pet["id"]] = pet
+    return pets_por_id
+
+
+def _consultar_com_pets(montar_consulta) -> list[dict]:
+    """
+    Executa a consulta de avaliações já com nome e espécie do pet.
+
+    `montar_consulta(select)` recebe a projeção e devolve a Consulta pronta
+    (executada pelos helpers REST, com o JWT da sessão). Tenta o recurso
+    embutido pets(nome, especie) do PostgREST (uma única consulta); se o
+    embed não estiver disponível, busca os pets em lote e faz a junção em
+    memória.
+    """
+    resultado = montar_consulta(f"{_CAMPOS_AVALIACAO}, pets(nome, especie)").executar()
+    if resultado is not None:
+        avaliacoes = resultado[0]
+        for aval in avaliacoes:
+            _preencher_pet(aval, aval.pop("pets", None))
+        return avaliacoes
+    logger.warning("Embed de pets indisponível, usando busca em lote")
+
+    resultado = montar_consulta(_CAMPOS_AVALIACAO).executar()
+    if resultado is None:
+        raise RuntimeError("Falha ao consultar avaliações")
+    avaliacoes = resultado[0]
+
+    pet_ids = {a["pet_id"] for a in avaliacoes if a.get("pet_id") is not None}
+    pets_por_id = _buscar_pets_por_ids(pet_ids) if pet_ids else {}
+    for aval in avaliacoes:
+        _preencher_pet(aval, pets_por_id.get(aval.get("pet_id")))
+    return avaliacoes
+
+
+@cache_consulta(tabelas=("avaliacoes", "pets"))
 def buscar_avaliacoes_usuario(usuario_id: int) -> list[dict]:
     """Busca todas as avaliações de um usuário e adiciona informações dos pets."""
     try:
-        supabase = get_supabase()
-        response = (
-            supabase
-            .from_("avaliacoes")
-            .select("id, data_avaliacao, percentual_dor, observacoes, pet_id")
-            .eq("usuario_id", usuario_id)
-            .order("data_avaliacao", desc=True)
-            .execute()
+        return _consultar_com_pets(
+            lambda select: (
+                Consulta("avaliacoes")
+                .select(select)
+                .eq("usuario_id", usuario_id)
+                .order("data_avaliacao", desc=True)
+            ),
         )
-        avaliacoes = response.data if response.data else []
+    except Exception as e:
+        logger.exception(f"Erro ao buscar avaliações para usuario_id={usuario_id}")
+        return NaoArmazenar([])
 
-        for aval in avaliacoes:
-            try:
-                pet_resp = supabase.from_("pets").select("nome, especie").eq("id", aval["pet_id"]).single().execute()
-                aval["pet_nome"] = pet_resp.data.get("nome", "Desconhecido")
-                aval["pet_especie"] = pet_resp.data.get("especie", "Desconhecida")
-            except Exception as e:
-                logger.warning(f"Erro ao buscar pet {aval.get('pet_id')}: {e}")
-                aval["pet_nome"] = "Desconhecido"
-                aval["pet_especie"] = "Desconhecida"
 
-        return avaliacoes
+def _filtro_keyset(cursor: tuple):
+    """
+    Monta o filtro `or` que retorna as linhas após o cursor, na ordem
+    data_avaliacao DESC (nulos primeiro, padrão do Postgres), id DESC.
+    """
+    data, ultimo_id = cursor
+    if data is None:
+        return ou(
+            e_(col("data_avaliacao").is_(None), col("id").lt(ultimo_id)),
+            col("data_avaliacao").is_(None).negar(),
+        )
+    return ou(
+        col("data_avaliacao").lt(data),
+        e_(col("data_avaliacao").eq(data), col("id").lt(ultimo_id)),
+    )
+
+
+@cache_consulta(tabelas=("avaliacoes", "pets"))
+def buscar_pagina_avaliacoes(
+    usuario_id: int,
+    cursor: tuple | None = None,
+    limite: int = 20,
+) -> tuple[list[dict], tuple | None]:
+    """
+    Busca uma página de avaliações usando paginação keyset em
+    (data_avaliacao, id).
+
+    Returns:
+        Tupla (avaliações, próximo cursor). O cursor é None quando não há
+        mais páginas.
+    """
+    try:
+        def montar_consulta(select):
+            consulta = Consulta("avaliacoes").select(select).eq("usuario_id", usuario_id)
+            if cursor is not None:
+                consulta.filtro(_filtro_keyset(cursor))
+            # Busca um item extra só para saber se existe próxima página
+            return (
+                consulta
+                .order("data_avaliacao", desc=True)
+                .order("id", desc=True)
+                .limit(limite + 1)
+            )
+
+        avaliacoes = _consultar_com_pets(montar_consulta)
+
+        if len(avaliacoes) <= limite:
+            return avaliacoes, None
+
+        avaliacoes = avaliacoes[:limite]
+        ultima = avaliacoes[-1]
+        return avaliacoes, (ultima.get("data_avaliacao"), ultima["id"])
     except Exception as e:
-        logger.exception(f"Erro ao buscar avaliações para usuario_id={usuario_id}")
-        return []
+        logger.exception(f"Erro ao buscar página de avaliações para usuario_id={usuario_id}")
+        return NaoArmazenar(([], None))
 
-def deletar_avaliacao(avaliacao_id: int) -> tuple[bool, str]:
-    """Deleta uma avaliação do banco de dados."""
+
+# Caminhos do resumo que falharam neste processo: não são tentados de novo
+# a cada execução do script, só após _REVERIFICAR_SEGUNDOS (a configuração
+# do banco pode mudar)
+_REVERIFICAR_SEGUNDOS = 600
+_indisponivel_ate: dict[str, float] = {}
+
+
+def _disponivel(caminho: str) -> bool:
+    return time.time() >= _indisponivel_ate.get(caminho, 0.0)
+
+
+def _marcar_indisponivel(caminho: str) -> None:
+    if _disponivel(caminho):
+        logger.warning(f"Resumo via {caminho} indisponível; usando alternativa por {_REVERIFICAR_SEGUNDOS}s")
+    _indisponivel_ate[caminho] = time.time() + _REVERIFICAR_SEGUNDOS
+
+
+@cache_consulta(tabelas=("avaliacoes", "pets"))
+def resumo_avaliacoes_usuario(usuario_id: int) -> dict:
+    """
+    Retorna total, dor média e dor máxima das avaliações do usuário,
+    calculados no banco: pela função resumo_avaliacoes_usuario
+    (backend/database/sql/estatisticas_avaliacoes.sql) ou, sem ela, pelos
+    agregados do PostgREST.
+
+    Se nenhum dos dois estiver disponível, calcula a partir apenas da
+    coluna percentual_dor.
+    """
+    resumo = {"total": 0, "dor_media": 0.0, "dor_maxima": 0}
     try:
-        supabase = get_supabase()
-        supabase.from_("avaliacoes").delete().eq("id", avaliacao_id).execute()
-        logger.info(f"✅ Avaliação {avaliacao_id} deletada com sucesso")
-        return True, "✅ Avaliação deletada com sucesso!"
+        linhas = None
+        if _disponivel("rpc"):
+            linhas = supabase_rpc("resumo_avaliacoes_usuario", {"p_usuario_id": usuario_id})
+            if linhas is None:
+                _marcar_indisponivel("rpc")
+        if linhas is None and _disponivel("agregados"):
+            linhas = supabase_table_aggregate(
+                "avaliacoes",
+                {
+                    "total": "count()",
+                    "dor_media": "percentual_dor.avg()",
+                    "dor_maxima": "percentual_dor.max()",
+                },
+                filters={"usuario_id": usuario_id},
+            )
+            if linhas is None:
+                _marcar_indisponivel("agregados")
+
+        if linhas is not None:
+            linha = (linhas or [{}])[0]
+            resumo["total"] = linha.get("total") or 0
+            resumo["dor_media"] = float(linha.get("dor_media") or 0)
+            resumo["dor_maxima"] = linha.get("dor_maxima") or 0
+            return resumo
+
+        linhas = supabase_table_select("avaliacoes", "percentual_dor", {"usuario_id": usuario_id})
+        if linhas is None:
+            raise RuntimeError("Falha ao consultar avaliações")
+        valores = [a.get("percentual_dor") or 0 for a in linhas]
+        if valores:
+            resumo["total"] = len(valores)
+            resumo["dor_media"] = sum(valores) / len(valores)
+            resumo["dor_maxima"] = max(valores)
+        return resumo
     except Exception as e:
-        logger.exception(f"Erro ao deletar avaliação {avaliacao_id}")
-        return False, f"❌ Erro ao deletar avaliação: {e}"
+        logger.exception(f"Erro ao calcular resumo de avaliações para usuario_id={usuario_id}")
+        return NaoArmazenar(resumo)
+
+def deletar_avaliacao(avaliacao_id: int) -> tuple[bool, str]:
+    """Deleta uma avaliação do banco de dados (invalida o cache de avaliações)."""
+    if not supabase_table_delete("avaliacoes", {"id": avaliacao_id}):
+        logger.error(f"Erro ao deletar avaliação {avaliacao_id}")
+        return False, "❌ Erro ao deletar avaliação."
+    logger.info(f"✅ Avaliação {avaliacao_id} deletada com sucesso")
+    return True, "✅ Avaliação deletada com sucesso!"
 
 # ==========================================================
 # Renderização
 # ==========================================================
+_TAMANHO_PAGINA = 20
+
+
+def _resetar_paginacao() -> None:
+    """Descarta as páginas já carregadas do histórico."""
+    for chave in ("historico_chave", "historico_avaliacoes", "historico_cursor"):
+        st.session_state.pop(chave, None)
+
+
+def _carregar_proxima_pagina(usuario_id: int) -> None:
+    """Busca a próxima página e acumula no session_state."""
+    avaliacoes, cursor = buscar_pagina_avaliacoes(
+        usuario_id,
+        cursor=st.session_state.get("historico_cursor"),
+        limite=_TAMANHO_PAGINA,
+    )
+    st.session_state.setdefault("historico_avaliacoes", []).extend(avaliacoes)
+    st.session_state["historico_cursor"] = cursor
+
+
+def _render_avaliacao(aval: dict) -> None:
+    """Renderiza o card expansível de uma avaliação."""
+    aval_id = aval.get("id")
+    data = aval.get("data_avaliacao", "Data desconhecida")
+    dor = aval.get("percentual_dor", 0)
+    obs = aval.get("observacoes", "")
+    pet_nome = aval.get("pet_nome", "Desconhecido")
+    pet_esp = aval.get("pet_especie", "Desconhecida")
+
+    # Formata a data
+    try:
+        data_obj = pd.to_datetime(data)
+        data_formatada = data_obj.strftime("%d/%m/%Y %H:%M")
+    except Exception:
+        data_formatada = str(data)
+
+    with st.expander(f"🐾 {pet_nome} — {pet_esp} — {data_formatada} — Dor: {dor}%"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write(f"📅 **Data:** {data_formatada}")
+            st.write(f"🐾 **Pet:** {pet_nome}")
+            st.write(f"🏷️ **Espécie:** {pet_esp}")
+        with col2:
+            st.write(f"🔥 **Percentual de Dor:** {dor}%")
+            st.progress(dor / 100)
+
+        st.divider()
+        st.write("📝 **Observações:**")
+        st.write(obs if obs else "_Nenhuma observação registrada._")
+
+        st.divider()
+        col_delete, col_export = st.columns(2)
+
+        with col_delete:
+            if st.button("🗑️ Deletar avaliação", key=f"del_{aval_id}"):
+                sucesso, mensagem = deletar_avaliacao(aval_id)
+                if sucesso:
+                    st.success(mensagem)
+                    _resetar_paginacao()
+                    st.rerun()
+                else:
+                    st.error(mensagem)
+
+        with col_export:
+            exportacao = {
+                "id": aval_id,
+                "pet": f"{pet_nome} ({pet_esp})",
+                "data": data_formatada,
+                "percentual_dor": dor,
+                "observacoes": obs
+            }
+            # Mesma classificação usada na página de avaliação
+            motor = obter_motor(pet_esp)
+            classificacao = motor.classificar(dor or 0) if motor else None
+            if classificacao:
+                exportacao["classificacao"] = classificacao
+            json_data = json.dumps(exportacao, ensure_ascii=False, indent=2)
+
+            st.download_button(
+                label="📥 Exportar JSON",
+                data=json_data,
+                file_name=f"avaliacao_{aval_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                mime="application/json",
+                key=f"export_{aval_id}"
+            )
+
+
 def render():
     st.header("📊 Histórico de Avaliações")
 
@@ -71,85 +337,44 @@ def render():
         st.stop()
 
     usuario_id = usuario.get("id")
-    avaliacoes = buscar_avaliacoes_usuario(usuario_id)
+    resumo = resumo_avaliacoes_usuario(usuario_id)
 
-    if not avaliacoes:
+    if not resumo["total"]:
+        _resetar_paginacao()
         st.info("📭 Você ainda não registrou avaliações.")
         return
 
-    st.success(f"✅ {len(avaliacoes)} avaliação(ões) encontrada(s)")
+    # Recomeça a paginação se mudou o usuário ou o total (nova avaliação)
+    chave = (usuario_id, resumo["total"])
+    if st.session_state.get("historico_chave") != chave:
+        _resetar_paginacao()
+        st.session_state["historico_chave"] = chave
+        _carregar_proxima_pagina(usuario_id)
+
+    avaliacoes = st.session_state.get("historico_avaliacoes", [])
+
+    st.success(f"✅ {resumo['total']} avaliação(ões) encontrada(s)")
     st.divider()
 
     # Exibir avaliações em cards expansíveis
     for aval in avaliacoes:
-        aval_id = aval.get("id")
-        data = aval.get("data_avaliacao", "Data desconhecida")
-        dor = aval.get("percentual_dor", 0)
-        obs = aval.get("observacoes", "")
-        pet_nome = aval.get("pet_nome", "Desconhecido")
-        pet_esp = aval.get("pet_especie", "Desconhecida")
-
-        # Formata a data
-        try:
-            data_obj = pd.to_datetime(data)
-            data_formatada = data_obj.strftime("%d/%m/%Y %H:%M")
-        except Exception:
-            data_formatada = str(data)
-
-        with st.expander(f"🐾 {pet_nome} — {pet_esp} — {data_formatada} — Dor: {dor}%"):
-            col1, col2 = st.columns(2)
-            with col1:
-                st.write(f"📅 **Data:** {data_formatada}")
-                st.write(f"🐾 **Pet:** {pet_nome}")
-                st.write(f"🏷️ **Espécie:** {pet_esp}")
-            with col2:
-                st.write(f"🔥 **Percentual de Dor:** {dor}%")
-                st.progress(dor / 100)
-
-            st.divider()
-            st.write("📝 **Observações:**")
-            st.write(obs if obs else "_Nenhuma observação registrada._")
-
-            st.divider()
-            col_delete, col_export = st.columns(2)
-
-            with col_delete:
-                if st.button("🗑️ Deletar avaliação", key=f"del_{aval_id}"):
-                    sucesso, mensagem = deletar_avaliacao(aval_id)
-                    if sucesso:
-                        st.success(mensagem)
-                        st.rerun()
-                    else:
-                        st.error(mensagem)
-
-            with col_export:
-                json_data = json.dumps({
-                    "id": aval_id,
-                    "pet": f"{pet_nome} ({pet_esp})",
-                    "data": data_formatada,
-                    "percentual_dor": dor,
-                    "observacoes": obs
-                }, ensure_ascii=False, indent=2)
-
-                st.download_button(
-                    label="📥 Exportar JSON",
-                    data=json_data,
-                    file_name=f"avaliacao_{aval_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json",
-                    key=f"export_{aval_id}"
-                )
+        _render_avaliacao(aval)
+
+    st.caption(f"Exibindo {len(avaliacoes)} de {resumo['total']} avaliação(ões).")
+    if st.session_state.get("historico_cursor") is not None:
+        if st.button("⬇️ Carregar mais", key="historico_carregar_mais"):
+            _carregar_proxima_pagina(usuario_id)
+            st.rerun()
 
     # Resumo geral
     st.divider()
     st.subheader("📈 Resumo Geral")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total de Avaliações", len(avaliacoes))
+        st.metric("Total de Avaliações", resumo["total"])
     with col2:
-        dor_media = sum(a.get("percentual_dor", 0) for a in avaliacoes) / len(avaliacoes)
-        st.metric("Dor Média", f"{dor_media:.1f}%")
+        st.metric("Dor Média", f"{resumo['dor_media']:.1f}%")
     with col3:
-        dor_maxima = max(a.get("percentual_dor", 0) for a in avaliacoes)
-        st.metric("Dor Máxima Registrada", f"{dor_maxima}%")
+        st.metric("Dor Máxima Registrada", f"{resumo['dor_maxima']}%")
 
 __all__ = ["render"]
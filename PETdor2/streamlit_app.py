@@ -1,11 +1,16 @@
-# streamlit_app.py
-
-import streamlit as st
-from backend.database import testar_conexao
-
-st.set_page_config(page_title="PETdor", page_icon="🐾", layout="wide")
-
-# Teste opcional de conexão
-testar_conexao()
-
-st.success("Backend carregado com sucesso! Use o menu lateral para navegar.")
+# streamlit_app.py
+
+import streamlit as st
+from backend.database import aquecer_supabase
+from backend.auth.security import iniciar_calibracao_bcrypt
+
+st.set_page_config(page_title="PETdor", page_icon="🐾", layout="wide")
+
+# Cria o cliente Supabase e o pool HTTP e verifica a conexão em segundo
+# plano (uma vez por processo); o estado alimenta as sondas do contêiner
+aquecer_supabase()
+
+# Calibra o custo do bcrypt em segundo plano (uma vez por processo)
+iniciar_calibracao_bcrypt()
+
+st.success("Backend carregado com sucesso! Use o menu lateral para navegar.")